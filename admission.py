@@ -0,0 +1,193 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from starlette.exceptions import HTTPException
+
+SEGMENTATION = "segmentation"
+HEAVY = "heavy"
+LIGHT = "light"
+
+# Pipeline'da en ağır adımın sınıfı geçerlidir
+CLASS_ORDER = (LIGHT, HEAVY, SEGMENTATION)
+
+DEFAULT_CLASSES = {
+    "remove_background": SEGMENTATION,
+    "remove_background_and_add_shadow": SEGMENTATION,
+    "generate_social_media_profile": SEGMENTATION,
+    "crop_image": LIGHT,
+    "center_crop": LIGHT,
+    "resize_image": LIGHT,
+    "rotate_image": LIGHT,
+    "standardize_aspect_ratio": LIGHT,
+    "sharpen_image": LIGHT,
+    "apply_filter": LIGHT,
+    "apply_color_matrix": LIGHT,
+    "pixelate_image": LIGHT,
+    "add_text": LIGHT,
+    "apply_mirror_effect": LIGHT,
+}
+
+
+class Overloaded(HTTPException):
+    def __init__(self, operation_class, retry_after):
+        super().__init__(
+            status_code=503,
+            detail=f"'{operation_class}' işlemleri için kapasite dolu, daha sonra tekrar deneyin",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class OperationClass:
+    def __init__(self, name, concurrency, queue_size):
+        """
+        Bir işlem sınıfının eşzamanlılık sınırı ve sınırlı bekleme kuyruğu.
+        :param name: Sınıf adı.
+        :param concurrency: Aynı anda çalışabilecek en fazla işlem.
+        :param queue_size: Yer bekleyebilecek en fazla işlem; kuyruk doluysa istek hemen reddedilir.
+        """
+        if concurrency < 1 or queue_size < 0:
+            raise ValueError(f"'{name}' için geçersiz sınır: {concurrency}:{queue_size}")
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.active = 0
+        self.rejected = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self, retry_after, wait=False):
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_size and not wait:
+            self.rejected += 1
+            raise Overloaded(self.name, retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # Yer, serbest bırakan tarafından doğrudan devredilir; active sayısı değişmez
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Yer devredildikten sonra iptal edildiyse sıradakine aktarılır
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    def __init__(self, limits, classes=None, default_class=HEAVY, retry_after=2):
+        """
+        İşlemleri sınıflarına göre sınırlar; kapasite ve kuyruk doluysa 503 ile hemen reddeder.
+        Olay döngüsünde çalışır; iş parçacıkları arasında paylaşılmaz.
+        :param limits: Sınıf adı -> (eşzamanlılık, kuyruk boyutu) eşlemesi.
+        :param classes: İşlem adı -> sınıf eşlemesi; varsayılan kuralları ezer.
+        :param default_class: Kuralı olmayan işlemlerin sınıfı.
+        :param retry_after: Reddedilen yanıtlardaki Retry-After değeri (saniye).
+        """
+        self.classes = dict(DEFAULT_CLASSES)
+        self.classes.update(classes or {})
+        self.default_class = default_class
+        self.retry_after = retry_after
+        self._classes = {
+            name: OperationClass(name, concurrency, queue_size)
+            for name, (concurrency, queue_size) in limits.items()
+        }
+
+        for operation, name in list(self.classes.items()) + [(None, default_class)]:
+            if name not in self._classes:
+                raise ValueError(f"'{operation or 'varsayılan'}' için tanımsız işlem sınıfı: {name}")
+
+    def class_for(self, operation, steps=None):
+        """
+        İşlemin sınıfını döndürür; pipeline için adımların en ağır sınıfı kullanılır.
+        :param operation: ImageProcessService metot adı.
+        :param steps: Pipeline adımlarının işlem adları.
+        """
+        if steps:
+            names = [self.class_for(step) for step in steps]
+            return max(names, key=lambda name: CLASS_ORDER.index(name) if name in CLASS_ORDER else len(CLASS_ORDER))
+        return self.classes.get(operation, self.default_class)
+
+    @asynccontextmanager
+    async def slot(self, operation, steps=None, wait=False):
+        """
+        İşlem için yer ayırır; blok bitince yeri bırakır.
+        :param wait: True ise kuyruk dolu olsa da reddetmeden sırada bekler (kendi sınırı olan arka plan işleri için).
+        :raises Overloaded: Sınıfın kapasitesi ve kuyruğu doluysa.
+        """
+        operation_class = self._classes[self.class_for(operation, steps)]
+        await operation_class.acquire(self.retry_after, wait)
+        try:
+            yield operation_class.name
+        finally:
+            operation_class.release()
+
+    def snapshot(self):
+        return {
+            name: {
+                "active": operation_class.active,
+                "queued": operation_class.queued,
+                "rejected": operation_class.rejected,
+                "concurrency": operation_class.concurrency,
+                "queue_size": operation_class.queue_size,
+            }
+            for name, operation_class in self._classes.items()
+        }
+
+
+def default_limits(process_workers, segmentation_batch_size):
+    """
+    Yürütücü havuzlarına göre varsayılan sınırları döndürür.
+    Ağır işlemler süreç havuzunda en az bir işçiyi hafif işlemlere bırakır;
+    segmentasyon aynı anda bir toplu çıkarımı dolduracak kadar isteği kabul eder.
+    """
+    heavy = max(process_workers - 1, 1)
+    return {
+        SEGMENTATION: (segmentation_batch_size, segmentation_batch_size * 2),
+        HEAVY: (heavy, heavy * 2),
+        LIGHT: (process_workers * 2, process_workers * 8),
+    }
+
+
+def divide_limits(limits, parts):
+    """
+    Örnek genelindeki sınırları kendi kabul denetimini tutan süreçlere (ön çatallı işçiler) böler.
+    Her süreç sınıf başına en az bir işlemi çalıştırabilir.
+    :param limits: Sınıf -> (eşzamanlılık, kuyruk) sözlüğü.
+    :param parts: Süreç sayısı.
+    """
+    return {
+        name: (max(1, concurrency // parts), queue_size // parts)
+        for name, (concurrency, queue_size) in limits.items()
+    }
+
+
+def parse_limits(items):
+    """
+    "sinif=eszamanlilik:kuyruk" biçimindeki sınırları sözlüğe çevirir.
+    :param items: ["segmentation=4:8", "heavy=2:4"] gibi liste.
+    """
+    limits = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        concurrency, _, queue_size = value.partition(":")
+        try:
+            limits[name.strip()] = (int(concurrency), int(queue_size or 0))
+        except ValueError:
+            raise ValueError(f"Geçersiz kapasite sınırı: {item}")
+    return limits
@@ -0,0 +1,99 @@
+import importlib
+import threading
+import time
+
+import metrics
+
+
+class LazyModule:
+    def __init__(self, engine, module_name):
+        """
+        Ağır bir motoru (rembg, Wand) ilk kullanımda veya arka planda içe aktaran modül vekili.
+        Nitelik erişimleri içe aktarılan modüle yönlendirilir; içe aktarma süresi metriklere işlenir.
+        :param engine: Motorun durum raporlarındaki adı.
+        :param module_name: İçe aktarılacak modül.
+        """
+        self.engine = engine
+        self.module_name = module_name
+        self.import_seconds = None
+        self.error = None
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        """
+        Modülü içe aktarır (yalnızca ilk çağrıda) ve döndürür.
+        """
+        if self._module is not None:
+            return self._module
+
+        with self._lock:
+            if self._module is None:
+                started = time.perf_counter()
+                try:
+                    module = importlib.import_module(self.module_name)
+                except Exception as exc:
+                    self.error = f"{type(exc).__name__}: {exc}"
+                    raise
+                self.import_seconds = time.perf_counter() - started
+                self.error = None
+                metrics.BACKEND_IMPORT_SECONDS.set(self.import_seconds, engine=self.engine)
+                self._module = module
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+_engines = {}
+
+
+def lazy(engine, module_name):
+    """
+    Motor için tembel modül vekili oluşturur ve durum raporuna kaydeder.
+    """
+    module = _engines.get(engine)
+    if module is None:
+        module = _engines[engine] = LazyModule(engine, module_name)
+    return module
+
+
+def load_all(engines=None):
+    """
+    Kayıtlı motorları içe aktarır; hata veren motor durum raporunda hatasıyla görünür.
+    :param engines: Yüklenecek motor adları (varsayılan: tümü).
+    :return: Motorların hepsi yüklendiyse True.
+    """
+    ok = True
+    for engine, module in list(_engines.items()):
+        if engines is not None and engine not in engines:
+            continue
+        try:
+            module.load()
+        except Exception:
+            ok = False
+    return ok
+
+
+def preload(engines=None):
+    """
+    Motorları arka plan iş parçacığında içe aktarır; ilk istek içe aktarmayı beklemez.
+    :param engines: Yüklenecek motor adları (varsayılan: tümü).
+    """
+    thread = threading.Thread(target=load_all, args=(engines,), name="backend-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def status():
+    """
+    Motorların yüklenme durumu: {motor: {"loaded", "import_seconds", "error"}}
+    """
+    return {
+        engine: {"loaded": module.loaded, "import_seconds": module.import_seconds, "error": module.error}
+        for engine, module in sorted(_engines.items())
+    }
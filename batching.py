@@ -0,0 +1,187 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# rembg oturumlarının kendi predict() metotlarındaki ön işleme değerleri:
+# (ortalama, standart sapma, model giriş boyutu)
+MODEL_SPECS = {
+    "u2net": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "u2netp": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "u2net_human_seg": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "silueta": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "isnet-general-use": ((0.5, 0.5, 0.5), (1.0, 1.0, 1.0), (1024, 1024)),
+}
+
+
+class SegmentationBatcher:
+    def __init__(self, sessions, max_batch_size=8, window_ms=10.0):
+        """
+        Kısa bir zaman penceresinde gelen segmentasyon isteklerini tek bir toplu çıkarımda birleştirir.
+        :param sessions: Oturumların alınacağı SessionRegistry.
+        :param max_batch_size: Bir toplu çıkarımdaki en fazla resim sayısı (1: toplama kapalı).
+        :param window_ms: İlk istekten sonra diğer istekler için beklenecek süre (milisaniye).
+        """
+        self.sessions = sessions
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window_ms / 1000.0
+        self._queues = {}
+        self._batchable = {}
+        self._lock = threading.Lock()
+
+        # Toplama istatistikleri
+        self.batches_total = 0
+        self.items_total = 0
+        self.wait_seconds_total = 0.0
+        self.batch_sizes = Counter()
+
+    def predict(self, image, model_name=None):
+        """
+        Resmin ön plan maskesini döndürür.
+        :param image: PIL resmi.
+        :param model_name: Kullanılacak model (varsayılan: SessionRegistry'nin ilk modeli).
+        :return: Resimle aynı boyutta "L" kipinde maske.
+        """
+        model_name = model_name or self.sessions.default_model
+        spec = MODEL_SPECS.get(model_name)
+
+        if spec is None or self.max_batch_size == 1:
+            # Ön işleme değerleri bilinmeyen modeller rembg'nin kendi yoluyla çalışır
+            with self.sessions.acquire(model_name) as session:
+                return session.predict(image)[0]
+
+        mean, std, size = spec
+        future = Future()
+        self._get_queue(model_name).put((_preprocess(image, mean, std, size), future, time.monotonic()))
+        return _postprocess(future.result(), image.size)
+
+    def check_models(self):
+        """
+        Yüklü modellerin toplu çıkarımı destekleyip desteklemediğini denetler; ısınmada bir kez çağrılır.
+        Toplu boyutu 1'e sabitlenmiş modeller istekleri sırayla çalıştırır ve bunun için uyarı günlüğe yazılır.
+        :return: {model: toplu çıkarım destekleniyor mu}
+        """
+        if self.max_batch_size > 1:
+            for model_name in self.sessions.model_names:
+                if model_name in MODEL_SPECS:
+                    with self.sessions.acquire(model_name) as session:
+                        self._is_batchable(model_name, session.inner_session.get_inputs()[0])
+        return dict(self._batchable)
+
+    def snapshot(self):
+        """
+        Toplama istatistiklerinin kopyasını döndürür.
+        """
+        with self._lock:
+            return {
+                "batches_total": self.batches_total,
+                "items_total": self.items_total,
+                "wait_seconds_total": self.wait_seconds_total,
+                "batch_sizes": dict(self.batch_sizes),
+                "batchable": dict(self._batchable),
+            }
+
+    def _get_queue(self, model_name):
+        requests = self._queues.get(model_name)
+        if requests is not None:
+            return requests
+
+        with self._lock:
+            requests = self._queues.get(model_name)
+            if requests is None:
+                requests = queue.Queue()
+                # Havuzdaki her oturum için bir toplama iş parçacığı
+                for index in range(self.sessions.pool_size):
+                    threading.Thread(
+                        target=self._worker,
+                        args=(model_name, requests),
+                        name=f"segmentation-batcher-{model_name}-{index}",
+                        daemon=True,
+                    ).start()
+                self._queues[model_name] = requests
+        return requests
+
+    def _worker(self, model_name, requests):
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            started = time.monotonic()
+            try:
+                predictions = self._run(model_name, [tensor for tensor, _, _ in batch])
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+
+            self._record(batch, started)
+            for (_, future, _), prediction in zip(batch, predictions):
+                future.set_result(prediction)
+
+    def _run(self, model_name, tensors):
+        with self.sessions.acquire(model_name) as session:
+            inner = session.inner_session
+            model_input = inner.get_inputs()[0]
+
+            if self._is_batchable(model_name, model_input):
+                outputs = inner.run(None, {model_input.name: np.stack(tensors)})
+                return list(outputs[0][:, 0, :, :])
+
+            # Sabit toplu boyutlu modellerde istekler yine de tek iş parçacığında sırayla çalışır
+            return [
+                inner.run(None, {model_input.name: tensor[np.newaxis]})[0][0, 0, :, :]
+                for tensor in tensors
+            ]
+
+    def _is_batchable(self, model_name, model_input):
+        batchable = self._batchable.get(model_name)
+        if batchable is None:
+            batch_dim = model_input.shape[0]
+            # Dinamik eksen isim (str) veya None olarak gelir
+            batchable = not isinstance(batch_dim, int) or batch_dim != 1
+            if not batchable:
+                logger.warning(
+                    "'%s' modelinin toplu boyutu 1'e sabit (giriş şekli %s); REMBG_BATCH_SIZE=%d etkisiz, "
+                    "istekler sırayla çalışır. Toplu çıkarım için dinamik toplu boyutlu ONNX dışa aktarımı gerekir",
+                    model_name, model_input.shape, self.max_batch_size,
+                )
+            self._batchable[model_name] = batchable
+        return batchable
+
+    def _record(self, batch, started):
+        with self._lock:
+            self.batches_total += 1
+            self.items_total += len(batch)
+            # İsteklerin kuyrukta toplu çıkarımı beklediği toplam süre
+            self.wait_seconds_total += sum(started - queued_at for _, _, queued_at in batch)
+            self.batch_sizes[len(batch)] += 1
+
+
+def _preprocess(image, mean, std, size):
+    resized = np.asarray(image.convert("RGB").resize(size, Image.Resampling.LANCZOS), dtype=np.float32)
+    resized /= max(float(resized.max()), 1e-6)
+    resized -= np.asarray(mean, dtype=np.float32)
+    resized /= np.asarray(std, dtype=np.float32)
+    return np.ascontiguousarray(resized.transpose((2, 0, 1)))
+
+
+def _postprocess(prediction, size):
+    low, high = float(prediction.min()), float(prediction.max())
+    prediction = (prediction - low) / max(high - low, 1e-6)
+    mask = Image.fromarray((prediction * 255).astype(np.uint8), mode="L")
+    return mask.resize(size, Image.Resampling.LANCZOS)
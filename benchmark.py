@@ -0,0 +1,385 @@
+"""
+ImageProcessService işlemleri için mikro kıyaslama betiği.
+
+Her işlem, her çözünürlük ve renk kipi için ayrı bir süreçte çalıştırılır; böylece tepe bellek
+kullanımı (RSS) diğer durumlardan etkilenmez. Sonuçlar karşılaştırılabilmesi için JSON olarak yazılır.
+
+Örnekler:
+    python benchmark.py --output results.json
+    python benchmark.py --operations apply_filter,resize_image --resolutions 2,12 --modes RGB
+    python benchmark.py --samples ./samples --output after.json --compare before.json
+    python benchmark.py --check-color-effects --resolutions 2 --output color-check.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+from PIL import Image
+
+DEFAULT_RESOLUTIONS = (0.3, 2, 12, 48)
+DEFAULT_MODES = ("RGB", "RGBA")
+
+# Yardımcı metotlar ve kendi başına ölçülemeyen işlemler
+EXCLUDED_OPERATIONS = {"run_pipeline", "validate_pipeline", "warm_up", "preload_backends"}
+
+# Zorunlu parametresi olan veya sonucu rastgele olan işlemler için (genişlik, yükseklik) -> parametreler
+OPERATION_PARAMS = {
+    "resize_image": lambda width, height: {"width": width // 2, "height": height // 2},
+    "rotate_image": lambda width, height: {"angle": 15},
+    "crop_image": lambda width, height: {
+        "left": width // 4, "top": height // 4, "right": width * 3 // 4, "bottom": height * 3 // 4,
+    },
+    "apply_color_matrix": lambda width, height: {
+        "matrix": [[0.393, 0.769, 0.189], [0.349, 0.686, 0.168], [0.272, 0.534, 0.131]],
+    },
+    "apply_filter": lambda width, height: {"filter_type": "sepia"},
+    "apply_glitch_effect": lambda width, height: {"seed": 0},
+    "apply_vintage_effect": lambda width, height: {"seed": 0},
+    "apply_texture": lambda width, height: {"seed": 0},
+}
+
+
+def _list_operations(service_class):
+    operations = []
+    for name in sorted(vars(service_class)):
+        if name.startswith("_") or name in EXCLUDED_OPERATIONS:
+            continue
+        if callable(getattr(service_class, name)):
+            operations.append(name)
+    return operations
+
+
+def _dimensions(megapixels):
+    # Telefon fotoğraflarındaki gibi 4:3 oran
+    width = int(round(math.sqrt(megapixels * 1e6 * 4 / 3)))
+    return width, int(round(width * 3 / 4))
+
+
+def _synthetic_image(width, height, mode):
+    """
+    Kenar, doku ve renk geçişi içeren tekrarlanabilir bir test resmi üretir.
+    """
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x /= max(width - 1, 1)
+    y /= max(height - 1, 1)
+
+    rgb = np.empty((height, width, 3), dtype=np.float32)
+    rgb[..., 0] = 255 * x
+    rgb[..., 1] = 255 * y
+    rgb[..., 2] = 127.5 * (1 + np.sin(12 * np.pi * x) * np.cos(8 * np.pi * y))
+
+    # Ortada belirgin kenarları olan bir daire
+    circle = (x - 0.5) ** 2 + ((y - 0.5) * height / width) ** 2 < 0.04
+    rgb[circle] = (230, 200, 170)
+    rgb += rng.normal(0, 8, rgb.shape).astype(np.float32)
+    pixels = np.clip(rgb, 0, 255).astype(np.uint8)
+
+    if mode == "RGBA":
+        alpha = np.clip(255 * (1.6 - 2 * np.hypot(x - 0.5, y - 0.5)), 0, 255).astype(np.uint8)
+        pixels = np.dstack([pixels, alpha])
+    return Image.fromarray(pixels, mode=mode)
+
+
+def _sample_image(path, width, height, mode):
+    with Image.open(path) as image:
+        image = image.convert(mode)
+        return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _write_input(image, directory, name):
+    # Opak girdiler yüklemelerin çoğu gibi JPEG, saydam girdiler PNG olarak kaydedilir
+    if image.mode == "RGBA":
+        path = os.path.join(directory, f"{name}.png")
+        image.save(path, format="PNG", compress_level=1)
+    else:
+        path = os.path.join(directory, f"{name}.jpg")
+        image.save(path, format="JPEG", quality=92)
+    return path
+
+
+def _max_rss_bytes():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kilobayt, macOS bayt döndürür
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _summary(values):
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "mean": statistics.fmean(values),
+    }
+
+
+def _run_case(operation, input_path, params, repeat, warmup, output_format):
+    """
+    Tek bir durumu ayrı süreçte ölçer.
+    Adım tabanlı işlemlerde çözme, işleme ve kodlama süreleri ayrı ayrı, diğerlerinde uçtan uca ölçülür.
+    """
+    from encoding import OutputFormat
+    from service import ImageProcessService
+
+    service = ImageProcessService()
+    output = OutputFormat(output_format, "jpeg", "balanced", None, None) if output_format else None
+    with open(input_path, "rb") as f:
+        image_data = f.read()
+
+    method = getattr(ImageProcessService, operation)
+    step = getattr(method, "step", None)
+    baseline_rss = _max_rss_bytes()
+    timings = {"total": [], "decode": [], "process": [], "encode": []}
+    output_bytes = None
+
+    for iteration in range(warmup + repeat):
+        if step is None:
+            args = (image_data,) if operation != "apply_double_exposure" else (image_data, image_data)
+            started = time.perf_counter()
+            result = getattr(service, operation)(*args, output=output, **params)
+            finished = time.perf_counter()
+            split = None
+        else:
+            started = time.perf_counter()
+            image = service._convert(image_data, method.backend)
+            if isinstance(image, Image.Image):
+                # Servisteki gibi: ilk adım küçük bir boyut bildiriyorsa JPEG küçültülerek çözülür
+                service._draft(image, step, (), params)
+                image.load()
+            decoded = time.perf_counter()
+            processed_image = step(service, image, **params)
+            processed = time.perf_counter()
+            result = service._encode(processed_image, output)
+            finished = time.perf_counter()
+            if processed_image is not image:
+                service._release(image)
+            service._release(processed_image)
+            split = (decoded - started, processed - decoded, finished - processed)
+
+        if iteration < warmup:
+            continue
+        timings["total"].append(finished - started)
+        if split is not None:
+            for key, value in zip(("decode", "process", "encode"), split):
+                timings[key].append(value)
+        output_bytes = len(result.getvalue())
+
+    peak_rss = _max_rss_bytes()
+    return {
+        "wall_seconds": _summary(timings["total"]),
+        "split_seconds": {
+            key: statistics.median(timings[key]) for key in ("decode", "process", "encode")
+        } if timings["decode"] else None,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss,
+        # Modüller yüklendikten ve girdi okunduktan sonraki tepe değere göre artış
+        "rss_growth_bytes": peak_rss - baseline_rss,
+        "output_bytes": output_bytes,
+    }
+
+
+def _check_variants(operation, input_path):
+    """
+    Renk efektinin NumPy/OpenCV ve Wand uygulamalarını aynı girdide çalıştırıp çıktıları karşılaştırır.
+    Farklar 8 bit RGBA değerleri üzerinden hesaplanır.
+    """
+    from service import ImageProcessService, NATIVE_BACKEND, PIL_BACKEND, WAND_BACKEND
+
+    service = ImageProcessService()
+    with open(input_path, "rb") as f:
+        image_data = f.read()
+
+    outputs, seconds = {}, {}
+    for backend, method in getattr(ImageProcessService, operation).variants.items():
+        image = service._convert(image_data, method.backend)
+        started = time.perf_counter()
+        result = method.step(service, image)
+        seconds[backend] = time.perf_counter() - started
+        converted = service._convert(result, PIL_BACKEND)
+        outputs[backend] = np.asarray(converted.convert("RGBA"), dtype=np.int16)
+        if result is not image:
+            service._release(image)
+        service._release(result)
+
+    diff = np.abs(outputs[NATIVE_BACKEND] - outputs[WAND_BACKEND])
+    return {
+        "seconds": seconds,
+        "max_abs_diff": int(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        # Herhangi bir kanalı 2'den fazla farklı olan piksellerin oranı
+        "pixels_over_2": float((diff.max(axis=2) > 2).mean()),
+    }
+
+
+def _measure(operation, input_path, params, repeat, warmup, output_format):
+    # Her durum için yeni süreç: tepe RSS yalnızca bu durumu yansıtır
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        future = pool.submit(_run_case, operation, input_path, params, repeat, warmup, output_format)
+        try:
+            return future.result(), None
+        except Exception as exc:
+            return None, f"{type(exc).__name__}: {exc}"
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def case_key(case):
+        return case["operation"], case["source"], case["resolution_mp"], case["mode"]
+
+    previous = {case_key(case): case for case in baseline["results"] if case.get("wall_seconds")}
+    print(f"\n{'işlem':<36}{'kaynak':<16}{'MP':>6}{'kip':>6}{'önce (s)':>11}{'sonra (s)':>11}{'oran':>8}")
+    for case in results:
+        old = previous.get(case_key(case))
+        if old is None or not case.get("wall_seconds"):
+            continue
+        before = old["wall_seconds"]["median"]
+        after = case["wall_seconds"]["median"]
+        print(f"{case['operation']:<36}{case['source']:<16}{case['resolution_mp']:>6}{case['mode']:>6}"
+              f"{before:>11.4f}{after:>11.4f}{after / before:>8.2f}")
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="ImageProcessService mikro kıyaslamaları")
+    parser.add_argument("--operations", help="Virgülle ayrılmış işlem adları (varsayılan: tümü)")
+    parser.add_argument("--resolutions", default=",".join(str(r) for r in DEFAULT_RESOLUTIONS),
+                        help="Megapiksel cinsinden çözünürlükler")
+    parser.add_argument("--modes", default=",".join(DEFAULT_MODES), help="Girdi renk kipleri (RGB, RGBA)")
+    parser.add_argument("--samples", help="Örnek resimlerin bulunduğu dizin; her biri her çözünürlüğe ölçeklenir")
+    parser.add_argument("--no-synthetic", action="store_true", help="Yapay test resmini kullanma")
+    parser.add_argument("--repeat", type=int, default=3, help="Ölçülen tekrar sayısı")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçülmeyen ısınma turu sayısı")
+    parser.add_argument("--format", choices=("png", "jpeg", "webp", "auto"), help="Çıktı biçimi (varsayılan: PNG)")
+    parser.add_argument("--output", default="benchmark-results.json", help="Sonuç dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--check-color-effects", action="store_true",
+                        help="Renk efektlerinin NumPy/OpenCV ve Wand çıktılarını karşılaştır (süre ölçümü yerine)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    from service import ImageProcessService
+    operations = _list_operations(ImageProcessService)
+    if args.check_color_effects:
+        operations = [name for name in operations if hasattr(getattr(ImageProcessService, name), "variants")]
+    if args.operations:
+        requested = [name.strip() for name in args.operations.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(operations))
+        if unknown:
+            raise SystemExit(f"Bilinmeyen işlemler: {', '.join(unknown)}")
+        operations = requested
+
+    resolutions = [float(value) for value in args.resolutions.split(",")]
+    modes = [mode.strip().upper() for mode in args.modes.split(",")]
+    sources = [] if args.no_synthetic else [("synthetic", None)]
+    if args.samples:
+        for name in sorted(os.listdir(args.samples)):
+            path = os.path.join(args.samples, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                sources.append((os.path.splitext(name)[0], path))
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as directory:
+        for source, source_path in sources:
+            for megapixels in resolutions:
+                width, height = _dimensions(megapixels)
+                for mode in modes:
+                    if source_path is None:
+                        image = _synthetic_image(width, height, mode)
+                    else:
+                        image = _sample_image(source_path, width, height, mode)
+                    input_path = _write_input(image, directory, f"{source}-{megapixels}-{mode}")
+                    input_bytes = os.path.getsize(input_path)
+                    image.close()
+
+                    for operation in operations:
+                        if args.check_color_effects:
+                            try:
+                                check = _check_variants(operation, input_path)
+                                status = (f"en büyük fark {check['max_abs_diff']:>3}  "
+                                          f"ortalama {check['mean_abs_diff']:.3f}  "
+                                          f">2 fark %{100 * check['pixels_over_2']:.2f}  "
+                                          f"native {check['seconds']['native']:.3f}s  "
+                                          f"wand {check['seconds']['wand']:.3f}s")
+                            except Exception as exc:
+                                check = {"error": f"{type(exc).__name__}: {exc}"}
+                                status = f"HATA {check['error']}"
+                            results.append({
+                                "operation": operation, "source": source, "resolution_mp": megapixels,
+                                "mode": mode, **check,
+                            })
+                            print(f"{operation:<36}{source:<16}{megapixels:>6}{mode:>6}  {status}", flush=True)
+                            continue
+
+                        params = OPERATION_PARAMS.get(operation, lambda w, h: {})(width, height)
+                        measured, error = _measure(
+                            operation, input_path, params, args.repeat, args.warmup, args.format
+                        )
+                        case = {
+                            "operation": operation,
+                            "source": source,
+                            "resolution_mp": megapixels,
+                            "width": width,
+                            "height": height,
+                            "mode": mode,
+                            "input_bytes": input_bytes,
+                            "params": params,
+                            "error": error,
+                        }
+                        if measured is not None:
+                            case.update(measured)
+                            case["throughput_mp_per_second"] = (
+                                width * height / 1e6 / measured["wall_seconds"]["median"]
+                            )
+                        results.append(case)
+
+                        if error:
+                            status = f"HATA {error}"
+                        else:
+                            status = (f"{measured['wall_seconds']['median']:.4f}s "
+                                      f"{case['throughput_mp_per_second']:.1f} MP/s "
+                                      f"RSS {measured['peak_rss_bytes'] / 2 ** 20:.0f} MB")
+                        print(f"{operation:<36}{source:<16}{megapixels:>6}{mode:>6}  {status}", flush=True)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "versions": {
+                "pillow": Image.__version__,
+                "numpy": np.__version__,
+                "opencv": cv2.__version__,
+            },
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "output_format": args.format or "png",
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSonuçlar yazıldı: {args.output}")
+
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import ntpath
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+import encoding
+
+EXTENSIONS = {
+    encoding.MEDIA_TYPES[encoding.PNG]: ".png",
+    encoding.MEDIA_TYPES[encoding.JPEG]: ".jpg",
+    encoding.MEDIA_TYPES[encoding.WEBP]: ".webp",
+}
+
+MANIFEST_NAME = "manifest.json"
+
+
+def safe_name(name, fallback):
+    """
+    Arşivden veya yükleme adından gelen dosya adını zip girdisi olarak kullanılabilir hale getirir.
+    Yanıtı açan istemcinin dizini dışına yazılmasın diye (zip-slip) ad posix biçimine çevrilir,
+    sürücü ve baştaki "/" atılır, "." ve ".." bileşenleri düşürülür.
+    :param fallback: Geriye ad kalmazsa kullanılacak ad.
+    :return: Göreli posix yolu.
+    """
+    _, path = ntpath.splitdrive(name.replace("\\", "/"))
+    parts = [part for part in path.split("/") if part not in ("", ".", "..")]
+    return "/".join(parts) or fallback
+
+
+class BulkItem:
+    def __init__(self, name, load):
+        """
+        Toplu istekteki tek bir resim.
+        :param name: Kaynak dosya adı.
+        :param load: Resmin byte verisini döndüren çağrılabilir; iş parçacığında, işlenmeden hemen önce çağrılır.
+        """
+        self.name = name
+        self.load = load
+
+
+def archive_items(file, max_items, max_item_bytes):
+    """
+    Zip arşivindeki resimleri BulkItem listesine çevirir; veriler işlenirken tek tek açılır.
+    :param file: Okunabilir ve konumlanabilir zip dosya nesnesi.
+    :param max_items: Kabul edilen en fazla resim sayısı.
+    :param max_item_bytes: Bir resmin açılmış haldeki en büyük boyutu.
+    :raises ValueError: Arşiv geçersizse veya sınırlar aşılıyorsa.
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"Geçersiz zip arşivi: {exc}")
+
+    items = []
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        # Dizinler ve işletim sistemlerinin eklediği gizli dosyalar atlanır (ör. __MACOSX/._a.jpg)
+        if info.is_dir() or not base or base.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        if info.file_size > max_item_bytes:
+            raise ValueError(f"'{info.filename}' boyut sınırını aşıyor ({max_item_bytes} bayt)")
+        name = safe_name(info.filename, f"image-{len(items)}")
+        items.append(BulkItem(name, lambda info=info: archive.read(info)))
+
+    if len(items) > max_items:
+        raise ValueError(f"Arşivde en fazla {max_items} resim olabilir")
+    return items
+
+
+def spool_archive(upload_file, max_items, max_item_bytes):
+    """
+    Yüklenen zip arşivini geçici dosyaya alır ve içindeki resimleri listeler.
+    FastAPI yüklenen dosyaları yanıt akışı başlamadan kapattığından veriler yanıt boyunca geçici dosyadan okunur.
+    :return: (BulkItem listesi, iş bitince kapatılacak geçici dosya)
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        upload_file.seek(0)
+        shutil.copyfileobj(upload_file, spool)
+        return archive_items(spool, max_items, max_item_bytes), spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+def spool_files(uploads, max_items, max_item_bytes):
+    """
+    Çok parçalı istekle yüklenen resimleri tek bir geçici dosyaya art arda yazar.
+    :return: (BulkItem listesi, iş bitince kapatılacak geçici dosya)
+    """
+    if len(uploads) > max_items:
+        raise ValueError(f"En fazla {max_items} resim gönderilebilir")
+
+    spool = tempfile.TemporaryFile()
+    try:
+        items = []
+        for index, upload in enumerate(uploads):
+            offset = spool.tell()
+            upload.file.seek(0)
+            shutil.copyfileobj(upload.file, spool)
+            size = spool.tell() - offset
+            name = safe_name(upload.filename or "", f"image-{index}")
+            if size > max_item_bytes:
+                raise ValueError(f"'{name}' boyut sınırını aşıyor ({max_item_bytes} bayt)")
+            # pread dosya konumunu değiştirmez; iş parçacıkları aynı dosyadan aynı anda okuyabilir
+            items.append(BulkItem(name, lambda offset=offset, size=size: os.pread(spool.fileno(), size, offset)))
+        spool.flush()
+        return items, spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+class _ChunkSink:
+    # ZipFile'ın yazdığı baytları toplar; konumlanamayan akış gibi davranır, ZipFile veri tanımlayıcıları kullanır
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ZipStream:
+    def __init__(self):
+        """
+        Girdileri eklendikçe parça parça üreten zip yazıcısı; arşivin tamamı bellekte tutulmaz.
+        Resimler zaten sıkıştırılmış olduğundan girdiler sıkıştırılmadan saklanır.
+        """
+        self._sink = _ChunkSink()
+        self._archive = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_STORED)
+        self._names = set()
+
+    def unique_name(self, name):
+        base, extension = os.path.splitext(name)
+        candidate, index = name, 1
+        while candidate in self._names:
+            candidate = f"{base}-{index}{extension}"
+            index += 1
+        self._names.add(candidate)
+        return candidate
+
+    def add(self, name, data):
+        """
+        :return: Arşive eklenen baytlar.
+        """
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        self._archive.writestr(info, data)
+        return self._sink.drain()
+
+    def close(self):
+        """
+        :return: Merkez dizin dahil arşivin kalan baytları.
+        """
+        self._archive.close()
+        return self._sink.drain()
+
+
+def output_name(source, media_type):
+    # Kaynak adındaki göreli dizinler korunur, uzantı çıktı biçimine göre değiştirilir
+    base, _ = os.path.splitext(safe_name(source, "image"))
+    return base + EXTENSIONS.get(media_type, ".png")
+
+
+async def stream_results(items, run, concurrency, spool=None):
+    """
+    Resimleri en fazla `concurrency` tanesi aynı anda çalışacak şekilde işler ve
+    sonuçları biten sırayla zip girdisi olarak akıtır; en sona her resmin sonucunu içeren manifest eklenir.
+    :param items: BulkItem listesi.
+    :param run: Resmin byte verisini alıp sonucu (BytesIO) döndüren eşzamansız çağrılabilir.
+    :param concurrency: Aynı anda işlenen en fazla resim.
+    :param spool: Akış bitince kapatılacak geçici girdi dosyası.
+    :return: Zip arşivinin parçalarını veren asenkron üreteç.
+    """
+    archive = ZipStream()
+    manifest_name = archive.unique_name(MANIFEST_NAME)
+    manifest = [None] * len(items)
+    pending = {}
+    queued = iter(enumerate(items))
+
+    async def process(item):
+        image_data = await asyncio.to_thread(item.load)
+        return await run(image_data)
+
+    def schedule():
+        for index, item in queued:
+            pending[asyncio.create_task(process(item))] = index
+            if len(pending) >= concurrency:
+                return
+
+    try:
+        schedule()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                source = items[index].name
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    manifest[index] = {"source": source, "status": "error", "error": str(exc) or type(exc).__name__}
+                    continue
+
+                name = archive.unique_name(output_name(source, encoding.media_type_for(result)))
+                manifest[index] = {"source": source, "status": "ok", "output": name}
+                yield archive.add(name, result.getbuffer())
+            schedule()
+
+        summary = {
+            "total": len(items),
+            "succeeded": sum(entry["status"] == "ok" for entry in manifest),
+            "failed": sum(entry["status"] == "error" for entry in manifest),
+            "items": manifest,
+        }
+        yield archive.add(manifest_name, json.dumps(summary, ensure_ascii=False, indent=2))
+        yield archive.close()
+    finally:
+        # İstemci bağlantıyı kapattıysa kalan işler iptal edilir
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if spool is not None:
+            spool.close()
@@ -0,0 +1,273 @@
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+
+# Rastgelelik içeren işlemler yalnızca "seed" verildiğinde önbelleğe alınır
+SEEDED_OPERATIONS = {"apply_glitch_effect", "apply_vintage_effect", "apply_texture"}
+
+_BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def _unseeded(operation, arguments):
+    # Pipeline'da tohumsuz tek bir rastgele adım bile sonucu rastgele yapar
+    if operation == "run_pipeline":
+        return any(_unseeded(step, params or {}) for step, params in arguments.get("steps") or ())
+    return operation in SEEDED_OPERATIONS and arguments.get("seed") is None
+
+
+class MemoryCache:
+    def __init__(self, max_bytes):
+        """
+        Toplam boyutu bayt bütçesiyle sınırlı LRU önbellek.
+        :param max_bytes: Tutulacak değerlerin toplam en fazla boyutu.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._items[key] = value
+            self.current_bytes += size
+
+            # Bütçe aşıldıysa en eski kullanılanları at
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskCache:
+    def __init__(self, directory, max_bytes):
+        """
+        Dosya sisteminde tutulan, boyut sınırı aşıldığında en eski dosyaları silen önbellek.
+        :param directory: Önbellek dizini.
+        :param max_bytes: Dizindeki dosyaların toplam en fazla boyutu.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.current_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.is_file() and not entry.name.startswith(".")]
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            # Son erişim zamanını güncelle; tahliye sırası buna göre belirlenir
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+
+        path = self._path(key)
+        with self._lock:
+            try:
+                self.current_bytes -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self.current_bytes += len(value)
+            if self.current_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        # Diğer süreçlerin yazdıklarını da hesaba kat
+        self.current_bytes = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.current_bytes <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self.current_bytes -= size
+
+
+class ResultCache:
+    def __init__(self, memory_bytes=128 * 1024 * 1024, disk_dir=None, disk_bytes=1024 * 1024 * 1024):
+        """
+        İşlem sonuçlarını girdi içeriği, işlem adı ve parametrelere göre önbelleğe alır.
+        :param memory_bytes: Bellek katmanının bayt bütçesi.
+        :param disk_dir: Disk katmanı dizini (None ise disk katmanı kapalı).
+        :param disk_bytes: Disk katmanının bayt bütçesi.
+        """
+        self.memory = MemoryCache(memory_bytes)
+        self.disk = DiskCache(disk_dir, disk_bytes) if disk_dir else None
+        self.hits = Counter()
+        self.misses = 0
+        self.bypasses = 0
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def key_for(self, method, operation, args, kwargs):
+        """
+        Önbellek anahtarını üretir; önbelleğe alınamayan çağrılar için None döner.
+        Aynı girdinin farklı biçimlerde kodlanmış sonuçları ayrı anahtarlar alır.
+        :param method: Çağrılacak servis metodu (parametreleri normalize etmek için).
+        :param operation: İşlem adı.
+        """
+        arguments = self._bind(method, operation, args, kwargs)
+        if _unseeded(operation, arguments):
+            with self._lock:
+                self.bypasses += 1
+            return None
+
+        digest = hashlib.sha256(operation.encode())
+        for name, value in sorted(arguments.items()):
+            digest.update(name.encode())
+            if isinstance(value, _BYTES_TYPES):
+                digest.update(hashlib.sha256(value).digest())
+            else:
+                # Pipeline adımlarının parametre sözlükleri anahtar sırasından bağımsız serileştirilir
+                digest.update(json.dumps(value, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def _bind(self, method, operation, args, kwargs):
+        signature = self._signatures.get(operation)
+        if signature is None:
+            signature = self._signatures[operation] = inspect.signature(method)
+        # Çıktı biçimi adımın değil servis sarmalayıcısının parametresidir, ayrıca eklenir
+        kwargs = dict(kwargs)
+        output = kwargs.pop("output", None)
+        # Konumsal/isimli ve varsayılan değerli çağrılar aynı anahtarı üretsin
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        arguments["output"] = output
+        return arguments
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count_hit("memory")
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+                self._count_hit("disk")
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def _count_hit(self, tier):
+        with self._lock:
+            self.hits[tier] += 1
+
+    def snapshot(self):
+        """
+        Sayaçların ve katman boyutlarının kopyasını döndürür.
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "memory_bytes": self.memory.current_bytes,
+                "memory_items": len(self.memory),
+                "disk_bytes": self.disk.current_bytes if self.disk is not None else 0,
+            }
+
+
+class MaskCache:
+    def __init__(self, max_bytes):
+        """
+        Arka plan kaldırmanın ön plan maskelerini girdi pikselleri ve modele göre saklar.
+        Maskeler 8 bit gri ton bayt dizisi olarak tutulur; aynı fotoğrafın gölge ve çerçeve denemeleri çıkarımı tekrarlamaz.
+        :param max_bytes: Maskelerin toplam en fazla boyutu (0: önbellek kapalı).
+        """
+        self.memory = MemoryCache(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.memory.max_bytes > 0
+
+    @staticmethod
+    def key_for(pixels, model_name):
+        """
+        :param pixels: Maskesi çıkarılacak resmin bitişik NumPy dizisi.
+        :param model_name: Maskeyi üreten model.
+        """
+        digest = hashlib.sha256(pixels.data)
+        digest.update(repr((pixels.shape, str(pixels.dtype), model_name)).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        :return: Maskenin baytları veya None.
+        """
+        value = self.memory.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+
+    def snapshot(self):
+        """
+        Sayaçların ve boyutun kopyasını döndürür.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self.memory.current_bytes,
+                "items": len(self.memory),
+            }
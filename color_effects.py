@@ -0,0 +1,444 @@
+from functools import lru_cache, wraps
+
+import cv2
+import numpy as np
+from PIL import ImageColor
+
+import procedural
+
+# Wand'ın bağlandığı ImageMagick derlemesinin (Debian imagemagick-6.q16) piksel ölçeği.
+# Ara sonuçlar ImageMagick'teki gibi bu ölçekte tam sayıya yuvarlanır; eşikler aynı değerlerde oluşur.
+QUANTUM_RANGE = 65535
+_QUANTUM_PER_CHAR = 257
+_MAGICK_EPSILON = 1e-12
+
+# ImageMagick'in gri ton yoğunluğu (Rec. 709 luma, gama düzeltmesiz değerler üzerinde)
+_LUMA = np.array([[0.212656, 0.715158, 0.072186]], dtype=np.float32)
+
+_CHANNELS = {"red": 0, "green": 1, "blue": 2}
+
+# Efekt parametreleri -> kanal başına level(0, 1, gamma) ayarı; Wand uygulamasındaki kurallarla aynıdır
+_SELECTIVE_GAMMAS = {
+    "cyan": (1, -1, -1),
+    "magenta": (-1, 1, -1),
+    "yellow": (-1, -1, 1),
+}
+
+_SPLASH_KEEP = (0.4, 0.8, 1.2)
+_SPLASH_DROP = (0.0, 0.5, 0.8)
+_SPLASH_LEVELS = {
+    "red": (_SPLASH_KEEP, _SPLASH_DROP, _SPLASH_DROP),
+    "green": (_SPLASH_DROP, _SPLASH_KEEP, _SPLASH_DROP),
+    "blue": (_SPLASH_DROP, _SPLASH_DROP, _SPLASH_KEEP),
+    "yellow": (_SPLASH_KEEP, _SPLASH_KEEP, _SPLASH_DROP),
+}
+
+
+def _keeps_alpha(func):
+    # Efektler renk kanallarına uygulanır; RGBA girdide alfa kanalı olduğu gibi korunur
+    @wraps(func)
+    def wrapper(image_np, *args, **kwargs):
+        if image_np.shape[2] == 4:
+            return np.dstack([func(image_np[:, :, :3], *args, **kwargs), image_np[:, :, 3]])
+        return func(image_np, *args, **kwargs)
+    return wrapper
+
+
+def identity_curves():
+    """
+    Kanal başına 256 girişli eğriler: 8 bit girdinin ImageMagick ölçeğindeki değerleri.
+    :return: (3, 256) float64 dizi.
+    """
+    return np.tile(np.arange(256, dtype=np.float64) * _QUANTUM_PER_CHAR, (3, 1))
+
+
+def _quantize(values):
+    return np.clip(np.rint(values), 0, QUANTUM_RANGE)
+
+
+def level(values, black=0.0, white=1.0, gamma=1.0):
+    """
+    ImageMagick `-level` dönüşümü: siyah/beyaz noktalar arası doğrusal germe ve ardından gama.
+    Eğri dizilerine (LUT derlemek için) veya piksellere uygulanabilir.
+    :param values: ImageMagick ölçeğinde değerler.
+    :param black: Siyah nokta (0.0-1.0).
+    :param white: Beyaz nokta (0.0-1.0).
+    :param gamma: Gama; 1'den büyük değerler orta tonları aydınlatır.
+    """
+    black_point, white_point = QUANTUM_RANGE * black, QUANTUM_RANGE * white
+    span = white_point - black_point
+    scale = 1.0 / span if abs(span) >= _MAGICK_EPSILON else np.sign(span or 1.0) / _MAGICK_EPSILON
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        exponent = np.float64(1.0) / np.float64(gamma)
+        scaled = scale * (values - black_point)
+        # ImageMagick negatif değerlerin üssünü almaz; kırpma bunları sıfırlar
+        leveled = QUANTUM_RANGE * np.where(scaled < 0, scaled, np.power(np.maximum(scaled, 0), exponent))
+    return _quantize(np.nan_to_num(leveled, nan=0.0, posinf=QUANTUM_RANGE, neginf=0.0))
+
+
+def _lut(curves, dtype):
+    # (3, 256) eğriler -> cv2.LUT'un 3 kanallı tablo biçimi
+    return np.ascontiguousarray(curves.T.reshape(1, 256, 3).astype(dtype))
+
+
+def to_char_lut(curves):
+    """
+    Eğrileri 8 bit çıktılı LUT'a çevirir; efekt tek bir cv2.LUT geçişiyle uygulanır.
+    """
+    return _lut(np.rint(curves / _QUANTUM_PER_CHAR), np.uint8)
+
+
+def apply_curves(rgb, curves):
+    """
+    Eğrileri tek cv2.LUT geçişiyle uygular; sonraki kanallar arası adımlar için ImageMagick ölçeğinde float32 döndürür.
+    """
+    return cv2.LUT(rgb, _lut(curves, np.float32))
+
+
+def to_char(values):
+    """
+    ImageMagick ölçeğindeki float32 pikselleri 8 bit RGB'ye çevirir.
+    """
+    np.clip(values, 0, QUANTUM_RANGE, out=values)
+    return cv2.convertScaleAbs(values, alpha=1.0 / _QUANTUM_PER_CHAR)
+
+
+def pixel_intensity(values):
+    """
+    ImageMagick'in piksel yoğunluğu (Rec. 709 luma); transform_colorspace('gray') ve
+    kontrast germenin histogramı bu değeri kullanır.
+    :param values: ImageMagick ölçeğinde (H, W, 3) float32 dizi.
+    :return: (H, W) float32 dizi.
+    """
+    return cv2.transform(values, _LUMA)
+
+
+def _extremes(values):
+    # Kanal ekseninde np.max/np.min yavaştır; düzlemlere ayırıp OpenCV ile karşılaştırılır
+    red, green, blue = cv2.split(values)
+    return cv2.max(cv2.max(red, green), blue), cv2.min(cv2.min(red, green), blue), (red, green, blue)
+
+
+def lightness(values):
+    # HSL açıklığı: modulate(saturation=0) pikseli bu değere çeker
+    maximum, minimum, _ = _extremes(values)
+    return cv2.addWeighted(maximum, 0.5, minimum, 0.5, 0)
+
+
+def _histogram(gray):
+    # Kutular tam sayı değerlerin ortasından ayrılır; her değer en yakın tam sayının kutusuna düşer
+    histogram = cv2.calcHist([gray], [0], None, [QUANTUM_RANGE + 1], [-0.5, QUANTUM_RANGE + 0.5])
+    return histogram.ravel().astype(np.int64)
+
+
+def _stretch_bounds(gray, black_point, white_point):
+    """
+    Wand'ın contrast_stretch parametrelerini ImageMagick'in histogram sınırlarına çevirir.
+    Wand oranları piksel sayısına çevirir ve beyaz noktayı `piksel sayısı - beyaz` olarak iletir;
+    ImageMagick beyaz sınırı yukarıdan biriken sayı `beyaz`ı aşana kadar arar. Bu yüzden
+    beyaz oranı "beyaza doyurulacak piksel oranı" anlamına gelir ve siyah sınırın altına düşebilir.
+    :param gray: ImageMagick ölçeğinde (H, W) float32 yoğunluk dizisi.
+    :return: (siyah sınır, beyaz sınır)
+    """
+    histogram = _histogram(gray)
+    total = float(gray.size)
+    if white_point is None:
+        white_point = black_point
+    if 0.0 < black_point <= 1.0:
+        black_point *= total
+    if 0.0 < white_point <= 1.0:
+        white_point *= total
+    white_point = total - white_point
+
+    cumulative = np.cumsum(histogram)
+    black = int(np.searchsorted(cumulative, black_point, side="right"))
+    # Yukarıdan birikim; döngü 0. kutuya inmeden biter, hiç aşılmazsa sınır 0 olur
+    from_top = np.cumsum(histogram[:0:-1])
+    index = int(np.searchsorted(from_top, total - white_point, side="right"))
+    white = QUANTUM_RANGE - index if index < len(from_top) else 0
+    return black, white
+
+
+def _stretch(values, black, white):
+    # ImageMagick germe tablosu: siyahın altı 0, beyazın üstü tam değer, arası doğrusal
+    values = _quantize(values)
+    if black != white:
+        stretched = _quantize(QUANTUM_RANGE * (values - black) / (white - black))
+    else:
+        stretched = np.zeros_like(values)
+    stretched = np.where(values > white, QUANTUM_RANGE, stretched)
+    return np.where(values < black, 0, stretched)
+
+
+def contrast_stretch_curves(rgb, curves, black_point, white_point=None):
+    """
+    Eğrilerin ardından gelen contrast_stretch'i eğrilere katar.
+    Sınırlar, eğriler uygulanmış resmin yoğunluk histogramından bulunur (ImageMagick tüm kanallar için aynı sınırı kullanır).
+    :return: Germe eklenmiş (3, 256) eğriler.
+    """
+    black, white = _stretch_bounds(pixel_intensity(apply_curves(rgb, curves)), black_point, white_point)
+    return _stretch(curves, black, white)
+
+
+def contrast_stretch(values, black_point, white_point=None):
+    """
+    contrast_stretch'i ImageMagick ölçeğindeki float32 piksellere uygular (kanallar arası adımlardan sonra).
+    :param values: (H, W, 3) renkli veya (H, W) gri dizi; gri resimde yoğunluk pikselin kendisidir.
+    """
+    gray = values if values.ndim == 2 else pixel_intensity(values)
+    black, white = _stretch_bounds(gray, black_point, white_point)
+    if black >= white:
+        # Beyaz sınır siyahın altındaysa tablo eşiklemeye dönüşür (tam sayı değerlerde >= siyah, eşitse > siyah)
+        threshold = black - 0.5 if black > white else black + 0.5
+        return cv2.threshold(values, threshold, QUANTUM_RANGE, cv2.THRESH_BINARY)[1]
+    scale = QUANTUM_RANGE / (white - black)
+    result = values * np.float32(scale) - np.float32(black * scale)
+    return np.clip(result, 0, QUANTUM_RANGE, out=result)
+
+
+def modulate(values, brightness=100, saturation=100):
+    """
+    ImageMagick `modulate`: HSL uzayında açıklığı ve doygunluğu yüzde olarak ölçekler (ton değişmez).
+    Ton korunduğundan HSL'e gidip gelmek yerine her kanal, pikselin en küçük değerine göre
+    yeni renk aralığına ölçeklenir: v' = v * oran + (yeni en küçük - en küçük * oran).
+    :param values: ImageMagick ölçeğinde (H, W, 3) float32 dizi.
+    :return: Yeni float32 dizi.
+    """
+    maximum, minimum, channels = _extremes(values)
+    light = cv2.addWeighted(maximum, 0.5, minimum, 0.5, 0)
+
+    if brightness == 100:
+        # Açıklık değişmiyorsa renk aralığı doygunlukla orantılıdır: v' = L + k (v - L)
+        k = saturation / 100.0
+        result = cv2.merge([cv2.addWeighted(channel, k, light, 1.0 - k, 0) for channel in channels])
+        return np.clip(result, 0, QUANTUM_RANGE, out=result)
+
+    q = np.float32(QUANTUM_RANGE)
+    chroma = maximum - minimum
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # HSL doygunluğu; açıklığın yarıya göre konumuna bağlıdır
+        hsl_saturation = np.where(light <= q / 2, chroma / (2 * light), chroma / (2 * q - 2 * light))
+        hsl_saturation = np.nan_to_num(hsl_saturation, nan=0.0, posinf=0.0) * np.float32(saturation / 100.0)
+        new_light = light * np.float32(brightness / 100.0)
+        new_chroma = np.where(new_light <= q / 2, 2 * new_light, 2 * q - 2 * new_light) * hsl_saturation
+        ratio = np.nan_to_num(new_chroma / chroma, nan=0.0, posinf=0.0)
+    offset = new_light - new_chroma * np.float32(0.5) - minimum * ratio
+    result = cv2.merge([channel * ratio + offset for channel in channels])
+    return np.clip(result, 0, QUANTUM_RANGE, out=result)
+
+
+@lru_cache(maxsize=32)
+def _kernel_width(sigma):
+    # ImageMagick GetOptimalKernelWidth2D (radius=0): kenar ağırlığı ölçek adımının altına inene kadar büyür
+    alpha = 1.0 / (2.0 * sigma * sigma)
+    beta = 1.0 / (2.0 * np.pi * sigma * sigma)
+    width = 5
+    while True:
+        j = (width - 1) // 2
+        u = np.arange(-j, j + 1, dtype=np.float64)
+        normalize = np.sum(np.exp(-(u[:, None] ** 2 + u[None, :] ** 2) * alpha) * beta)
+        value = np.exp(-(j * j) * alpha) * beta / normalize
+        if value < 1.0 / QUANTUM_RANGE or value < _MAGICK_EPSILON:
+            return width - 2
+        width += 2
+
+
+def gaussian_blur(values, sigma):
+    """
+    ImageMagick gaussian_blur(radius=0) karşılığı: aynı çekirdek genişliği ve kenar pikseli tekrarı.
+    """
+    width = _kernel_width(float(sigma))
+    return cv2.GaussianBlur(values, (width, width), sigma, borderType=cv2.BORDER_REPLICATE)
+
+
+def sharpen(values, sigma):
+    """
+    ImageMagick sharpen(radius=0): 2 * piksel - normalize Gauss ortalaması.
+    """
+    result = cv2.addWeighted(values, 2.0, gaussian_blur(values, sigma), -1.0, 0)
+    return np.clip(result, 0, QUANTUM_RANGE, out=result)
+
+
+def overlay(source, destination):
+    """
+    ImageMagick 'overlay' birleştirmesi (opak resimler): koşul hedef piksele göre seçilir.
+    `img.composite(source, operator='overlay')` çağrısında `img` hedeftir.
+    :param source: (H, W) float32 düzlem.
+    :param destination: (H, W) float32 düzlem.
+    """
+    q = float(QUANTUM_RANGE)
+    result = cv2.multiply(source, destination, scale=2 / q)
+    light = cv2.multiply(q - source, q - destination, scale=-2 / q)
+    light += np.float32(q)
+    cv2.copyTo(light, cv2.compare(destination, q / 2, cv2.CMP_GE), result)
+    return result
+
+
+def screen(source, destination):
+    return cv2.subtract(cv2.add(source, destination), cv2.multiply(source, destination, scale=1 / QUANTUM_RANGE))
+
+
+def _color(name):
+    # ImageMagick renk adları CSS/SVG adlarıyla örtüşür; '#rrggbb' ve 'rgb(...)' de kabul edilir
+    try:
+        rgb = ImageColor.getrgb(name)
+    except ValueError:
+        raise ValueError(f"Geçersiz renk: {name}")
+    return np.array(rgb[:3], dtype=np.float32) * _QUANTUM_PER_CHAR
+
+
+@procedural.cached
+def vignette_mask(height, width, edge_opacity, sigma):
+    """
+    'radial-gradient:white-rgba(0,0,0,edge_opacity)' görüntüsünü bulanıklaştırıp çarpmanın karşılığı:
+    merkezde 1, en uzak kenarda 1 - edge_opacity olan ve yarıçapla doğrusal azalan çarpan.
+    Yalnızca boyuta bağlı olduğundan önbellekte tutulur.
+    :return: (H, W, 1) float32 dizi.
+    """
+    cy, cx = (height - 1) / 2.0, (width - 1) / 2.0
+    radius = max(max(width - 1, height - 1) / 2.0, _MAGICK_EPSILON)
+    y, x = np.ogrid[0:height, 0:width]
+    offset = np.hypot((x - cx).astype(np.float32), (y - cy).astype(np.float32)) / np.float32(radius)
+    mask = 1 - np.float32(edge_opacity) * np.minimum(offset, 1)
+    return gaussian_blur(mask, sigma)[:, :, None]
+
+
+@_keeps_alpha
+def selective_color(rgb, target_color="red", adjustment=0.2):
+    """
+    apply_selective_color: kanal başına gama ayarı; tamamı tek bir 8 bit LUT'tur.
+    """
+    if target_color in _CHANNELS:
+        signs = {_CHANNELS[target_color]: 1}
+    else:
+        signs = dict(enumerate(_SELECTIVE_GAMMAS.get(target_color, ())))
+
+    curves = identity_curves()
+    for channel, sign in signs.items():
+        curves[channel] = level(curves[channel], 0.0, 1.0, 1.0 + sign * adjustment)
+    return cv2.LUT(rgb, to_char_lut(curves))
+
+
+@_keeps_alpha
+def cross_process(rgb, intensity=0.3):
+    """
+    apply_cross_process: kanal level'ları ve kontrast germe tek LUT'ta, ardından doygunluk ve yeşil kayması.
+    """
+    curves = identity_curves()
+    curves[0] = level(curves[0], 0.0, 1.0, 1.2)
+    curves[2] = level(curves[2], 0.0, 1.0, 0.8)
+    curves = contrast_stretch_curves(rgb, curves, 0.1 * intensity)
+
+    values = modulate(apply_curves(rgb, curves), saturation=100 + 50 * intensity)
+    # Wand evaluate değeri ImageMagick ölçeğindedir (8 bit ölçeğinde değil)
+    values[:, :, 1] += np.float32(intensity * 10)
+    return to_char(values)
+
+
+@_keeps_alpha
+def infrared(rgb):
+    """
+    apply_infrared: kanal level'ları ve kontrast germe tek LUT'ta, ardından parlama ve modulate.
+    """
+    curves = identity_curves()
+    curves[0] = level(curves[0], 0.0, 0.8, 1.2)
+    curves[2] = level(curves[2], 0.2, 1.0, 0.8)
+    curves[1] = level(curves[1], 0.0, 1.0, 0.5)
+    curves = contrast_stretch_curves(rgb, curves, 0.1, 0.9)
+
+    values = apply_curves(rgb, curves)
+    glow = gaussian_blur(values, 3)
+    glow *= np.float32(0.3)
+    values = screen(glow, values)
+    return to_char(modulate(values, brightness=120, saturation=50))
+
+
+@_keeps_alpha
+def cinematic(rgb, tone="cool"):
+    """
+    apply_cinematic: kanal level'ları ve kontrast germe tek LUT'ta, ardından vinyet ve doygunluk.
+    """
+    cool, warm = (0.1, 0.9, 1.1), (0.1, 0.9, 0.95)
+    blue, red = (cool, warm) if tone == "cool" else (warm, cool)
+    curves = identity_curves()
+    curves[2] = level(curves[2], *blue)
+    curves[0] = level(curves[0], *red)
+    curves = contrast_stretch_curves(rgb, curves, 0.1, 0.9)
+
+    values = apply_curves(rgb, curves)
+    values *= vignette_mask(rgb.shape[0], rgb.shape[1], 0.3, 15)
+    return to_char(modulate(values, saturation=85))
+
+
+@_keeps_alpha
+def bleach_bypass(rgb, intensity=0.5):
+    """
+    apply_bleach_bypass: gerilmiş gri kopya overlay ile bindirilir, ardından doygunluk ve kontrast.
+    """
+    values = apply_curves(rgb, identity_curves())
+    gray = contrast_stretch(pixel_intensity(values), 0.1, 0.9)
+    gray *= np.float32(intensity)
+
+    values = cv2.merge([overlay(gray, channel) for channel in cv2.split(values)])
+    values = modulate(values, saturation=100 - 30 * intensity)
+    return to_char(contrast_stretch(values, 0.1 * intensity))
+
+
+@_keeps_alpha
+def duotone(rgb, color1="blue", color2="pink"):
+    """
+    apply_duotone: gri resmin üzerine yukarıdan aşağı color1 -> color2 geçişi overlay ile bindirilir.
+    Geçiş satır boyunca sabit olduğundan tam boyutlu geçiş resmi yerine tek sütun kullanılır.
+    """
+    height = rgb.shape[0]
+    offset = np.linspace(0.0, 1.0, height, dtype=np.float32) if height > 1 else np.zeros(1, np.float32)
+    start, end = _color(color1), _color(color2)
+    gradient = _quantize(start + (end - start) * offset[:, None]).astype(np.float32)
+
+    gray = lightness(apply_curves(rgb, identity_curves()))
+    values = cv2.merge([
+        overlay(np.ascontiguousarray(np.broadcast_to(gradient[:, channel:channel + 1], gray.shape)), gray)
+        for channel in range(3)
+    ])
+    return to_char(contrast_stretch(values, 0.15, 0.95))
+
+
+@_keeps_alpha
+def gradient_map(rgb, start_color="blue", end_color="red"):
+    """
+    apply_gradient_map: gri ton değeri başlangıç ve bitiş renkleri arasında renge eşlenir (256 girişli LUT).
+    """
+    start, end = _color(start_color), _color(end_color)
+    gray = cv2.transform(rgb, _LUMA)
+    ramp = np.linspace(0.0, 1.0, 256)[:, None]
+    lut = np.rint((start + (end - start) * ramp) / _QUANTUM_PER_CHAR).astype(np.uint8).reshape(1, 256, 3)
+    return cv2.LUT(cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB), lut)
+
+
+def color_splash(image_np, color_to_keep="red"):
+    """
+    apply_color_splash: seçilen rengi vurgulayan keskinleştirilmiş gri maske, siyah-beyaz resimle çarpılır.
+    Wand uygulamasındaki copy_opacity adımı siyah-beyaz resmin örtüsünü özgün resmin yoğunluğundan
+    (RGBA girdide alfa kanalından) alır; çarpma bu örtüyle yapılır.
+    """
+    rgb = image_np[:, :, :3]
+    values = apply_curves(rgb, identity_curves())
+    bw = lightness(values)
+
+    curves = identity_curves()
+    for channel, levels in enumerate(_SPLASH_LEVELS.get(color_to_keep, ())):
+        curves[channel] = level(curves[channel], *levels)
+    mask = pixel_intensity(apply_curves(rgb, curves))
+    mask = sharpen(mask, 3.0)
+
+    q = np.float32(QUANTUM_RANGE)
+    if image_np.shape[2] == 4:
+        coverage = image_np[:, :, 3].astype(np.float32) / 255
+    else:
+        coverage = pixel_intensity(values) / q
+    # multiply: Sc * (Dc * Da + 1 - Da); kaynak (maske) opaktır
+    result = mask * (bw / q * coverage + 1 - coverage)
+    result = cv2.cvtColor(to_char(result), cv2.COLOR_GRAY2RGB)
+    if image_np.shape[2] == 4:
+        return np.dstack([result, image_np[:, :, 3]])
+    return result
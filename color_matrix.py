@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+# Klasik sepya katsayıları (satırlar: çıkış R, G, B)
+SEPIA = np.array([
+    [0.393, 0.769, 0.189],
+    [0.349, 0.686, 0.168],
+    [0.272, 0.534, 0.131],
+], dtype=np.float32)
+
+# apply_filter'ın isimle kullanabildiği matris filtreleri; yeni filtreler buraya eklenir
+COLOR_MATRICES = {
+    "sepia": SEPIA,
+}
+
+
+def as_color_matrix(matrix):
+    """
+    3x3 veya 3x4 matrisi (ya da 9/12 elemanlı düz listeyi) float32 3x4 matrise çevirir.
+    Dördüncü sütun 0-255 ölçeğinde kanal başına eklenen sabittir.
+    :raises ValueError: Matris boyutu geçersizse.
+    """
+    values = np.asarray(matrix, dtype=np.float32)
+    if values.size not in (9, 12):
+        raise ValueError("Renk matrisi 3x3 veya 3x4 olmalıdır")
+    if not np.isfinite(values).all():
+        raise ValueError("Renk matrisi yalnızca sonlu sayılar içermelidir")
+
+    values = values.reshape(3, values.size // 3)
+    if values.shape[1] == 3:
+        values = np.hstack([values, np.zeros((3, 1), dtype=np.float32)])
+    return values
+
+
+def apply_color_matrix(image_np, matrix):
+    """
+    RGB veya RGBA diziye renk matrisini tek geçişte uygular; alfa kanalı korunur.
+    uint8 girdide hesap float32 SIMD ile yapılır ve sonuç doygunlukla (0-255) uint8'e yazılır,
+    float32 girdide sonuç 0-255 aralığına kırpılır. Ara float64 dizi oluşturulmaz.
+    :param image_np: (H, W, 3) veya (H, W, 4) uint8/float32 dizi.
+    :param matrix: 3x3 veya 3x4 renk matrisi.
+    :return: Girdiyle aynı tür ve boyutta dizi.
+    """
+    matrix = as_color_matrix(matrix)
+    rgb = image_np[:, :, :3]
+
+    if image_np.dtype == np.uint8:
+        result = cv2.transform(rgb, matrix)
+    else:
+        result = cv2.transform(rgb.astype(np.float32, copy=False), matrix)
+        np.clip(result, 0, 255, out=result)
+
+    if image_np.shape[2] == 4:
+        result = np.dstack([result, image_np[:, :, 3]])
+    return result
@@ -0,0 +1,130 @@
+import os
+import tempfile
+
+
+def env_str(name, default=None):
+    """
+    Ortam değişkenini metin olarak okur.
+    :param name: Değişken adı.
+    :param default: Değişken tanımlı değilse dönecek değer.
+    """
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+def env_int(name, default):
+    """
+    Ortam değişkenini tam sayı olarak okur.
+    """
+    value = env_str(name)
+    return int(value) if value is not None else default
+
+
+def env_float(name, default):
+    """
+    Ortam değişkenini ondalıklı sayı olarak okur.
+    """
+    value = env_str(name)
+    return float(value) if value is not None else default
+
+
+def env_bool(name, default=False):
+    """
+    Ortam değişkenini mantıksal değer olarak okur ("1", "true", "yes", "on").
+    """
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_list(name, default=()):
+    """
+    Virgülle ayrılmış ortam değişkenini listeye çevirir.
+    """
+    value = env_str(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Ön çatallı çok süreçli sunucu (prefork.py): modeller ana süreçte bir kez yüklenir, işçiler yazınca-kopyala paylaşır.
+# Aşağıdaki süreç başına bütçe ve sınırların varsayılanları işçilere bölünür; toplam tüketim işçi sayısıyla artmaz
+PREFORK_WORKERS = max(1, env_int("PREFORK_WORKERS", 1))
+PREFORK_GRACEFUL_TIMEOUT = env_float("PREFORK_GRACEFUL_TIMEOUT", 30.0)
+PREFORK_MEMORY_LOG_SECONDS = env_int("PREFORK_MEMORY_LOG_SECONDS", 60)
+# İşçilerin metriklerini /metrics yanıtında birleştirmek için paylaşma aralığı (saniye)
+PREFORK_METRICS_SECONDS = env_float("PREFORK_METRICS_SECONDS", 5.0)
+
+# Arka plan kaldırma modelleri
+MODEL_DIR = env_str("MODEL_DIR", os.path.expanduser("~/.u2net"))
+REMBG_MODELS = env_list("REMBG_MODELS", ["u2net"])
+REMBG_SESSION_POOL_SIZE = env_int("REMBG_SESSION_POOL_SIZE", 1)
+REMBG_SESSION_TIMEOUT = env_float("REMBG_SESSION_TIMEOUT", 30.0)
+REMBG_ALLOW_DOWNLOAD = env_bool("REMBG_ALLOW_DOWNLOAD", False)
+# İstekteki model=fast|balanced seviyelerinin modelleri; modeller REMBG_MODELS içinde de olmalıdır.
+# Varsayılanlar Docker imajına gömülen modellerdir; "best=isnet-general-use" model dosyası MODEL_DIR'e eklenince tanımlanır
+REMBG_MODEL_TIERS = env_list("REMBG_MODEL_TIERS", ["fast=u2netp", "balanced=u2net"])
+REMBG_BATCH_SIZE = env_int("REMBG_BATCH_SIZE", 8)
+REMBG_BATCH_WINDOW_MS = env_float("REMBG_BATCH_WINDOW_MS", 10.0)
+# Segmentasyon uzun kenarı bu boyuta küçültülmüş kopyada çalışır, maske kenarlara duyarlı büyütülür (0: kapalı)
+SEGMENTATION_PROXY_SIDE = env_int("SEGMENTATION_PROXY_SIDE", 0)
+# Aynı girdi ve modelin ön plan maskesi tekrar çıkarılmaz (süreç başına, 0: kapalı)
+MASK_CACHE_MB = env_int("MASK_CACHE_MB", 256 // PREFORK_WORKERS)
+
+# İşlem yürütme havuzları; süreç havuzu her işçide ayrı kurulduğundan CPU'lar işçilere bölünür
+EXECUTOR_PROCESS_WORKERS = env_int("EXECUTOR_PROCESS_WORKERS", max(1, (os.cpu_count() or 1) // PREFORK_WORKERS))
+EXECUTOR_THREAD_WORKERS = env_int("EXECUTOR_THREAD_WORKERS", 16)
+EXECUTOR_DEFAULT_ROUTE = env_str("EXECUTOR_DEFAULT_ROUTE", "process")
+EXECUTOR_ROUTES = env_list("EXECUTOR_ROUTES")
+EXECUTOR_START_METHOD = env_str("EXECUTOR_START_METHOD", "spawn")
+
+# Kabul denetimi: işlem sınıfı başına eşzamanlılık ve bekleme kuyruğu
+# ("segmentation=8:16,heavy=3:6,light=32:64"); tanımlanmayan sınıflar için yürütücü havuzlarına göre varsayılan kullanılır.
+# Sınırlar örnek genelidir; ön çatallı işçilerin her biri 1/PREFORK_WORKERS payını uygular
+ADMISSION_LIMITS = env_list("ADMISSION_LIMITS")
+ADMISSION_CLASSES = env_list("ADMISSION_CLASSES")
+ADMISSION_RETRY_AFTER = env_int("ADMISSION_RETRY_AFTER", 2)
+
+# Sonuç önbelleği (bellek katmanı süreç başına)
+RESULT_CACHE_MEMORY_MB = env_int("RESULT_CACHE_MEMORY_MB", 128 // PREFORK_WORKERS)
+RESULT_CACHE_DIR = env_str("RESULT_CACHE_DIR")
+RESULT_CACHE_DISK_MB = env_int("RESULT_CACHE_DISK_MB", 1024)
+
+# Döşemeli işleme (büyük resimlerde komşuluk filtreleri)
+TILE_SIZE = env_int("TILE_SIZE", 1024)
+TILE_MIN_MEGAPIXELS = env_float("TILE_MIN_MEGAPIXELS", 8.0)
+# Her işçi süreç kendi döşeme havuzunu kurar; CPU'lar süreç havuzundaki işçilere bölünür
+TILE_WORKERS = env_int("TILE_WORKERS", max(1, (os.cpu_count() or 1) // EXECUTOR_PROCESS_WORKERS))
+
+# Renk efektleri (selective color, cross process, infrared, cinematic, bleach bypass, duotone, gradient map, color splash):
+# "native" NumPy/OpenCV, "wand" ImageMagick uygulamasını seçer; efekt bazında "apply_duotone=wand" gibi ezilebilir
+COLOR_EFFECT_BACKEND = env_str("COLOR_EFFECT_BACKEND", "native")
+COLOR_EFFECT_BACKENDS = env_list("COLOR_EFFECT_BACKENDS")
+
+# Boyuta ve parametrelere bağlı maske/geçiş/çekirdek önbelleği (işçi süreç başına bütçe)
+PROCEDURAL_CACHE_MB = env_int("PROCEDURAL_CACHE_MB", 128 // PREFORK_WORKERS)
+
+# Yüz tespiti (akıllı kırpma)
+FACE_DETECT_MAX_SIDE = env_int("FACE_DETECT_MAX_SIDE", 640)
+FACE_CACHE_SIZE = env_int("FACE_CACHE_SIZE", 256)
+
+# Arka plan işleri (/jobs/)
+JOB_DIR = env_str("JOB_DIR", os.path.join(tempfile.gettempdir(), "image-api-jobs"))
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+JOB_MAX_QUEUED = env_int("JOB_MAX_QUEUED", 100)
+JOB_TTL_SECONDS = env_int("JOB_TTL_SECONDS", 3600)
+JOB_ORPHAN_SECONDS = env_int("JOB_ORPHAN_SECONDS", 600)
+
+# Yükleme
+MAX_UPLOAD_MB = env_int("MAX_UPLOAD_MB", 50)
+
+# Toplu işleme (/bulk/): tüm istek gövdesi için sınır; her resim ayrıca MAX_UPLOAD_MB ile sınırlıdır
+BULK_MAX_UPLOAD_MB = env_int("BULK_MAX_UPLOAD_MB", 2048)
+BULK_MAX_ITEMS = env_int("BULK_MAX_ITEMS", 5000)
+BULK_CONCURRENCY = env_int("BULK_CONCURRENCY", EXECUTOR_PROCESS_WORKERS)
+
+# Çıktı kodlama
+OUTPUT_FORMAT = env_str("OUTPUT_FORMAT", "auto")
+OUTPUT_LOSSY_FORMAT = env_str("OUTPUT_LOSSY_FORMAT", "jpeg")
+OUTPUT_PROFILE = env_str("OUTPUT_PROFILE", "balanced")
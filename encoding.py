@@ -0,0 +1,213 @@
+from collections import namedtuple
+from io import BytesIO
+
+from PIL import Image
+
+PNG = "png"
+JPEG = "jpeg"
+WEBP = "webp"
+# Saydam sonuçlar PNG, opak sonuçlar kayıplı biçimde kodlanır
+AUTO = "auto"
+
+FORMATS = (PNG, JPEG, WEBP)
+LOSSY_FORMATS = (JPEG, WEBP)
+
+MEDIA_TYPES = {
+    PNG: "image/png",
+    JPEG: "image/jpeg",
+    WEBP: "image/webp",
+}
+
+# Kodlayıcı profilleri: hız ile boyut arasındaki denge
+PROFILES = {
+    "fast": {"jpeg_quality": 80, "webp_quality": 75, "webp_method": 0, "compress_level": 1},
+    "balanced": {"jpeg_quality": 85, "webp_quality": 80, "webp_method": 4, "compress_level": 6},
+    "small": {"jpeg_quality": 78, "webp_quality": 72, "webp_method": 6, "compress_level": 9},
+}
+
+# Süreçler arasında taşınabilir ve önbellek anahtarında kararlı görünen kodlama seçimi
+OutputFormat = namedtuple("OutputFormat", ["format", "lossy_format", "profile", "quality", "compress_level"])
+
+DEFAULT_OUTPUT = OutputFormat(PNG, JPEG, "balanced", None, None)
+
+
+def parse_accept(accept):
+    """
+    Accept başlığındaki desteklenen resim türlerinin q değerlerini döndürür.
+    :param accept: Accept başlığı (boş veya None ise her tür kabul edilir).
+    :return: (biçim -> q sözlüğü, açıkça adı geçen biçimler kümesi)
+    """
+    explicit = {}
+    wildcard_image = None
+    wildcard_any = None
+
+    for item in (accept or "*/*").split(","):
+        media_type, _, params = item.strip().partition(";")
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if media_type == "image/*":
+            wildcard_image = quality
+        elif media_type == "*/*":
+            wildcard_any = quality
+        else:
+            for fmt, fmt_type in MEDIA_TYPES.items():
+                if media_type == fmt_type:
+                    explicit[fmt] = quality
+
+    # Daha özel tanım daha genel olanı ezer
+    fallback = wildcard_image if wildcard_image is not None else (wildcard_any or 0.0)
+    qualities = {fmt: explicit.get(fmt, fallback) for fmt in FORMATS}
+    return qualities, set(explicit)
+
+
+def negotiate(accept=None, requested=None, default_format=AUTO, default_lossy=JPEG,
+              profile="balanced", quality=None, compress_level=None):
+    """
+    İstemcinin istediği çıktı biçimini belirler.
+    :param accept: Accept başlığı.
+    :param requested: "format" sorgu parametresi (png, jpeg, webp, auto); Accept başlığından önceliklidir.
+    :param default_format: İstemci tercih belirtmediğinde kullanılacak biçim.
+    :param default_lossy: "auto" biçiminde, istemci WebP'yi açıkça istemediyse kullanılacak kayıplı biçim.
+    :param profile: Kodlayıcı profili (fast, balanced, small).
+    :param quality: JPEG/WebP kalitesi (1-100); profildeki değeri ezer.
+    :param compress_level: PNG sıkıştırma seviyesi (0-9); profildeki değeri ezer.
+    :return: OutputFormat
+    :raises ValueError: Biçim veya profil bilinmiyorsa ya da istemcinin kabul ettiği bir biçim yoksa.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Bilinmeyen kodlayıcı profili: {profile}")
+    if default_lossy not in LOSSY_FORMATS:
+        raise ValueError(f"Geçersiz kayıplı biçim: {default_lossy}")
+
+    if requested:
+        fmt = "jpeg" if requested.lower() == "jpg" else requested.lower()
+        if fmt not in FORMATS and fmt != AUTO:
+            raise ValueError(f"Desteklenmeyen çıktı biçimi: {requested}")
+        return OutputFormat(fmt, default_lossy, profile, quality, compress_level)
+
+    qualities, explicit = parse_accept(accept)
+    best = max(qualities.values())
+    if best <= 0:
+        raise ValueError("İstemcinin kabul ettiği resim biçimi desteklenmiyor")
+
+    top = [fmt for fmt in FORMATS if qualities[fmt] == best]
+    if len(top) == 1:
+        return OutputFormat(top[0], default_lossy, profile, quality, compress_level)
+
+    if not explicit:
+        # Yalnızca joker türler (veya başlık yok): sunucu varsayılanı geçerli
+        return OutputFormat(default_format, default_lossy, profile, quality, compress_level)
+
+    # Birden fazla biçim eşit tercih ediliyorsa karar sonucun saydamlığına bırakılır
+    if WEBP in top and WEBP in explicit:
+        lossy = WEBP
+    elif default_lossy in top:
+        lossy = default_lossy
+    else:
+        lossy = next(fmt for fmt in top if fmt in LOSSY_FORMATS)
+    # PNG kabul edilmiyorsa saydam sonuçlar için de alfa destekleyen WebP kullanılır
+    fmt = AUTO if PNG in top else WEBP
+    return OutputFormat(fmt, lossy, profile, quality, compress_level)
+
+
+def _has_alpha(image):
+    if image.mode in ("RGBA", "LA", "PA"):
+        # Alfa kanalı tamamen opaksa sonuç opak sayılır
+        return image.getchannel("A").getextrema()[0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+def resolve_format(output, has_alpha):
+    """
+    "auto" biçimini sonucun saydamlığına göre gerçek biçime çevirir.
+    """
+    if output.format != AUTO:
+        return output.format
+    return PNG if has_alpha else output.lossy_format
+
+
+def encode_pil(image, output=None):
+    """
+    PIL resmini istenen biçimde kodlar.
+    :param image: PIL resmi.
+    :param output: OutputFormat (None ise PNG).
+    :return: Kodlanmış resmin byte verisi (BytesIO).
+    """
+    output = output or DEFAULT_OUTPUT
+    settings = PROFILES[output.profile]
+    has_alpha = _has_alpha(image) if output.format in (AUTO, JPEG) else None
+    fmt = resolve_format(output, has_alpha)
+    output_buffer = BytesIO()
+
+    if fmt == JPEG:
+        if has_alpha:
+            # JPEG alfa taşımaz; saydam alanlar beyaz zemine oturtulur
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+            image = background
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output_buffer, format="JPEG",
+                   quality=output.quality or settings["jpeg_quality"])
+    elif fmt == WEBP:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        image.save(output_buffer, format="WEBP",
+                   quality=output.quality or settings["webp_quality"], method=settings["webp_method"])
+    else:
+        compress_level = output.compress_level
+        image.save(output_buffer, format="PNG",
+                   compress_level=settings["compress_level"] if compress_level is None else compress_level)
+
+    output_buffer.seek(0)
+    return output_buffer
+
+
+def encode_wand(img, output=None):
+    """
+    Wand resmini istenen biçimde kodlar.
+    :param img: Wand resmi.
+    :param output: OutputFormat (None ise PNG).
+    :return: Kodlanmış resmin byte verisi (BytesIO).
+    """
+    output = output or DEFAULT_OUTPUT
+    settings = PROFILES[output.profile]
+    fmt = resolve_format(output, img.alpha_channel)
+
+    if fmt == JPEG:
+        if img.alpha_channel:
+            img.background_color = "white"
+            img.alpha_channel = "remove"
+        img.compression_quality = output.quality or settings["jpeg_quality"]
+    elif fmt == WEBP:
+        img.compression_quality = output.quality or settings["webp_quality"]
+    else:
+        compress_level = output.compress_level
+        if compress_level is None:
+            compress_level = settings["compress_level"]
+        # ImageMagick PNG kalitesi: onlar basamağı zlib seviyesi, birler basamağı filtre (5: uyarlanabilir)
+        img.compression_quality = compress_level * 10 + 5
+
+    return BytesIO(img.make_blob(fmt))
+
+
+def media_type_for(output_buffer):
+    """
+    Kodlanmış verinin imzasına bakarak içerik türünü döndürür.
+    Önbellekten dönen veya işçi süreçte kodlanan sonuçlar için de doğru türü verir.
+    """
+    with output_buffer.getbuffer() as view:
+        header = bytes(view[:12])
+    if header.startswith(b"\xff\xd8"):
+        return MEDIA_TYPES[JPEG]
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return MEDIA_TYPES[WEBP]
+    return MEDIA_TYPES[PNG]
@@ -0,0 +1,212 @@
+import asyncio
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import metrics
+
+PROCESS = "process"
+THREAD = "thread"
+PIPELINE = "run_pipeline"
+
+# ONNX Runtime GIL'i bırakır ve oturum havuzu ana süreçte yaşar
+DEFAULT_ROUTES = {
+    "remove_background": THREAD,
+    "remove_background_and_add_shadow": THREAD,
+    "generate_social_media_profile": THREAD,
+}
+
+# Süreç havuzundaki her işçinin kendi servis örneği
+_worker_service = None
+
+
+def _init_worker(service_factory):
+    global _worker_service
+    _worker_service = service_factory()
+    # Ağır motorlar arka planda yüklenir; işçi ilk işi hemen almaya başlar
+    preload = getattr(_worker_service, "preload_backends", None)
+    if preload is not None:
+        preload()
+
+
+def _call_with_stats(method, args, kwargs):
+    # Aşama süreleri çağrıyı çalıştıran iş parçacığında toplanır ve sonuçla birlikte döner
+    metrics.begin_call()
+    try:
+        result = method(*args, **kwargs)
+    finally:
+        stats = metrics.end_call()
+    return result, stats
+
+
+def _run_in_worker(operation, args, kwargs):
+    result, stats = _call_with_stats(getattr(_worker_service, operation), args, kwargs)
+    # BytesIO yerine ham byte dizisi döndürülür; süreçler arası taşıması ucuz
+    return result.getvalue(), stats
+
+
+class OperationExecutor:
+    def __init__(self, service, service_factory, process_workers=None, thread_workers=4,
+                 default_route=PROCESS, routes=None, start_method="spawn", cache=None, admission=None):
+        """
+        Servis işlemlerini olay döngüsünü bloklamadan süreç veya iş parçacığı havuzunda çalıştırır.
+        :param service: Ana süreçteki servis örneği (iş parçacığı havuzu bunu kullanır).
+        :param service_factory: İşçi süreçlerde servis örneği oluşturan çağrılabilir.
+        :param process_workers: Süreç havuzu boyutu (varsayılan: CPU sayısı).
+        :param thread_workers: İş parçacığı havuzu boyutu.
+        :param default_route: Kuralı olmayan işlemler için havuz ("process" veya "thread").
+        :param routes: İşlem adı -> havuz eşlemesi; varsayılan kuralları ezer.
+        :param start_method: Süreç başlatma yöntemi ("spawn", "forkserver", "fork").
+        :param cache: Sonuç önbelleği (ResultCache); None ise önbellek kullanılmaz.
+        :param admission: Kabul denetimi (AdmissionController); None ise her işlem hemen başlatılır.
+        """
+        self.service = service
+        self.service_factory = service_factory
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.thread_workers = thread_workers
+        self.default_route = default_route
+        self.routes = dict(DEFAULT_ROUTES)
+        self.routes.update(routes or {})
+        self.start_method = start_method
+        self.cache = cache
+        self.admission = admission
+        self._process_pool = None
+        self._thread_pool = None
+
+        for operation, route in self.routes.items():
+            if route not in (PROCESS, THREAD):
+                raise ValueError(f"'{operation}' için geçersiz havuz: {route}")
+
+    def route_for(self, operation):
+        return self.routes.get(operation, self.default_route)
+
+    def _pipeline_steps(self, operation, args, kwargs):
+        if operation != PIPELINE:
+            return None
+        return [step for step, _ in kwargs.get("steps", args[1] if len(args) > 1 else ())]
+
+    def _route(self, operation, args, kwargs):
+        steps = self._pipeline_steps(operation, args, kwargs)
+        if steps:
+            # Adımlardan biri iş parçacığı havuzuna aitse (ör. arka plan kaldırma) pipeline orada çalışır
+            if any(self.route_for(step) == THREAD for step in steps):
+                return THREAD
+        return self.route_for(operation)
+
+    def _get_process_pool(self):
+        # Havuzlar ilk kullanımda oluşturulur; böylece import sırasında süreç açılmaz
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.service_factory,),
+            )
+        return self._process_pool
+
+    def _get_thread_pool(self):
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="image-op"
+            )
+        return self._thread_pool
+
+    async def run(self, operation, *args, output=None, background=False, **kwargs):
+        """
+        Servis işlemini yönlendirme kuralına göre uygun havuzda çalıştırır ve sonucu bekler.
+        :param operation: ImageProcessService metot adı.
+        :param output: Çıktı biçimi (encoding.OutputFormat); None ise servis varsayılanı (PNG).
+        :param background: Kendi eşzamanlılık sınırı olan arka plan işleri için True; kapasite doluysa 503 yerine sırada bekler.
+        :return: İşlenmiş resmin byte verisi (BytesIO).
+        """
+        if output is not None:
+            kwargs["output"] = output
+
+        if self.cache is None:
+            return await self._admitted_dispatch(operation, args, kwargs, background)
+
+        # Girdi özeti ve disk okuması olay döngüsünü bloklamasın
+        key, cached = await asyncio.to_thread(self._lookup, operation, args, kwargs)
+        if cached is not None:
+            # Önbellekte varsa çözme, işleme ve kodlama adımları tamamen atlanır
+            metrics.OPERATIONS.inc(operation=operation, pool="cache", result="ok")
+            return BytesIO(cached)
+
+        result = await self._admitted_dispatch(operation, args, kwargs, background)
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, result.getvalue())
+        return result
+
+    def _lookup(self, operation, args, kwargs):
+        key = self.cache.key_for(getattr(self.service, operation), operation, args, kwargs)
+        if key is None:
+            return None, None
+        return key, self.cache.get(key)
+
+    async def _admitted_dispatch(self, operation, args, kwargs, background=False):
+        # Önbellekten dönen sonuçlar kapasite harcamaz; yalnızca gerçekten çalışacak işlemler sınırlanır
+        if self.admission is None:
+            return await self._observed_dispatch(operation, args, kwargs)
+        async with self.admission.slot(operation, self._pipeline_steps(operation, args, kwargs), wait=background):
+            return await self._observed_dispatch(operation, args, kwargs)
+
+    async def _observed_dispatch(self, operation, args, kwargs):
+        pool = self._route(operation, args, kwargs)
+        started = time.perf_counter()
+        try:
+            result, stats = await self._dispatch(operation, pool, args, kwargs)
+        except Exception:
+            metrics.OPERATIONS.inc(operation=operation, pool=pool, result="error")
+            raise
+        metrics.OPERATIONS.inc(operation=operation, pool=pool, result="ok")
+        metrics.OPERATION_LATENCY.observe(time.perf_counter() - started, operation=operation, pool=pool)
+        metrics.observe_call(operation, stats)
+        return result
+
+    async def _dispatch(self, operation, pool, args, kwargs):
+        loop = asyncio.get_running_loop()
+
+        if pool == THREAD:
+            method = getattr(self.service, operation)
+            return await loop.run_in_executor(
+                self._get_thread_pool(), _call_with_stats, method, args, kwargs
+            )
+
+        try:
+            data, stats = await loop.run_in_executor(
+                self._get_process_pool(), _run_in_worker, operation, _picklable(args), kwargs
+            )
+        except BrokenProcessPool:
+            # Bir işçi öldüyse (ör. OOM) havuzu bir sonraki istek için yeniden kur
+            self._process_pool = None
+            raise
+        return BytesIO(data), stats
+
+    def shutdown(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+
+def _picklable(args):
+    # memoryview/mmap süreçler arasında taşınamaz; işçiye gönderilirken bir kez bytes'a kopyalanır
+    return tuple(bytes(arg) if isinstance(arg, (memoryview, mmap.mmap)) else arg for arg in args)
+
+
+def parse_routes(items):
+    """
+    "islem=havuz" biçimindeki kuralları sözlüğe çevirir.
+    :param items: ["reduce_noise=thread", "remove_text=process"] gibi liste.
+    """
+    routes = {}
+    for item in items:
+        operation, _, route = item.partition("=")
+        routes[operation.strip()] = route.strip()
+    return routes
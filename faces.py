@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+
+class FaceDetector:
+    def __init__(self, max_side=640, cache_size=256, cascade_path=CASCADE_PATH):
+        """
+        Haar cascade ile yüz tespiti yapar; sınıflandırıcı bir kez yüklenir ve tekrar kullanılır.
+        Tespit, uzun kenarı max_side ile sınırlı küçültülmüş gri kopya üzerinde yapılır, kutular asıl boyuta ölçeklenir.
+        :param max_side: Tespit kopyasının en uzun kenarı (0: küçültme yok).
+        :param cache_size: Önbellekte tutulacak en fazla tespit sonucu (0: önbellek yok).
+        :param cascade_path: Sınıflandırıcı XML dosyası.
+        """
+        self.max_side = max_side
+        self.cache_size = cache_size
+        self._classifier = cv2.CascadeClassifier(cascade_path)
+        if self._classifier.empty():
+            raise RuntimeError(f"Yüz sınıflandırıcısı yüklenemedi: {cascade_path}")
+        # CascadeClassifier iş parçacıkları arasında paylaşıldığında güvenli değildir
+        self._classifier_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _proxy(self, image_np):
+        height, width = image_np.shape[:2]
+        scale = 1.0
+        if self.max_side and max(width, height) > self.max_side:
+            scale = self.max_side / max(width, height)
+            size = (max(round(width * scale), 1), max(round(height * scale), 1))
+            image_np = cv2.resize(image_np, size, interpolation=cv2.INTER_AREA)
+        if image_np.ndim == 3:
+            image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
+        return np.ascontiguousarray(image_np), scale
+
+    def detect(self, image_np, scale_factor=1.3, min_neighbors=5):
+        """
+        Resimdeki yüzleri bulur.
+        :param image_np: RGB veya gri tonlamalı NumPy dizisi.
+        :param scale_factor: detectMultiScale ölçek adımı.
+        :param min_neighbors: detectMultiScale komşu eşiği.
+        :return: Asıl resim koordinatlarında (x, y, w, h) kutularından oluşan (N, 4) int dizisi.
+        """
+        gray, scale = self._proxy(image_np)
+
+        # Tespit sonucu yalnızca küçük kopyaya ve asıl boyuta bağlıdır; anahtar bunlardan üretilir
+        digest = hashlib.sha256(gray.data)
+        digest.update(repr((image_np.shape[:2], scale_factor, min_neighbors)).encode())
+        key = digest.hexdigest()
+
+        faces = self._cache_get(key)
+        if faces is None:
+            with self._classifier_lock:
+                found = self._classifier.detectMultiScale(gray, scale_factor, min_neighbors)
+            faces = np.asarray(found, dtype=np.float64).reshape(-1, 4)
+            faces = np.round(faces / scale).astype(np.int32)
+            faces.setflags(write=False)
+            self._cache_put(key, faces)
+        return faces
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            faces = self._cache.get(key)
+            if faces is not None:
+                self._cache.move_to_end(key)
+            return faces
+
+    def _cache_put(self, key, faces):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = faces
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,152 @@
+import io
+import mmap
+
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+
+# Starlette çok parçalı yüklemeleri bu boyuta kadar bellekte tutar, daha büyüklerini diske taşır
+SPOOL_MAX_BYTES = MultiPartParser.max_file_size
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, max_bytes):
+        super().__init__(status_code=413, detail=f"Yükleme boyutu sınırı aşıldı ({max_bytes} bayt)")
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, max_bytes, path_limits=None):
+        """
+        İstek gövdesini akarken sayar ve sınır aşıldığında yüklemeyi 413 ile keser.
+        Gövdenin tamamı belleğe veya diske alınmadan önce durdurulur.
+        :param app: Sarılacak ASGI uygulaması.
+        :param max_bytes: İzin verilen en büyük gövde boyutu (0 veya None: sınırsız).
+        :param path_limits: Yol -> sınır eşlemesi; ör. toplu yükleme yolunda daha büyük sınır.
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.path_limits.get(scope.get("path"), self.max_bytes)
+        if scope["type"] != "http" or not max_bytes:
+            await self.app(scope, receive, send)
+            return
+
+        # Content-Length biliniyorsa gövde hiç okunmadan reddedilir
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            error = UploadTooLarge(max_bytes)
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # FastAPI gövde ayrıştırırken HTTPException'ı olduğu gibi iletir
+                    raise UploadTooLarge(max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class UploadBuffer:
+    def __init__(self, upload):
+        """
+        Yüklenen dosyanın içeriğine erişim sağlar.
+        Bellekte tutulan küçük yüklemeler bir kez okunur; diske taşmış yüklemeler kopyalanmadan bellek eşlemesiyle okunur.
+        :param upload: Starlette UploadFile.
+        """
+        spooled = upload.file
+        self._mmap = None
+        size = spooled.seek(0, io.SEEK_END)
+        spooled.seek(0)
+
+        if size == 0:
+            # Boş dosya eşlenemez
+            self.view = memoryview(b"")
+        elif size <= SPOOL_MAX_BYTES:
+            # SpooledTemporaryFile bellekteki tamponunu dışarı açmaz; küçük yüklemelerde kopya ucuzdur
+            self.view = memoryview(spooled.read())
+        else:
+            # fileno() dosya hâlâ bellekteyse onu diske taşır; eşleme dosyanın diskteki içeriğini okur
+            fileno = spooled.fileno()
+            spooled.flush()
+            self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self._mmap)
+
+    def __len__(self):
+        return self.view.nbytes
+
+    def __enter__(self):
+        return self.view
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        try:
+            self.view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        except BufferError:
+            # İstek iptal edildiyse işçi iş parçacığı tamponu hâlâ okuyor olabilir;
+            # son referans bırakıldığında çöp toplayıcı serbest bırakır
+            pass
+
+
+class BufferReader(io.RawIOBase):
+    def __init__(self, buffer):
+        """
+        Bayt tamponunu (bytes, memoryview, mmap) kopyalamadan okunabilir dosya nesnesine çevirir.
+        io.BytesIO(memoryview) tamponun tamamını kopyalar; PIL bunun yerine bu okuyucudan parça parça okur.
+        """
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        end = min(self._position + len(target), len(self._view))
+        size = max(end - self._position, 0)
+        target[:size] = self._view[self._position:end]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_image_source(buffer):
+    """
+    PIL'in Image.open'ına verilecek, kopyasız dosya nesnesini döndürür.
+    bytes için io.BytesIO da kopyalamaz; diğer tamponlar BufferReader ile sarılır.
+    """
+    if isinstance(buffer, bytes):
+        return io.BytesIO(buffer)
+    return BufferReader(buffer)
+
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+
+import admission
+import encoding
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED = (DONE, FAILED)
+
+# start() kurtarma kipleri: bitmemiş tüm işler veya yalnızca bu işçi sırasının (ölen önceki işçinin) işleri
+RECOVER_ALL = "all"
+RECOVER_OWN = "own"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+# Oluşturulurken süreç çöktüğü için yerine taşınmamış geçici iş dizinlerinin silinmeden önce bekleme süresi (saniye)
+_TMP_GRACE_SECONDS = 3600
+
+
+class JobNotFound(LookupError):
+    pass
+
+
+class JobStore:
+    def __init__(self, directory):
+        """
+        İşleri diskte saklar; her iş kendi dizininde girdi, sonuç ve durum (meta.json) dosyalarını tutar.
+        Süreç yeniden başladığında yarım kalan işler buradan okunup tekrar kuyruğa alınır.
+        :param directory: İş dizinlerinin kök dizini.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id, name=""):
+        if not _JOB_ID.match(job_id):
+            raise JobNotFound(job_id)
+        return os.path.join(self.directory, job_id, name)
+
+    def create(self, job, image_data):
+        # İş geçici dizinde girdi ve durum dosyasıyla hazırlanıp tek adımda yerine taşınır;
+        # aynı anda çalışan all() durum dosyası henüz yazılmamış iş dizinini görüp silemez
+        tmp_dir = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with open(os.path.join(tmp_dir, "input"), "wb") as f:
+                f.write(image_data)
+            self._write_meta(tmp_dir, job)
+            os.rename(tmp_dir, self._path(job["id"]))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def save(self, job):
+        self._write_meta(self._path(job["id"]), job)
+
+    def _write_meta(self, directory, job):
+        # Yarım yazılmış durum dosyası okunmasın diye önce geçici dosyaya yaz
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+    def load(self, job_id):
+        try:
+            with open(self._path(job_id, "meta.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+            raise JobNotFound(job_id)
+
+    def read_input(self, job_id):
+        with open(self._path(job_id, "input"), "rb") as f:
+            return f.read()
+
+    def write_result(self, job_id, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self._path(job_id), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(job_id, "result"))
+        # Girdiye artık gerek yok
+        try:
+            os.remove(self._path(job_id, "input"))
+        except FileNotFoundError:
+            pass
+
+    def result_path(self, job_id):
+        return self._path(job_id, "result")
+
+    def delete(self, job_id):
+        shutil.rmtree(self._path(job_id), ignore_errors=True)
+
+    def all(self):
+        jobs = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if _JOB_ID.match(name):
+                try:
+                    jobs.append(self.load(name))
+                except JobNotFound:
+                    # Silinmekte olan iş dizini
+                    self.delete(name)
+            elif name.startswith(".tmp-"):
+                # Oluşturulurken süreç çöktüğü için yerine taşınmamış iş; hâlâ yazılıyor olabileceğinden hemen silinmez
+                path = os.path.join(self.directory, name)
+                try:
+                    if now - os.path.getmtime(path) > _TMP_GRACE_SECONDS:
+                        shutil.rmtree(path, ignore_errors=True)
+                except FileNotFoundError:
+                    pass
+        return jobs
+
+
+def _alive(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    def __init__(self, store, executor, workers=2, max_queued=100, ttl=3600, poll_interval=60, retry_after=2,
+                 orphan_after=600):
+        """
+        Uzun süren işlemleri arka planda çalıştırır; istemci iş kimliğiyle durumu sorgular ve sonucu indirir.
+        İşler yürütücünün havuzlarında çalışır; aynı anda en fazla `workers` iş yürütülür.
+        :param store: JobStore.
+        :param executor: OperationExecutor.
+        :param workers: Aynı anda çalışan en fazla iş.
+        :param max_queued: Bekleyen en fazla iş; aşılırsa yeni işler 503 ile reddedilir.
+        :param ttl: Biten işlerin (sonuç dahil) saklanma süresi (saniye).
+        :param poll_interval: Süresi dolan işlerin temizlenme aralığı (saniye).
+        :param retry_after: Kuyruk dolu olduğunda dönen Retry-After değeri (saniye).
+        :param orphan_after: Sahibi süreç ölmüş bitmemiş bir işin bu süre (saniye) güncellenmezse başarısız sayılması;
+            yeniden başlatılan işçi kendi işlerini bu sürede devralır.
+        """
+        self.store = store
+        self.executor = executor
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.retry_after = retry_after
+        self.orphan_after = orphan_after
+        self.worker = 0
+        self._queue = None
+        self._tasks = []
+        self._subscribers = {}
+
+    async def start(self, recover=RECOVER_ALL, worker=0):
+        """
+        :param recover: Bitmemiş işlerden hangileri yeniden kuyruğa alınır: RECOVER_ALL (önceki çalışmanın tüm işleri),
+            RECOVER_OWN (aynı sıradaki ölen işçinin işleri) veya None. Aynı iş dizinini paylaşan işçilerden (prefork)
+            ilk başlangıçta yalnızca biri tümünü alır; böylece aynı iş ikinci kez çalışmaz.
+        :param worker: Bu sürecin işçi sırası; işler sahibi olan işçi sırası ve süreç kimliğiyle kaydedilir.
+        """
+        self.worker = worker
+        self._queue = asyncio.Queue()
+        if recover:
+            jobs = await asyncio.to_thread(self.store.all)
+            for job in sorted(jobs, key=lambda job: job["created_at"]):
+                if job["status"] in FINISHED:
+                    continue
+                if recover == RECOVER_OWN and job.get("worker") != worker:
+                    continue
+                # İş bu sürece devredilir ve sırayla yeniden kuyruğa alınır
+                job.update(status=QUEUED, worker=worker, pid=os.getpid(), updated_at=time.time())
+                await asyncio.to_thread(self.store.save, job)
+                self._queue.put_nowait(job["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._expire_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, steps, image_data, output=None):
+        """
+        İşi diske yazar ve kuyruğa alır.
+        :param steps: Pipeline adımları: (işlem adı, parametre sözlüğü) çiftleri.
+        :param image_data: Yüklenen resmin byte verisi.
+        :param output: Çıktı biçimi (encoding.OutputFormat).
+        :return: İşin durum sözlüğü.
+        :raises admission.Overloaded: Kuyruk doluysa.
+        """
+        if self._queue.qsize() >= self.max_queued:
+            raise admission.Overloaded("jobs", self.retry_after)
+
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "steps": [[operation, params] for operation, params in steps],
+            "output": list(output) if output is not None else None,
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+            "media_type": None,
+            "worker": self.worker,
+            "pid": os.getpid(),
+        }
+        await asyncio.to_thread(self.store.create, job, image_data)
+        self._queue.put_nowait(job["id"])
+        return self._public(job)
+
+    async def get(self, job_id):
+        """
+        :raises JobNotFound: İş yoksa veya süresi dolduysa.
+        """
+        job = await asyncio.to_thread(self.store.load, job_id)
+        if self._expired(job, time.time()):
+            raise JobNotFound(job_id)
+        return self._public(job)
+
+    async def delete(self, job_id):
+        # Çalışan iş durdurulamaz; sonucu yazıldığında dizin yok olduğundan kaydedilmez
+        await self.get(job_id)
+        await asyncio.to_thread(self.store.delete, job_id)
+
+    async def events(self, job_id, heartbeat=15):
+        """
+        İşin durum değişikliklerini sırayla veren asenkron üreteç; iş bitince sona erer.
+        :param heartbeat: Bu süre (saniye) boyunca değişiklik olmazsa bağlantıyı canlı tutmak için None verilir.
+        """
+        subscriber = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(subscriber)
+        try:
+            job = await self.get(job_id)
+            yield job
+            while job["status"] not in FINISHED:
+                try:
+                    job = await asyncio.wait_for(subscriber.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # İş başka bir işçi süreçte çalışıyorsa değişiklikler yalnızca diskten görülür
+                    try:
+                        latest = await self.get(job_id)
+                    except JobNotFound:
+                        return
+                    if latest["updated_at"] == job["updated_at"]:
+                        yield None
+                        continue
+                    job = latest
+                yield job
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _update(self, job, **changes):
+        job.update(changes, updated_at=time.time())
+        try:
+            await asyncio.to_thread(self.store.save, job)
+        except FileNotFoundError:
+            # İş çalışırken silindi
+            return
+        for subscriber in self._subscribers.get(job["id"], ()):
+            subscriber.put_nowait(self._public(job))
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("İş yürütülemedi: %s", job_id)
+
+    async def _run(self, job_id):
+        try:
+            job = await asyncio.to_thread(self.store.load, job_id)
+            image_data = await asyncio.to_thread(self.store.read_input, job_id)
+        except (JobNotFound, FileNotFoundError):
+            # İş beklerken silindi
+            return
+
+        await self._update(job, status=RUNNING)
+        steps = [(operation, params) for operation, params in job["steps"]]
+        output = encoding.OutputFormat(*job["output"]) if job["output"] else None
+        try:
+            # Arka plan işleri kapasite dolu olduğunda reddedilmez, sırada bekler
+            result = await self.executor.run("run_pipeline", image_data, steps, output=output, background=True)
+        except Exception as exc:
+            await self._update(job, status=FAILED, error=str(exc) or type(exc).__name__)
+            return
+
+        try:
+            await asyncio.to_thread(self.store.write_result, job_id, result.getvalue())
+        except FileNotFoundError:
+            # İş çalışırken silindi
+            return
+        await self._update(job, status=DONE, media_type=encoding.media_type_for(result))
+
+    def _expired(self, job, now):
+        return job["status"] in FINISHED and now - job["updated_at"] > self.ttl
+
+    def _orphaned(self, job, now):
+        # Sahibi süreç ölmüş ve yerine başlatılan işçi tarafından devralınmamış iş hiç bitmez
+        return (job["status"] not in FINISHED and now - job["updated_at"] > self.orphan_after
+                and not _alive(job.get("pid")))
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                now = time.time()
+                for job in await asyncio.to_thread(self.store.all):
+                    if self._expired(job, now):
+                        await asyncio.to_thread(self.store.delete, job["id"])
+                    elif self._orphaned(job, now):
+                        # Başarısız sayılan iş süresi dolunca silinir
+                        await self._update(job, status=FAILED, error="İşi yürüten işçi süreç sonlandı")
+            except OSError:
+                logger.exception("Süresi dolan işler temizlenemedi")
+
+    def _public(self, job):
+        return {
+            "id": job["id"],
+            "status": job["status"],
+            "operations": [operation for operation, _ in job["steps"]],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "expires_at": job["updated_at"] + self.ttl if job["status"] in FINISHED else None,
+            "error": job["error"],
+            "media_type": job["media_type"],
+        }
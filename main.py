@@ -1,56 +1,393 @@
-from fastapi import FastAPI, File, UploadFile, Query
-from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+import admission
+import backends
+import bulk
+import color_matrix
+import config
+import encoding
+import ingest
+import jobs
+import metrics
+import prefork
+from cache import ResultCache
+from executor import OperationExecutor, parse_routes
 from service import ImageProcessService
 
-app = FastAPI(root_path="/")
-
 # Servis sınıfını başlat
 service = ImageProcessService()
 
+# İşlemleri olay döngüsü dışında çalıştıran yürütücü
+executor = OperationExecutor(
+    service,
+    ImageProcessService,
+    process_workers=config.EXECUTOR_PROCESS_WORKERS,
+    thread_workers=config.EXECUTOR_THREAD_WORKERS,
+    default_route=config.EXECUTOR_DEFAULT_ROUTE,
+    routes=parse_routes(config.EXECUTOR_ROUTES),
+    start_method=config.EXECUTOR_START_METHOD,
+    # Sınırlar örnek geneli içindir; ön çatallı işçilerin her biri kendi payını uygular
+    admission=admission.AdmissionController(
+        admission.divide_limits({
+            **admission.default_limits(config.EXECUTOR_PROCESS_WORKERS * config.PREFORK_WORKERS, config.REMBG_BATCH_SIZE),
+            **admission.parse_limits(config.ADMISSION_LIMITS),
+        }, config.PREFORK_WORKERS),
+        classes=parse_routes(config.ADMISSION_CLASSES),
+        retry_after=config.ADMISSION_RETRY_AFTER,
+    ),
+    cache=ResultCache(
+        memory_bytes=config.RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_dir=config.RESULT_CACHE_DIR,
+        disk_bytes=config.RESULT_CACHE_DISK_MB * 1024 * 1024,
+    ) if config.RESULT_CACHE_MEMORY_MB > 0 else None,
+)
+
+# Uzun süren işlemler için diskte kalıcı iş kuyruğu
+job_manager = jobs.JobManager(
+    jobs.JobStore(config.JOB_DIR),
+    executor,
+    workers=config.JOB_WORKERS,
+    max_queued=config.JOB_MAX_QUEUED,
+    ttl=config.JOB_TTL_SECONDS,
+    retry_after=config.ADMISSION_RETRY_AFTER,
+    orphan_after=config.JOB_ORPHAN_SECONDS,
+)
+
+# Başlangıç ısıtmasının durumu; /readyz bunu raporlar
+startup = {"started": time.monotonic(), "ready": False, "seconds": None, "error": None}
+
+async def warm_up():
+    # Motorlar içe aktarılır, modeller yüklenip ısıtılır; sunucu bu sırada /livez ve /readyz'e yanıt verir
+    try:
+        ok = await asyncio.to_thread(service.warm_up)
+    except Exception as exc:
+        startup["error"] = f"{type(exc).__name__}: {exc}"
+        return
+    if not ok:
+        startup["error"] = "Bazı motorlar yüklenemedi"
+        return
+    startup["seconds"] = time.monotonic() - startup["started"]
+    startup["ready"] = True
+    metrics.WARM_UP_SECONDS.set(startup["seconds"])
+
+@asynccontextmanager
+async def lifespan(app):
+    # Isıtma arka planda sürer; yeni kopya hemen dinlemeye başlar, trafik /readyz 200 dönünce yönlendirilir
+    warm_up_task = asyncio.create_task(warm_up())
+    # Ön çatallı işçiler metriklerini diğer işçilerin /metrics yanıtları için paylaşır
+    metrics_task = asyncio.create_task(prefork.publish_metrics(config.PREFORK_METRICS_SECONDS))
+    # Önceki çalışmadan kalan işler yeniden kuyruğa alınır
+    await job_manager.start(recover=prefork.recover_jobs, worker=prefork.worker)
+    yield
+    warm_up_task.cancel()
+    metrics_task.cancel()
+    await job_manager.stop()
+    executor.shutdown()
+
+app = FastAPI(root_path="/", lifespan=lifespan)
+app.add_middleware(
+    ingest.UploadSizeLimitMiddleware,
+    max_bytes=config.MAX_UPLOAD_MB * 1024 * 1024,
+    path_limits={"/bulk/": config.BULK_MAX_UPLOAD_MB * 1024 * 1024},
+)
+# En dışta: boyut sınırıyla reddedilen istekler de ölçülür
+app.add_middleware(metrics.MetricsMiddleware)
+
+metrics.REGISTRY.register_collector(metrics.batcher_collector(service.batcher))
+metrics.REGISTRY.register_collector(metrics.mask_cache_collector(service.masks))
+metrics.REGISTRY.register_collector(metrics.admission_collector(executor.admission))
+metrics.REGISTRY.register_collector(metrics.memory_collector(prefork.memory_usage))
+if executor.cache is not None:
+    metrics.REGISTRY.register_collector(metrics.cache_collector(executor.cache))
+
+def output_format(
+    request: Request,
+    requested: str = Query(None, alias="format", regex="^(png|jpe?g|webp|auto)$"),
+    quality: int = Query(None, ge=1, le=100),
+    compress_level: int = Query(None, ge=0, le=9),
+    profile: str = Query(None, regex="^(" + "|".join(encoding.PROFILES) + ")$"),
+):
+    """
+    Çıktı biçimini "format" sorgu parametresi veya Accept başlığına göre belirler.
+    """
+    try:
+        return encoding.negotiate(
+            request.headers.get("accept"),
+            requested,
+            default_format=config.OUTPUT_FORMAT,
+            default_lossy=config.OUTPUT_LOSSY_FORMAT,
+            profile=profile or config.OUTPUT_PROFILE,
+            quality=quality,
+            compress_level=compress_level,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=406, detail=str(exc))
+
+def segmentation_model(
+    model: str = Query(None, description="Arka plan kaldırma modeli (ör. u2netp) veya kalite seviyesi: fast, balanced, best"),
+):
+    """
+    İstenen modeli veya kalite seviyesini yüklü modellerden birine çevirir; boşsa varsayılan model kullanılır.
+    """
+    try:
+        return service.sessions.resolve(model)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+def image_response(output_buffer):
+    # Biçim "auto" ise sonuca göre seçildiğinden içerik türü kodlanmış veriden okunur
+    return StreamingResponse(
+        output_buffer,
+        media_type=encoding.media_type_for(output_buffer),
+        headers={"Vary": "Accept"},
+    )
+
+async def process_upload(operation, file, *args, output=None, **kwargs):
+    """
+    Yüklenen dosyayı okuyup servis işlemini yürütücü üzerinden çalıştırır.
+    """
+    # Yükleme kopyalanmadan (bellek tamponu veya bellek eşlemesi üzerinden) işlenir
+    with ingest.UploadBuffer(file) as image_data:
+        output_buffer = await executor.run(operation, image_data, *args, output=output, **kwargs)
+    return image_response(output_buffer)
+
+@app.get("/livez")
+async def livez():
+    """
+    Süreç ve olay döngüsü çalışıyorsa 200 döner; modellerin durumuna bakmaz.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Motorlar içe aktarılıp modeller ısıtıldıysa 200, değilse 503 döner; her motorun ve modelin durumunu raporlar.
+    """
+    body = {
+        "ready": startup["ready"],
+        "warm_up_seconds": startup["seconds"],
+        "error": startup["error"],
+        "engines": backends.status(),
+        "models": service.sessions.status(),
+    }
+    return JSONResponse(body, status_code=200 if startup["ready"] else 503)
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    İstek, işlem aşaması, önbellek ve toplu çıkarım metriklerini Prometheus metin biçiminde döndürür.
+    """
+    return Response(prefork.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/remove-bg/")
-async def remove_bg(file: UploadFile = File(...), width: int = None, height: int = None):
+async def remove_bg(
+    file: UploadFile = File(...),
+    width: int = None,
+    height: int = None,
+    model=Depends(segmentation_model),
+    output=Depends(output_format)
+):
     """
     Yüklenen resmin arka planını kaldırır.
     """
-    image_data = await file.read()
-    output_buffer = service.remove_background(image_data, width, height)
-    return StreamingResponse(output_buffer, media_type="image/png")
+    return await process_upload("remove_background", file, width, height, model=model, output=output)
+
+@app.post("/pipeline/")
+async def pipeline(file: UploadFile = File(...), steps: str = Form(...), output=Depends(output_format)):
+    """
+    Resmi bir kez çözüp sıralı işlemleri uygular ve yalnızca sonucu kodlar.
+    steps: [{"operation": "remove_background"}, {"operation": "add_shadow", "params": {}}] biçiminde JSON.
+    """
+    return await process_upload("run_pipeline", file, parse_steps(steps), output=output)
+
+def parse_steps(steps):
+    """
+    JSON pipeline adımlarını (işlem adı, parametre sözlüğü) çiftlerine çevirir ve doğrular.
+    """
+    try:
+        parsed = [(step["operation"], step.get("params", {})) for step in json.loads(steps)]
+        service.validate_pipeline(parsed)
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise HTTPException(status_code=400, detail=f"Geçersiz pipeline: {exc}")
+    return parsed
+
+@app.post("/jobs/", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    operation: str = Form(None),
+    params: str = Form(None),
+    steps: str = Form(None),
+    output=Depends(output_format)
+):
+    """
+    İşlemi arka planda çalışacak bir iş olarak kuyruğa alır ve iş kimliğini döndürür.
+    Tek işlem için operation (ve JSON params), birden fazla işlem için /pipeline/ biçiminde steps verilir.
+    """
+    if steps is None:
+        if not operation:
+            raise HTTPException(status_code=400, detail="operation veya steps verilmelidir")
+        try:
+            steps = json.dumps([{"operation": operation, "params": json.loads(params or "{}")}])
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Geçersiz params: {exc}")
+    parsed = parse_steps(steps)
+
+    with ingest.UploadBuffer(file) as image_data:
+        job = await job_manager.submit(parsed, image_data, output=output)
+    return JSONResponse(job, status_code=202, headers={"Location": f"/jobs/{job['id']}"})
+
+@app.post("/bulk/")
+async def bulk_process(
+    archive: UploadFile = File(None),
+    files: List[UploadFile] = File(None),
+    operation: str = Form(None),
+    params: str = Form(None),
+    steps: str = Form(None),
+    output=Depends(output_format)
+):
+    """
+    Zip arşivindeki (archive) veya çok parçalı yüklenen (files) resimlere aynı işlemi uygular.
+    Sonuçlar bittikçe zip girdisi olarak akıtılır; arşivin sonunda her resmin durumunu içeren manifest.json bulunur.
+    Tek işlem için operation (ve JSON params), birden fazla işlem için /pipeline/ biçiminde steps verilir.
+    """
+    if steps is not None:
+        parsed = parse_steps(steps)
+
+        def run(image_data):
+            return executor.run("run_pipeline", image_data, parsed, output=output, background=True)
+    elif operation:
+        try:
+            operation_params = service.validate_operation(operation, json.loads(params or "{}"))
+        except (ValueError, AttributeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+        def run(image_data):
+            return executor.run(operation, image_data, output=output, background=True, **operation_params)
+    else:
+        raise HTTPException(status_code=400, detail="operation veya steps verilmelidir")
+
+    max_item_bytes = config.MAX_UPLOAD_MB * 1024 * 1024 or float("inf")
+    try:
+        if archive is not None:
+            items, spool = await asyncio.to_thread(bulk.spool_archive, archive.file, config.BULK_MAX_ITEMS, max_item_bytes)
+        elif files:
+            items, spool = await asyncio.to_thread(bulk.spool_files, files, config.BULK_MAX_ITEMS, max_item_bytes)
+        else:
+            raise HTTPException(status_code=400, detail="archive veya files verilmelidir")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return StreamingResponse(
+        bulk.stream_results(items, run, config.BULK_CONCURRENCY, spool),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="results.zip"'},
+    )
+
+async def get_job_or_404(job_id):
+    try:
+        return await job_manager.get(job_id)
+    except jobs.JobNotFound:
+        raise HTTPException(status_code=404, detail="İş bulunamadı veya süresi doldu")
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    İşin durumunu döndürür (queued, running, done, failed).
+    """
+    return await get_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    İşin durum değişikliklerini server-sent events olarak akıtır; iş bitince akış kapanır.
+    """
+    await get_job_or_404(job_id)
+
+    async def stream():
+        async for job in job_manager.events(job_id):
+            if job is None:
+                # Vekil sunucular boşta kalan bağlantıyı kapatmasın
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(job)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """
+    Biten işin sonucunu indirir.
+    """
+    job = await get_job_or_404(job_id)
+    if job["status"] == jobs.FAILED:
+        raise HTTPException(status_code=409, detail=f"İş başarısız oldu: {job['error']}")
+    if job["status"] != jobs.DONE:
+        raise HTTPException(status_code=409, detail="İş henüz tamamlanmadı")
+    return FileResponse(job_manager.store.result_path(job_id), media_type=job["media_type"])
+
+@app.delete("/jobs/{job_id}", status_code=204)
+async def delete_job(job_id: str):
+    """
+    İşi ve sonucunu siler.
+    """
+    await get_job_or_404(job_id)
+    await job_manager.delete(job_id)
+    return Response(status_code=204)
 
 @app.post("/add-shadow/")
-async def add_shadow(file: UploadFile = File(...)):
+async def add_shadow(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Yüklenen resme gölge ekler.
     """
-    image_data = await file.read()
-    shadow_buffer = service.add_shadow(image_data)
-    return StreamingResponse(shadow_buffer, media_type="image/png")
+    return await process_upload("add_shadow", file, output=output)
 
 @app.post("/apply-filter/")
-async def apply_filter(file: UploadFile = File(...), filter_type: str = "grayscale"):
+async def apply_filter(file: UploadFile = File(...), filter_type: str = "grayscale", output=Depends(output_format)):
     """
     Resme sepia, grayscale veya negatif filtre uygular.
     """
-    image_data = await file.read()
-    filtered_image = service.apply_filter(image_data, filter_type)
-    return StreamingResponse(filtered_image, media_type="image/png")
+    return await process_upload("apply_filter", file, filter_type, output=output)
+
+@app.post("/color-matrix/")
+async def color_matrix_filter(
+    file: UploadFile = File(...),
+    matrix: str = Query(..., description="Satır sıralı 3x4 (veya 3x3) matris, virgülle ayrılmış 12 (veya 9) sayı"),
+    output=Depends(output_format)
+):
+    """
+    Resme isteğe bağlı 3x4 renk matrisi uygular; dördüncü sütun 0-255 ölçeğinde sabit ektir.
+    """
+    try:
+        values = tuple(float(value) for value in matrix.split(","))
+        color_matrix.as_color_matrix(values)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Geçersiz renk matrisi: {exc}")
+    return await process_upload("apply_color_matrix", file, values, output=output)
 
 @app.post("/resize-image/")
-async def resize_image(file: UploadFile = File(...), width: int = Query(...), height: int = Query(...)):
+async def resize_image(file: UploadFile = File(...), width: int = Query(...), height: int = Query(...), output=Depends(output_format)):
     """
     Resmi belirtilen genişlik ve yükseklik değerine göre yeniden boyutlandırır.
     """
-    image_data = await file.read()
-    resized_image = service.resize_image(image_data, width, height)
-    return StreamingResponse(resized_image, media_type="image/png")
+    return await process_upload("resize_image", file, width, height, output=output)
 
 @app.post("/rotate-image/")
-async def rotate_image(file: UploadFile = File(...), angle: float = Query(...)):
+async def rotate_image(file: UploadFile = File(...), angle: float = Query(...), output=Depends(output_format)):
     """
     Resmi belirli bir açıya göre döndürür.
     """
-    image_data = await file.read()
-    rotated_image = service.rotate_image(image_data, angle)
-    return StreamingResponse(rotated_image, media_type="image/png")
+    return await process_upload("rotate_image", file, angle, output=output)
 
 @app.post("/add-text/")
 async def add_text(
@@ -58,23 +395,20 @@ async def add_text(
     text: str = "Test",
     x: int = 10,
     y: int = 10,
-    font_size: int = 30
+    font_size: int = 30,
+    output=Depends(output_format)
 ):
     """
     Resmin üzerine metin ekler.
     """
-    image_data = await file.read()
-    text_image = service.add_text(image_data, text, (x, y), font_size)
-    return StreamingResponse(text_image, media_type="image/png")
+    return await process_upload("add_text", file, text, (x, y), font_size, output=output)
 
 @app.post("/sketch-effect/")
-async def sketch_effect(file: UploadFile = File(...)):
+async def sketch_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resmi çizim efektine çevirir.
     """
-    image_data = await file.read()
-    sketch_image = service.sketch_effect(image_data)
-    return StreamingResponse(sketch_image, media_type="image/png")
+    return await process_upload("sketch_effect", file, output=output)
 
 @app.post("/crop/")
 async def crop_image(
@@ -82,41 +416,34 @@ async def crop_image(
     left: int = 0,
     top: int = 0,
     right: int = 100,
-    bottom: int = 100
+    bottom: int = 100,
+    output=Depends(output_format)
 ):
     """
     Resmi belirtilen koordinatlar üzerinden kırpar.
     """
-    image_data = await file.read()
-    cropped_image = service.crop_image(image_data, left, top, right, bottom)
-    return StreamingResponse(cropped_image, media_type="image/png")
+    return await process_upload("crop_image", file, left, top, right, bottom, output=output)
 
 @app.post("/sharpen/")
-async def sharpen_image(file: UploadFile = File(...)):
+async def sharpen_image(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resmi keskinleştirir.
     """
-    image_data = await file.read()
-    sharpened_image = service.sharpen_image(image_data)
-    return StreamingResponse(sharpened_image, media_type="image/png")
+    return await process_upload("sharpen_image", file, output=output)
 
 @app.post("/edge-detection/")
-async def edge_detection(file: UploadFile = File(...)):
+async def edge_detection(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resimde kenar algılama işlemi yapar.
     """
-    image_data = await file.read()
-    edge_detected_image = service.edge_detection(image_data)
-    return StreamingResponse(edge_detected_image, media_type="image/png")
+    return await process_upload("edge_detection", file, output=output)
 
 @app.post("/pixelate/")
-async def pixelate_image(file: UploadFile = File(...), pixel_size: int = 10):
+async def pixelate_image(file: UploadFile = File(...), pixel_size: int = 10, output=Depends(output_format)):
     """
     Resme mozaik (pixelate) efekti uygular.
     """
-    image_data = await file.read()
-    pixelated_image = service.pixelate_image(image_data, pixel_size)
-    return StreamingResponse(pixelated_image, media_type="image/png")
+    return await process_upload("pixelate_image", file, pixel_size, output=output)
 
 @app.post("/basic-shadow/")
 async def basic_shadow(
@@ -125,15 +452,12 @@ async def basic_shadow(
     blur_radius: int = 10,
     offset_x: int = 20,
     offset_y: int = 20,
+    output=Depends(output_format)
 ):
     """
     Temel gölge efekti ekler.
     """
-    image_data = await file.read()
-    shadowed_image = service.apply_basic_shadow(
-        image_data, shadow_opacity, blur_radius, (offset_x, offset_y)
-    )
-    return StreamingResponse(shadowed_image, media_type="image/png")
+    return await process_upload("apply_basic_shadow", file, shadow_opacity, blur_radius, (offset_x, offset_y), output=output)
 
 @app.post("/realistic-shadow/")
 async def realistic_shadow(
@@ -142,438 +466,382 @@ async def realistic_shadow(
     shadow_opacity: int = 120,
     blur_radius: int = 15,
     shadow_length: float = 1.0,
+    output=Depends(output_format)
 ):
     """
     Işığın geldiği açıya göre gerçekçi gölge ekler.
     """
-    image_data = await file.read()
-    shadowed_image = service.apply_realistic_shadow(
-        image_data, light_angle, shadow_opacity, blur_radius, shadow_length
-    )
-    return StreamingResponse(shadowed_image, media_type="image/png")
+    return await process_upload("apply_realistic_shadow", file, light_angle, shadow_opacity, blur_radius, shadow_length, output=output)
 
 @app.post("/standardize-aspect-ratio/")
 async def standardize_aspect_ratio(
     file: UploadFile = File(...),
     target_width: int = 500,
-    target_height: int = 500
+    target_height: int = 500,
+    output=Depends(output_format)
 ):
     """
     Resmin oranını standart hale getirip, hedef boyutlarda arka plan ekler.
     """
-    image_data = await file.read()
-    result = service.standardize_aspect_ratio(image_data, target_width, target_height)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("standardize_aspect_ratio", file, target_width, target_height, output=output)
 
 @app.post("/remove-bg-and-add-shadow/")
-async def remove_bg_and_add_shadow(file: UploadFile = File(...)):
+async def remove_bg_and_add_shadow(file: UploadFile = File(...), model=Depends(segmentation_model), output=Depends(output_format)):
     """
     Arka planı kaldırır ve gölge ekler.
     """
-    image_data = await file.read()
-    result = service.remove_background_and_add_shadow(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("remove_background_and_add_shadow", file, model=model, output=output)
 
 @app.post("/generate-social-profile/")
-async def generate_social_profile(file: UploadFile = File(...)):
+async def generate_social_profile(file: UploadFile = File(...), model=Depends(segmentation_model), output=Depends(output_format)):
     """
     Yuvarlak sosyal medya profil fotoğrafı oluşturur.
     """
-    image_data = await file.read()
-    result = service.generate_social_media_profile(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("generate_social_media_profile", file, model=model, output=output)
 
 @app.post("/generate-social-media-profile/")
-async def generate_social_media_profile(file: UploadFile = File(...)):
+async def generate_social_media_profile(file: UploadFile = File(...), model=Depends(segmentation_model), output=Depends(output_format)):
     """
     Yuvarlak sosyal medya profil fotoğrafı oluşturur.
     """
-    image_data = await file.read()
-    result = service.generate_social_media_profile(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("generate_social_media_profile", file, model=model, output=output)
 
 @app.post("/remove-text/")
-async def remove_text(file: UploadFile = File(...)):
+async def remove_text(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resimdeki metin alanlarını siler.
     """
-    image_data = await file.read()
-    result = service.remove_text(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("remove_text", file, output=output)
 
 @app.post("/cartoon-effect/")
-async def cartoon_effect(file: UploadFile = File(...)):
+async def cartoon_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resmi çizgi film tarzına dönüştürür.
     """
-    image_data = await file.read()
-    result = service.apply_cartoon_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_cartoon_effect", file, output=output)
 
 @app.post("/glitch-effect/")
 async def glitch_effect(
     file: UploadFile = File(...),
-    intensity: float = Query(0.1, ge=0, le=1)
+    intensity: float = Query(0.1, ge=0, le=1),
+    seed: int = Query(None, ge=0),
+    output=Depends(output_format)
 ):
     """
     Resme glitch (bozulma) efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_glitch_effect(image_data, intensity)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_glitch_effect", file, intensity, seed, output=output)
 
 @app.post("/neon-effect/")
 async def neon_effect(
     file: UploadFile = File(...),
-    glow_amount: float = Query(2.5, ge=0, le=5)
+    glow_amount: float = Query(2.5, ge=0, le=5),
+    output=Depends(output_format)
 ):
     """
     Resme neon efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_neon_effect(image_data, glow_amount)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_neon_effect", file, glow_amount, output=output)
 
 @app.post("/vintage-effect/")
-async def vintage_effect(file: UploadFile = File(...)):
+async def vintage_effect(file: UploadFile = File(...), seed: int = Query(None, ge=0), output=Depends(output_format)):
     """
     Resme vintage/eski fotoğraf efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_vintage_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_vintage_effect", file, seed, output=output)
 
 @app.post("/beautify-face/")
-async def beautify_face(file: UploadFile = File(...)):
+async def beautify_face(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Yüz güzelleştirme efekti uygular.
     """
-    image_data = await file.read()
-    result = service.beautify_face(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("beautify_face", file, output=output)
 
 @app.post("/hdr-effect/")
-async def hdr_effect(file: UploadFile = File(...)):
+async def hdr_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     HDR efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_hdr_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_hdr_effect", file, output=output)
 
 @app.post("/smart-crop/")
 async def smart_crop(
     file: UploadFile = File(...),
     target_width: int = Query(500),
-    target_height: int = Query(500)
+    target_height: int = Query(500),
+    output=Depends(output_format)
 ):
     """
     Akıllı kırpma uygular.
     """
-    image_data = await file.read()
-    result = service.smart_crop(image_data, target_width, target_height)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("smart_crop", file, target_width, target_height, output=output)
 
 @app.post("/auto-color-correction/")
-async def auto_color_correction(file: UploadFile = File(...)):
+async def auto_color_correction(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Otomatik renk düzeltme uygular.
     """
-    image_data = await file.read()
-    result = service.auto_color_correction(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("auto_color_correction", file, output=output)
 
 @app.post("/enhance-portrait/")
-async def enhance_portrait(file: UploadFile = File(...)):
+async def enhance_portrait(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Portre fotoğrafını geliştirir.
     """
-    image_data = await file.read()
-    result = service.enhance_portrait(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("enhance_portrait", file, output=output)
 
 @app.post("/center-crop/")
 async def center_crop(
     file: UploadFile = File(...),
     target_width: int = Query(500),
-    target_height: int = Query(500)
+    target_height: int = Query(500),
+    output=Depends(output_format)
 ):
     """
     Resmi merkezi olarak kırpar.
     """
-    image_data = await file.read()
-    result = service.center_crop(image_data, target_width, target_height)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("center_crop", file, target_width, target_height, output=output)
 
 @app.post("/auto-enhance/")
-async def auto_enhance(file: UploadFile = File(...)):
+async def auto_enhance(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Otomatik renk ve kontrast iyileştirmesi yapar.
     """
-    image_data = await file.read()
-    result = service.auto_enhance(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("auto_enhance", file, output=output)
 
 @app.post("/dramatic-effect/")
-async def dramatic_effect(file: UploadFile = File(...)):
+async def dramatic_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Dramatik fotoğraf efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_dramatic_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_dramatic_effect", file, output=output)
 
 @app.post("/watercolor/")
-async def watercolor(file: UploadFile = File(...)):
+async def watercolor(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Resme suluboya efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_watercolor_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_watercolor_effect", file, output=output)
 
 @app.post("/reduce-noise/")
 async def reduce_noise(
     file: UploadFile = File(...),
-    strength: float = Query(0.1, ge=0, le=1)
+    strength: float = Query(0.1, ge=0, le=1),
+    output=Depends(output_format)
 ):
     """
     Görüntüdeki gürültüyü azaltır.
     """
-    image_data = await file.read()
-    result = service.reduce_noise(image_data, strength)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("reduce_noise", file, strength, output=output)
 
 @app.post("/texture/")
 async def add_texture(
     file: UploadFile = File(...),
-    texture_type: str = Query("canvas", regex="^(canvas|paper|concrete)$")
+    texture_type: str = Query("canvas", regex="^(canvas|paper|concrete)$"),
+    seed: int = Query(None, ge=0),
+    output=Depends(output_format)
 ):
     """
     Resme doku efekti ekler.
     """
-    image_data = await file.read()
-    result = service.apply_texture(image_data, texture_type)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_texture", file, texture_type, seed, output=output)
 
 @app.post("/enhance-details/")
-async def enhance_details(file: UploadFile = File(...)):
+async def enhance_details(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Görüntüdeki detayları geliştirir.
     """
-    image_data = await file.read()
-    result = service.enhance_details(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("enhance_details", file, output=output)
 
 @app.post("/pencil-sketch/")
 async def pencil_sketch(
     file: UploadFile = File(...),
-    pencil_type: str = Query("soft", regex="^(soft|hard)$")
+    pencil_type: str = Query("soft", regex="^(soft|hard)$"),
+    output=Depends(output_format)
 ):
     """
     Resmi karakalem çizimine dönüştürür.
     """
-    image_data = await file.read()
-    result = service.apply_pencil_sketch(image_data, pencil_type)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_pencil_sketch", file, pencil_type, output=output)
 
 @app.post("/oil-painting/")
 async def oil_painting(
     file: UploadFile = File(...),
-    brush_size: int = Query(5, ge=1, le=10)
+    brush_size: int = Query(5, ge=1, le=10),
+    output=Depends(output_format)
 ):
     """
     Resme yağlı boya efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_oil_painting(image_data, brush_size)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_oil_painting", file, brush_size, output=output)
 
 @app.post("/polaroid/")
-async def polaroid_effect(file: UploadFile = File(...)):
+async def polaroid_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Polaroid fotoğraf efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_polaroid_effect(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_polaroid_effect", file, output=output)
 
 @app.post("/double-exposure/")
 async def double_exposure(
     file1: UploadFile = File(...),
-    file2: UploadFile = File(...)
+    file2: UploadFile = File(...),
+    output=Depends(output_format)
 ):
     """
     İki resmi birleştirerek double exposure efekti uygular.
     """
-    image_data1 = await file1.read()
-    image_data2 = await file2.read()
-    result = service.apply_double_exposure(image_data1, image_data2)
-    return StreamingResponse(result, media_type="image/png")
+    with ingest.UploadBuffer(file1) as image_data1, ingest.UploadBuffer(file2) as image_data2:
+        result = await executor.run("apply_double_exposure", image_data1, image_data2, output=output)
+    return image_response(result)
 
 @app.post("/duotone/")
 async def duotone(
     file: UploadFile = File(...),
     color1: str = Query("blue", regex="^[a-zA-Z]+$"),
-    color2: str = Query("pink", regex="^[a-zA-Z]+$")
+    color2: str = Query("pink", regex="^[a-zA-Z]+$"),
+    output=Depends(output_format)
 ):
     """
     Resme duotone efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_duotone(image_data, color1, color2)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_duotone", file, color1, color2, output=output)
 
 @app.post("/tilt-shift/")
 async def tilt_shift(
     file: UploadFile = File(...),
-    blur_factor: float = Query(5.0, ge=0.1, le=20.0)
+    blur_factor: float = Query(5.0, ge=0.1, le=20.0),
+    output=Depends(output_format)
 ):
     """
     Minyatür efekti (tilt-shift) uygular.
     """
-    image_data = await file.read()
-    result = service.apply_tilt_shift(image_data, blur_factor)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_tilt_shift", file, blur_factor, output=output)
 
 @app.post("/color-splash/")
 async def color_splash(
     file: UploadFile = File(...),
-    color_to_keep: str = Query("red", regex="^(red|green|blue|yellow)$")
+    color_to_keep: str = Query("red", regex="^(red|green|blue|yellow)$"),
+    output=Depends(output_format)
 ):
     """
     Seçilen renk dışındaki tüm renkleri siyah-beyaz yapar.
     """
-    image_data = await file.read()
-    result = service.apply_color_splash(image_data, color_to_keep)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_color_splash", file, color_to_keep, output=output)
 
 @app.post("/mirror/")
 async def mirror_effect(
     file: UploadFile = File(...),
-    direction: str = Query("horizontal", regex="^(horizontal|vertical)$")
+    direction: str = Query("horizontal", regex="^(horizontal|vertical)$"),
+    output=Depends(output_format)
 ):
     """
     Resme ayna efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_mirror_effect(image_data, direction)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_mirror_effect", file, direction, output=output)
 
 @app.post("/kaleidoscope/")
 async def kaleidoscope(
     file: UploadFile = File(...),
-    segments: int = Query(8, ge=3, le=24)
+    segments: int = Query(8, ge=3, le=24),
+    output=Depends(output_format)
 ):
     """
     Resme kaleydoskop efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_kaleidoscope(image_data, segments)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_kaleidoscope", file, segments, output=output)
 
 @app.post("/wave/")
 async def wave_distortion(
     file: UploadFile = File(...),
     amplitude: int = Query(5, ge=1, le=10),
-    wavelength: int = Query(10, ge=5, le=20)
+    wavelength: int = Query(10, ge=5, le=20),
+    output=Depends(output_format)
 ):
     """
     Resme dalga distorsiyonu efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_wave_distortion(image_data, amplitude, wavelength)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_wave_distortion", file, amplitude, wavelength, output=output)
 
 @app.post("/vignette/")
 async def vignette_effect(
     file: UploadFile = File(...),
     sigma: float = Query(3.0, ge=0.1, le=10.0),
-    opacity: float = Query(0.5, ge=0.1, le=1.0)
+    opacity: float = Query(0.5, ge=0.1, le=1.0),
+    output=Depends(output_format)
 ):
     """
     Resme vignette (kenar kararma) efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_vignette(image_data, sigma, opacity)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_vignette", file, sigma, opacity, output=output)
 
 @app.post("/gradient-map/")
 async def gradient_map(
     file: UploadFile = File(...),
     start_color: str = Query("blue", regex="^[a-zA-Z]+$"),
-    end_color: str = Query("red", regex="^[a-zA-Z]+$")
+    end_color: str = Query("red", regex="^[a-zA-Z]+$"),
+    output=Depends(output_format)
 ):
     """
     Resme gradient map efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_gradient_map(image_data, start_color, end_color)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_gradient_map", file, start_color, end_color, output=output)
 
 @app.post("/selective-color/")
 async def selective_color(
     file: UploadFile = File(...),
     target_color: str = Query("red", regex="^(red|green|blue|cyan|magenta|yellow)$"),
-    adjustment: float = Query(0.2, ge=-1.0, le=1.0)
+    adjustment: float = Query(0.2, ge=-1.0, le=1.0),
+    output=Depends(output_format)
 ):
     """
     Belirli bir renk kanalını seçici olarak ayarlar.
     """
-    image_data = await file.read()
-    result = service.apply_selective_color(image_data, target_color, adjustment)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_selective_color", file, target_color, adjustment, output=output)
 
 @app.post("/cross-process/")
 async def cross_process(
     file: UploadFile = File(...),
-    intensity: float = Query(0.3, ge=0.0, le=1.0)
+    intensity: float = Query(0.3, ge=0.0, le=1.0),
+    output=Depends(output_format)
 ):
     """
     Cross processing efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_cross_process(image_data, intensity)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_cross_process", file, intensity, output=output)
 
 @app.post("/lomo/")
-async def lomo_effect(file: UploadFile = File(...)):
+async def lomo_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Lomo fotoğraf efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_lomo(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_lomo", file, output=output)
 
 @app.post("/bleach-bypass/")
 async def bleach_bypass(
     file: UploadFile = File(...),
-    intensity: float = Query(0.5, ge=0.0, le=1.0)
+    intensity: float = Query(0.5, ge=0.0, le=1.0),
+    output=Depends(output_format)
 ):
     """
     Bleach bypass efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_bleach_bypass(image_data, intensity)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_bleach_bypass", file, intensity, output=output)
 
 @app.post("/infrared/")
-async def infrared_effect(file: UploadFile = File(...)):
+async def infrared_effect(file: UploadFile = File(...), output=Depends(output_format)):
     """
     Kızılötesi fotoğraf efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_infrared(image_data)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_infrared", file, output=output)
 
 @app.post("/cinematic/")
 async def cinematic_effect(
     file: UploadFile = File(...),
-    tone: str = Query("cool", regex="^(cool|warm)$")
+    tone: str = Query("cool", regex="^(cool|warm)$"),
+    output=Depends(output_format)
 ):
     """
     Sinematik renk tonu efekti uygular.
     """
-    image_data = await file.read()
-    result = service.apply_cinematic(image_data, tone)
-    return StreamingResponse(result, media_type="image/png")
+    return await process_upload("apply_cinematic", file, tone, output=output)
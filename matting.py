@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+
+def proxy_size(size, max_side):
+    """
+    Segmentasyonun çalışacağı küçültülmüş boyutu hesaplar; oran korunur.
+    :param size: (genişlik, yükseklik)
+    :param max_side: Uzun kenarın en fazla uzunluğu (0: küçültme yok).
+    :return: Yeni (genişlik, yükseklik) veya küçültme gerekmiyorsa None.
+    """
+    width, height = size
+    if not max_side or max(width, height) <= max_side:
+        return None
+    scale = max_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _box(values, radius):
+    return cv2.boxFilter(values, -1, (2 * radius + 1, 2 * radius + 1), borderType=cv2.BORDER_REFLECT)
+
+
+def guided_upsample(mask, guide, full_guide, radius=None, eps=1e-3):
+    """
+    Düşük çözünürlükte çıkarılmış maskeyi tam çözünürlüğe kenarlara duyarlı olarak büyütür (hızlı yönlendirilmiş filtre).
+    Yerel doğrusal katsayılar (maske = a * parlaklık + b) küçük resimde hesaplanır, yalnızca katsayılar büyütülür;
+    böylece saç ve kenar geçişleri tam çözünürlüklü parlaklıktan gelir, maliyet ise çoğunlukla küçük resimdedir.
+    :param mask: Küçük resmin (H, W) uint8 maskesi.
+    :param guide: Küçük resmin (H, W) uint8 gri tonu.
+    :param full_guide: Tam çözünürlüklü (H', W') uint8 gri ton.
+    :param radius: Küçük resimdeki pencere yarıçapı (varsayılan: uzun kenarın 1/256'sı, en az 2).
+    :param eps: Düzenleme terimi; büyüdükçe sonuç düz büyütmeye yaklaşır.
+    :return: (H', W') uint8 maske.
+    """
+    if radius is None:
+        radius = max(2, round(max(mask.shape) / 256))
+    guide = guide.astype(np.float32) * np.float32(1 / 255)
+    mask = mask.astype(np.float32) * np.float32(1 / 255)
+
+    mean_guide = _box(guide, radius)
+    mean_mask = _box(mask, radius)
+    covariance = _box(guide * mask, radius) - mean_guide * mean_mask
+    variance = _box(guide * guide, radius) - mean_guide * mean_guide
+    a = covariance / (variance + np.float32(eps))
+    b = mean_mask - a * mean_guide
+    a = _box(a, radius)
+    b = _box(b, radius)
+
+    # Katsayılar tam boyuta büyütülür; 0-255 ölçeğindeki gri ton üzerinde doğrudan uygulanır
+    height, width = full_guide.shape[:2]
+    a = cv2.resize(a * np.float32(255), (width, height), interpolation=cv2.INTER_LINEAR)
+    b = cv2.resize(b * np.float32(255), (width, height), interpolation=cv2.INTER_LINEAR)
+    result = cv2.multiply(a, full_guide, dtype=cv2.CV_32F, scale=1 / 255)
+    # Toplama uint8'e doyurarak (0-255 kırpma ve yuvarlama) tek geçişte yazılır
+    return cv2.add(result, b, dtype=cv2.CV_8U)
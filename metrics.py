@@ -0,0 +1,450 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Prometheus metin biçimi (0.0.4) içerik türü
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MEGAPIXEL_BUCKETS = (0.1, 0.3, 1.0, 2.0, 5.0, 12.0, 24.0, 48.0, 100.0)
+BYTE_BUCKETS = (1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+
+STAGES = ("decode", "process", "encode")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} etiketleri {self.labelnames} olmalıdır, verilen: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self, extra=()):
+        """
+        Metriğin örnek satırları.
+        :param extra: Her örneğe eklenecek (ad, değer) etiketleri (ör. ön çatallı işçinin sırası).
+        """
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._render_samples(items, list(extra))
+
+    def _render_samples(self, items, extra):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [kova sayaçları, toplam, adet]
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self, items, extra):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, extra + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, extra)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# Kayıt defterine anlık değer üreten toplayıcılardan dönen örnek: (ad, tür, açıklama, [(etiketler, değer)])
+Sample = namedtuple("Sample", ["name", "type_name", "documentation", "values"])
+
+
+class Registry:
+    def __init__(self):
+        """
+        Metrikleri ve anlık değer toplayıcılarını tutar, Prometheus metin biçiminde dışa aktarır.
+        """
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Her dışa aktarımda çağrılıp Sample listesi döndüren fonksiyonu ekler (ör. önbellek sayaçları).
+        """
+        self._collectors.append(collector)
+
+    def collect(self, extra=()):
+        """
+        Metrik aileleri: [(ad, tür, açıklama, [örnek satırları])]
+        :param extra: Her örneğe eklenecek (ad, değer) etiketleri.
+        """
+        families = [(metric.name, metric.type_name, metric.documentation, metric.samples(extra))
+                    for metric in self._metrics]
+        for collector in self._collectors:
+            for sample in collector():
+                families.append((sample.name, sample.type_name, sample.documentation, [
+                    f"{sample.name}{_format_labels(list(labels), list(labels.values()), extra)} {_format_value(value)}"
+                    for labels, value in sample.values
+                ]))
+        return families
+
+    def render(self, extra=(), others=()):
+        """
+        Prometheus metin biçiminde dışa aktarır.
+        :param extra: Bu sürecin örneklerine eklenecek etiketler.
+        :param others: Aynı çıktıda gösterilecek diğer süreçlerin aileleri (read_snapshots).
+        """
+        return render_families(self.collect(extra) + list(others))
+
+
+def render_families(families):
+    """
+    Aileleri metin biçimine çevirir; aynı adlı ailelerin (farklı süreçlerden) örnekleri tek başlık altında birleşir.
+    """
+    grouped = OrderedDict()
+    for name, type_name, documentation, samples in families:
+        grouped.setdefault(name, (type_name, documentation, []))[2].extend(samples)
+
+    lines = []
+    for name, (type_name, documentation, samples) in grouped.items():
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {type_name}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot(path, families):
+    """
+    Süreç ailelerini diğer süreçlerin okuyabileceği dosyaya yazar (yarım dosya okunmasın diye önce geçici dosyaya).
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(families, f)
+    os.replace(tmp_path, path)
+
+
+def read_snapshots(directory, exclude=None):
+    """
+    Dizindeki anlık görüntülerin ailelerini okur.
+    :param exclude: Atlanacak dosya (güncel aileleri ayrıca verilen bu süreç).
+    """
+    families = []
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if entry.name.startswith(".") or entry.path == exclude:
+            continue
+        try:
+            with open(entry.path) as f:
+                families.extend(tuple(family) for family in json.load(f))
+        except (OSError, ValueError):
+            # Süreç çıkarken silinmiş dosya
+            continue
+    return families
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    "image_api_requests_total", "HTTP isteklerinin sayısı.", ("route", "method", "status"))
+REQUEST_ERRORS = REGISTRY.counter(
+    "image_api_request_errors_total", "Hata durum koduyla (>=400) biten isteklerin sayısı.", ("route", "status"))
+REQUEST_LATENCY = REGISTRY.histogram(
+    "image_api_request_duration_seconds", "İsteklerin uçtan uca süresi.", ("route",))
+IN_FLIGHT = REGISTRY.gauge(
+    "image_api_requests_in_flight", "İşlenmekte olan isteklerin sayısı.")
+
+OPERATIONS = REGISTRY.counter(
+    "image_operation_total", "Servis işlemi çağrılarının sayısı.", ("operation", "pool", "result"))
+OPERATION_LATENCY = REGISTRY.histogram(
+    "image_operation_duration_seconds", "Servis işleminin havuzda geçen toplam süresi (kuyruk dahil).",
+    ("operation", "pool"))
+STAGE_LATENCY = REGISTRY.histogram(
+    "image_operation_stage_seconds", "Servis işleminin çözme, işleme ve kodlama aşamalarının süresi.",
+    ("operation", "stage"))
+INPUT_MEGAPIXELS = REGISTRY.histogram(
+    "image_operation_input_megapixels", "Çözülen girdi resminin boyutu.", ("operation",), MEGAPIXEL_BUCKETS)
+OUTPUT_BYTES = REGISTRY.histogram(
+    "image_operation_output_bytes", "Kodlanmış çıktının boyutu.", ("operation",), BYTE_BUCKETS)
+BACKEND_IMPORT_SECONDS = REGISTRY.gauge(
+    "image_backend_import_seconds", "Tembel yüklenen motor modülünün içe aktarılma süresi.", ("engine",))
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    "segmentation_model_load_seconds", "Modelin oturum havuzunun yüklenip ısıtılma süresi.", ("model",))
+WARM_UP_SECONDS = REGISTRY.gauge(
+    "image_warm_up_seconds", "Uygulamanın yüklenmesinden motorların ve modellerin hazır olmasına kadar geçen süre.")
+SEGMENTATION_LATENCY = REGISTRY.histogram(
+    "image_segmentation_duration_seconds", "Ön plan maskesi çıkarımının model bazında süresi (toplu çıkarım beklemesi dahil).",
+    ("model",))
+
+
+# Servis çağrısı sırasında aşama sürelerini toplayan iş parçacığına özel kayıt.
+# İş parçacığı havuzunda da süreç havuzunda da çağrıyı çalıştıran iş parçacığı okur.
+_call = threading.local()
+
+
+def begin_call():
+    _call.stats = {"stages": dict.fromkeys(STAGES, 0.0), "input_megapixels": None, "output_bytes": None}
+
+
+def end_call():
+    stats = getattr(_call, "stats", None)
+    _call.stats = None
+    return stats
+
+
+class stage:
+    def __init__(self, name):
+        """
+        Bloğun süresini etkin servis çağrısının ilgili aşamasına ekler; etkin çağrı yoksa bir şey yapmaz.
+        :param name: "decode", "process" veya "encode".
+        """
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stats = getattr(_call, "stats", None)
+        if stats is not None:
+            stats["stages"][self.name] += time.perf_counter() - self.started
+
+
+def record_input_size(size):
+    stats = getattr(_call, "stats", None)
+    if stats is not None and stats["input_megapixels"] is None:
+        stats["input_megapixels"] = size[0] * size[1] / 1e6
+
+
+def record_output_bytes(size):
+    stats = getattr(_call, "stats", None)
+    if stats is not None:
+        stats["output_bytes"] = size
+
+
+def observe_call(operation, stats):
+    """
+    Servis çağrısından toplanan aşama sürelerini ve boyutları histogramlara işler.
+    """
+    if not stats:
+        return
+    for name, seconds in stats["stages"].items():
+        if seconds:
+            STAGE_LATENCY.observe(seconds, operation=operation, stage=name)
+    if stats["input_megapixels"] is not None:
+        INPUT_MEGAPIXELS.observe(stats["input_megapixels"], operation=operation)
+    if stats["output_bytes"] is not None:
+        OUTPUT_BYTES.observe(stats["output_bytes"], operation=operation)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        """
+        Her HTTP isteği için rota bazında sayaç, süre, hata ve eşzamanlı istek metriklerini toplar.
+        Rota etiketi yol şablonudur (ör. "/remove-bg/"); eşleşmeyen yollar "unmatched" olarak sayılır.
+        """
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        IN_FLIGHT.inc()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            REQUESTS.inc(route=route, method=scope["method"], status=status)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, route=route)
+            if status >= 400:
+                REQUEST_ERRORS.inc(route=route, status=status)
+
+
+def cache_collector(cache):
+    """
+    Sonuç önbelleğinin sayaçlarını /metrics çıktısına ekleyen toplayıcıyı döndürür.
+    """
+    def collect():
+        snapshot = cache.snapshot()
+        return [
+            Sample("image_result_cache_hits_total", "counter", "Önbellekten dönen sonuçların sayısı.",
+                   [({"tier": tier}, count) for tier, count in sorted(snapshot["hits"].items())]),
+            Sample("image_result_cache_misses_total", "counter", "Önbellekte bulunamayan isteklerin sayısı.",
+                   [({}, snapshot["misses"])]),
+            Sample("image_result_cache_bypasses_total", "counter", "Önbelleğe alınamayan (tohumsuz) isteklerin sayısı.",
+                   [({}, snapshot["bypasses"])]),
+            Sample("image_result_cache_bytes", "gauge", "Önbellek katmanlarının kullandığı bayt.",
+                   [({"tier": "memory"}, snapshot["memory_bytes"]), ({"tier": "disk"}, snapshot["disk_bytes"])]),
+        ]
+    return collect
+
+
+def mask_cache_collector(masks):
+    """
+    Ön plan maskesi önbelleğinin sayaçlarını /metrics çıktısına ekleyen toplayıcıyı döndürür.
+    """
+    def collect():
+        snapshot = masks.snapshot()
+        return [
+            Sample("segmentation_mask_cache_hits_total", "counter", "Çıkarım yapılmadan önbellekten dönen maskelerin sayısı.",
+                   [({}, snapshot["hits"])]),
+            Sample("segmentation_mask_cache_misses_total", "counter", "Önbellekte bulunamayıp çıkarımla üretilen maskelerin sayısı.",
+                   [({}, snapshot["misses"])]),
+            Sample("segmentation_mask_cache_bytes", "gauge", "Önbellekteki maskelerin kullandığı bayt.",
+                   [({}, snapshot["bytes"])]),
+        ]
+    return collect
+
+
+def batcher_collector(batcher):
+    """
+    Segmentasyon toplayıcısının istatistiklerini /metrics çıktısına ekleyen toplayıcıyı döndürür.
+    """
+    def collect():
+        snapshot = batcher.snapshot()
+        return [
+            Sample("segmentation_batches_total", "counter", "Çalıştırılan toplu çıkarımların sayısı.",
+                   [({}, snapshot["batches_total"])]),
+            Sample("segmentation_batch_items_total", "counter", "Toplu çıkarımlarda işlenen resimlerin sayısı.",
+                   [({}, snapshot["items_total"])]),
+            Sample("segmentation_batch_wait_seconds_total", "counter", "İsteklerin toplu çıkarımı beklediği toplam süre.",
+                   [({}, snapshot["wait_seconds_total"])]),
+            Sample("segmentation_batch_size_total", "counter", "Toplu çıkarımların boyuta göre sayısı.",
+                   [({"size": size}, count) for size, count in sorted(snapshot["batch_sizes"].items())]),
+            Sample("segmentation_batching_enabled", "gauge",
+                   "Modelin toplu çıkarımı destekleyip desteklemediği (0: toplu boyut 1'e sabit, istekler sırayla çalışır).",
+                   [({"model": model}, int(batchable)) for model, batchable in sorted(snapshot["batchable"].items())]),
+        ]
+    return collect
+
+
+def admission_collector(admission):
+    """
+    Kabul denetiminin sınıf bazındaki doluluk ve ret sayılarını /metrics çıktısına ekleyen toplayıcıyı döndürür.
+    """
+    def collect():
+        snapshot = sorted(admission.snapshot().items())
+        return [
+            Sample("admission_active_operations", "gauge", "Sınıf başına çalışmakta olan işlemlerin sayısı.",
+                   [({"class": name}, state["active"]) for name, state in snapshot]),
+            Sample("admission_queued_operations", "gauge", "Sınıf başına yer bekleyen işlemlerin sayısı.",
+                   [({"class": name}, state["queued"]) for name, state in snapshot]),
+            Sample("admission_rejected_total", "counter", "Kapasite dolu olduğu için 503 ile reddedilen işlemlerin sayısı.",
+                   [({"class": name}, state["rejected"]) for name, state in snapshot]),
+            Sample("admission_concurrency_limit", "gauge", "Sınıf başına eşzamanlılık sınırı.",
+                   [({"class": name}, state["concurrency"]) for name, state in snapshot]),
+        ]
+    return collect
+
+
+def memory_collector(usage):
+    """
+    Sürecin bellek kullanımını (rss, pss, paylaşılan, özel, swap) /metrics çıktısına ekleyen toplayıcıyı döndürür.
+    :param usage: Bayt sözlüğü döndüren çağrılabilir (prefork.memory_usage); None dönerse örnek üretilmez.
+    """
+    def collect():
+        values = usage()
+        if values is None:
+            return []
+        return [
+            Sample("image_worker_memory_bytes", "gauge",
+                   "İşçi sürecin bellek kullanımı; pss paylaşılan sayfaları paylaşan süreçlere böler, private yalnızca bu sürecindir.",
+                   [({"kind": kind}, value) for kind, value in values.items()]),
+        ]
+    return collect
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import gc
+import importlib
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+import config
+import jobs
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bu sürecin ön çatallı işçi sırası; tek süreçli çalışmada (uvicorn main:app) 0
+worker = 0
+# Önceki çalışmadan kalan işleri yalnızca ilk başlatılan 0. işçi yeniden kuyruğa alır;
+# yeniden başlatılan işçi ölen öncülünün işlerini devralır
+recover_jobs = jobs.RECOVER_ALL
+# İşçilerin metrik anlık görüntülerini paylaştığı dizin; tek süreçli çalışmada None
+metrics_dir = None
+
+# smaps_rollup alanları -> raporlanan bellek türü
+_MEMORY_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+    "Swap": "swap",
+}
+
+
+def _snapshot_path(index):
+    return os.path.join(metrics_dir, f"worker-{index}.json")
+
+
+def _worker_labels():
+    return [("worker", str(worker))] if metrics_dir is not None else []
+
+
+def render_metrics():
+    """
+    /metrics çıktısı. Ön çatallı çalışmada istek paylaşılan soketten rastgele bir işçiye düşer; bu yüzden yanıtlayan
+    işçinin güncel metriklerine diğer işçilerin son anlık görüntüleri eklenir ve her örnek worker etiketi alır.
+    """
+    if metrics_dir is None:
+        return metrics.REGISTRY.render()
+    others = metrics.read_snapshots(metrics_dir, exclude=_snapshot_path(worker))
+    return metrics.REGISTRY.render(_worker_labels(), others)
+
+
+async def publish_metrics(interval):
+    """
+    İşçinin metriklerini belirli aralıklarla ortak dizine yazar; tek süreçli çalışmada hemen döner.
+    :param interval: Yazma aralığı (saniye).
+    """
+    if metrics_dir is None:
+        return
+    while True:
+        families = metrics.REGISTRY.collect(_worker_labels())
+        try:
+            await asyncio.to_thread(metrics.write_snapshot, _snapshot_path(worker), families)
+        except OSError:
+            logger.exception("Metrik anlık görüntüsü yazılamadı")
+        await asyncio.sleep(interval)
+
+
+def memory_usage(pid="self"):
+    """
+    Sürecin bellek kullanımını /proc/<pid>/smaps_rollup dosyasından okur.
+    Pss paylaşılan sayfaları paylaşan süreç sayısına böler; süreçlerin Pss toplamı gerçek bellek tüketimidir.
+    Özel (private) bellek, sürecin yazınca-kopyala sayfalardan kopyaladığı veya kendi ayırdığı bellektir.
+    :param pid: Süreç kimliği (varsayılan: bu süreç).
+    :return: {"rss", "pss", "shared", "private", "swap"} bayt sözlüğü; okunamıyorsa (Linux dışı, süreç yok) None.
+    """
+    usage = dict.fromkeys(("rss", "pss", "shared", "private", "swap"), 0)
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                kind = _MEMORY_FIELDS.get(name)
+                if kind is not None:
+                    usage[kind] += int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    return usage
+
+
+def _descendants(pid):
+    # İşçinin süreç havuzu gibi alt süreçleri (/proc/<pid>/task/<tid>/children)
+    found = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return found
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = [int(child) for child in f.read().split()]
+        except (OSError, ValueError):
+            continue
+        for child in children:
+            found.append(child)
+            found.extend(_descendants(child))
+    return found
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.0f}MB"
+
+
+def _serve(app, sock, index, recover):
+    global worker, recover_jobs
+    worker = index
+    recover_jobs = recover
+    # Sinyalleri uvicorn yönetir (SIGTERM ile bekleyen istekler bitirilerek kapanır)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Ana süreçte dondurulan nesneler taranmaz; işçinin kendi nesneleri için çöp toplayıcı yeniden açılır
+    gc.enable()
+
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app))
+    server.run(sockets=[sock])
+    # Başlangıçta (lifespan) hata veren işçi sıfırdan farklı kodla çıkar
+    return 0 if server.started else 3
+
+
+class Supervisor:
+    def __init__(self, app, sock, workers, graceful_timeout=30.0, memory_log_interval=60):
+        """
+        Modelleri yüklenmiş uygulamayı çatallayarak işçi süreçler başlatır ve denetler.
+        İşçiler ana süreçteki modelleri, sınıflandırıcıları ve içe aktarılmış kütüphaneleri yazınca-kopyala paylaşır;
+        ölen işçi yeniden çatallanır, SIGTERM/SIGINT ile işçiler bekleyen istekleri bitirerek kapatılır.
+        :param app: ASGI uygulaması (main.app).
+        :param sock: Dinlemeye alınmış soket; tüm işçiler bağlantıları bu soketten kabul eder.
+        :param workers: İşçi süreç sayısı.
+        :param graceful_timeout: Kapanışta işçilerin bekleneceği en uzun süre (saniye); sonra SIGKILL gönderilir.
+        :param memory_log_interval: İşçi bellek raporunun loglanma aralığı (saniye, 0: kapalı).
+        """
+        self.app = app
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.memory_log_interval = memory_log_interval
+        self.children = {}
+        self._started = {}
+        self._stopping = False
+
+    def spawn(self, index, recover=None):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = _serve(self.app, self.sock, index, recover)
+            except BaseException:
+                logger.exception("İşçi %d çalışırken hata oluştu", index)
+            finally:
+                os._exit(status)
+        self.children[pid] = index
+        self._started[index] = time.monotonic()
+        logger.info("İşçi %d başlatıldı (pid %d)", index, pid)
+        return pid
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for index in range(self.workers):
+            self.spawn(index, recover=jobs.RECOVER_ALL if index == 0 else None)
+
+        next_report = time.monotonic() + self.memory_log_interval
+        while not self._stopping:
+            self._reap()
+            if self.memory_log_interval and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + self.memory_log_interval
+            time.sleep(0.5)
+        self._shutdown()
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def _reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+            # Ölen işçinin sayaçları yeniden başlatılan işçide sıfırdan başlar
+            self._remove_snapshot(index)
+            if self._stopping:
+                continue
+
+            logger.warning("İşçi %d (pid %d) beklenmedik şekilde çıktı (çıkış kodu %d); yeniden başlatılıyor",
+                           index, pid, os.waitstatus_to_exitcode(status))
+            # Başlarken ölen işçi aralıksız yeniden çatallanmasın
+            if time.monotonic() - self._started[index] < 1:
+                time.sleep(1)
+            self.spawn(index, recover=jobs.RECOVER_OWN)
+
+    def _shutdown(self):
+        logger.info("İşçiler kapatılıyor")
+        self._signal_children(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+
+        if self.children:
+            logger.warning("%d işçi süresinde kapanmadı; sonlandırılıyor", len(self.children))
+            self._signal_children(signal.SIGKILL)
+            while self.children:
+                try:
+                    pid, _ = os.waitpid(-1, 0)
+                except ChildProcessError:
+                    break
+                self.children.pop(pid, None)
+
+    def _remove_snapshot(self, index):
+        if metrics_dir is not None:
+            try:
+                os.remove(_snapshot_path(index))
+            except FileNotFoundError:
+                pass
+
+    def _signal_children(self, signum):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def memory_report(self):
+        """
+        İşçilerin bellek kullanımı: işçi sırası -> memory_usage() sözlüğü ve alt süreçlerinin (süreç havuzu) Pss toplamı.
+        :return: {"supervisor": {...}, "workers": {sıra: {..., "pid", "pool_pss"}}}
+        """
+        workers = {}
+        for pid, index in sorted(self.children.items(), key=lambda item: item[1]):
+            usage = memory_usage(pid)
+            if usage is None:
+                continue
+            usage["pid"] = pid
+            usage["pool_pss"] = sum((memory_usage(child) or {}).get("pss", 0) for child in _descendants(pid))
+            workers[index] = usage
+        return {"supervisor": memory_usage(), "workers": workers}
+
+    def report_memory(self):
+        report = self.memory_report()
+        supervisor = report["supervisor"] or {"pss": 0}
+        total = supervisor["pss"]
+        for index, usage in report["workers"].items():
+            total += usage["pss"] + usage["pool_pss"]
+            logger.info("İşçi %d (pid %d): rss=%s pss=%s paylaşılan=%s özel=%s süreç havuzu pss=%s",
+                        index, usage["pid"], _mb(usage["rss"]), _mb(usage["pss"]), _mb(usage["shared"]),
+                        _mb(usage["private"]), _mb(usage["pool_pss"]))
+
+        workers = report["workers"].values()
+        # Yeni bir işçi yaklaşık olarak mevcut işçilerin özel belleği kadar yer tutar
+        private = sum(usage["private"] + usage["pool_pss"] for usage in workers) / max(1, len(workers))
+        logger.info("Toplam pss=%s (ana süreç %s); işçi başına ek bellek ≈ %s",
+                    _mb(total), _mb(supervisor["pss"]), _mb(private))
+
+
+def _bind(host, port, backlog=2048):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _warn_threads():
+    # Çatallamada yalnızca çağıran iş parçacığı kopyalanır; kilit tutan veya iş bekleyen Python iş parçacıkları
+    # işçide bulunmaz. Yerel havuzlar (numba workqueue, OpenCV) çatallamadan sonra kendilerini yeniden kurar.
+    threads = [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]
+    if threads:
+        logger.warning("Çatallamadan önce %d iş parçacığı çalışıyor (%s); işçilerde bulunmayacaklar",
+                       len(threads), ", ".join(threads))
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Modelleri bir kez yükleyip işçileri çatallayan çok süreçli sunucu")
+    parser.add_argument("--host", default="0.0.0.0", help="Dinlenecek adres")
+    parser.add_argument("--port", type=int, default=8000, help="Dinlenecek port")
+    parser.add_argument("--workers", type=int, default=config.PREFORK_WORKERS, help="İşçi süreç sayısı")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    global metrics_dir
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # ONNX Runtime'ın iş parçacığı havuzu çatallamadan sonra işçide yaşamaz; oturumlar tek iş parçacıklı açılır,
+    # paralellik işçi sayısından gelir. Ortamda başka bir değer olsa da ezilir: rembg oturumun intra/inter-op
+    # iş parçacıklarını bu değişkenden ayarlar ve çatallamadan önce kurulan havuz işçilerde kilitlenir.
+    os.environ["OMP_NUM_THREADS"] = "1"
+    # Isıtma boyunca oluşan nesneler çöp toplayıcı tarafından dolaşılmasın; sayfaları işçilerde kirlenmesin
+    gc.disable()
+
+    application = importlib.import_module("main")
+    started = time.monotonic()
+    try:
+        ok = application.service.warm_up()
+    except Exception:
+        # İşçiler ısıtmayı yeniden dener; hata /readyz'de görünür
+        logger.exception("Ana süreçte ısıtma başarısız oldu")
+    else:
+        if ok:
+            logger.info("Motorlar ve modeller %.2f saniyede yüklendi", time.monotonic() - started)
+        else:
+            logger.warning("Bazı motorlar yüklenemedi: %s", application.backends.status())
+
+    _warn_threads()
+    gc.collect()
+    # Isıtılmış nesneler kalıcı kuşağa alınır; işçilerdeki toplamalar bu nesnelerin sayfalarına yazmaz
+    gc.freeze()
+
+    metrics_dir = tempfile.mkdtemp(prefix="image-api-metrics-")
+    sock = _bind(args.host, args.port)
+    logger.info("%s:%d dinleniyor, %d işçi", args.host, args.port, args.workers)
+    try:
+        Supervisor(
+            application.app,
+            sock,
+            args.workers,
+            graceful_timeout=config.PREFORK_GRACEFUL_TIMEOUT,
+            memory_log_interval=config.PREFORK_MEMORY_LOG_SECONDS,
+        ).run()
+    finally:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import config
+
+
+def _arrays(value):
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _nbytes(value):
+    return sum(array.nbytes for array in _arrays(value))
+
+
+class ProceduralCache:
+    def __init__(self, max_bytes):
+        """
+        Yalnızca boyuta ve parametrelere bağlı üretilen maske, geçiş ve çekirdekleri saklayan LRU önbellek.
+        Değerler salt okunur NumPy dizileri veya dizi demetleridir; bütçe dizilerin toplam bayt boyutuna göre uygulanır.
+        Her işçi süreç kendi önbelleğini tutar.
+        :param max_bytes: Tutulacak dizilerin toplam en fazla boyutu (0: önbellek kapalı).
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Anahtarın değerini döndürür; önbellekte yoksa üretip saklar.
+        :param key: Üreticinin adını, boyutu ve parametreleri içeren hashlenebilir anahtar.
+        :param build: Değeri (NumPy dizisi veya dizi demeti) üreten çağrılabilir.
+        :return: Salt okunur değer; çağıran değiştirmemelidir.
+        """
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Üretim kilit dışında yapılır; aynı anahtar aynı anda iki kez üretilirse son gelen saklanır
+        value = build()
+        for array in _arrays(value):
+            array.setflags(write=False)
+        self._put(key, value)
+        return value
+
+    def _put(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= _nbytes(previous)
+            self._items[key] = value
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= _nbytes(evicted)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Süreçteki tüm işlemlerin paylaştığı önbellek
+shared = ProceduralCache(config.PROCEDURAL_CACHE_MB * 1024 * 1024)
+
+
+def cached(func):
+    """
+    Yalnızca argümanlarına bağlı dizi (veya dizi demeti) üreten fonksiyonun sonucunu ortak önbellekte saklar.
+    Argümanlar hashlenebilir olmalıdır (boyutlar, sayılar, renk adları).
+    """
+    @wraps(func)
+    def wrapper(*args):
+        return shared.get((func.__module__, func.__qualname__) + args, lambda: func(*args))
+    return wrapper
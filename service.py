@@ -1,32 +1,356 @@
-from PIL import Image, ImageFilter, ImageOps, ImageDraw, ImageFont, ImageEnhance
+from PIL import Image, ImageFilter, ImageOps, ImageDraw, ImageFont, ImageEnhance, ExifTags
 from io import BytesIO
-from rembg import remove
+from functools import wraps
+import inspect
+import time
 import cv2
 import numpy as np
 from skimage import filters, feature, exposure
-from wand.image import Image as WandImage
+
+import backends
+import config
+from batching import SegmentationBatcher
+from cache import MaskCache
+import color_effects
+import color_matrix
+import encoding
+import faces
+import ingest
+import matting
+import metrics
+import procedural
+import tiles
+import warp
+from sessions import SessionRegistry
+
+# Wand (ImageMagick) yalnızca ilk Wand adımında veya arka planda ön yüklemeyle içe aktarılır
+wand_bridge = backends.lazy("wand", "wand_bridge")
+
+PIL_BACKEND = "pil"
+WAND_BACKEND = "wand"
+NATIVE_BACKEND = "native"
+
+def _operation(backend):
+    def decorator(func):
+        """
+        Resim nesnesi üzerinde çalışan adımı, byte verisi alıp kodlanmış resim döndüren servis metoduna çevirir.
+        Çıktı biçimi isteğe bağlı `output` (encoding.OutputFormat) parametresiyle seçilir; varsayılan PNG'dir.
+        Adımın kendisi `step`, beklediği resim türü `backend` niteliğinde saklanır; pipeline bunları kullanır.
+        """
+        @wraps(func)
+        def wrapper(self, image_data, *args, output=None, **kwargs):
+            return self._run_steps(image_data, [(func, backend, args, kwargs)], output)
+
+        wrapper.step = func
+        wrapper.backend = backend
+        return wrapper
+    return decorator
+
+# PIL resmi alıp PIL resmi döndüren adımlar
+image_operation = _operation(PIL_BACKEND)
+
+# Wand resmi alıp Wand resmi döndüren adımlar
+wand_operation = _operation(WAND_BACKEND)
+
+# Renk efekti -> uygulama ("native" veya "wand"); listede olmayanlar COLOR_EFFECT_BACKEND'i kullanır
+_COLOR_EFFECT_BACKENDS = {
+    name.strip(): backend.strip()
+    for name, _, backend in (item.partition("=") for item in config.COLOR_EFFECT_BACKENDS)
+}
+
+def color_effect(native):
+    """
+    ImageMagick ile yazılmış renk efektini, aynı zinciri NumPy/OpenCV ile uygulayan karşılığıyla eşler.
+    Hangi uygulamanın adım olacağı efekt bazında config.COLOR_EFFECT_BACKENDS ile seçilir;
+    iki uygulama da `variants` niteliğinde saklanır (benchmark.py --check-color-effects karşılaştırır).
+    :param native: (H, W, 3|4) uint8 dizi ve efektin parametrelerini alıp aynı türde dizi döndüren color_effects fonksiyonu.
+    """
+    def decorator(func):
+        # Parametre doğrulaması ve önbellek anahtarı için Wand adımının imzası kullanılır
+        @wraps(func)
+        def native_step(self, image, *args, **kwargs):
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+            return Image.fromarray(native(np.asarray(image), *args, **kwargs))
+
+        variants = {WAND_BACKEND: wand_operation(func), NATIVE_BACKEND: image_operation(native_step)}
+        backend = _COLOR_EFFECT_BACKENDS.get(func.__name__, config.COLOR_EFFECT_BACKEND)
+        if backend not in variants:
+            raise ValueError(f"'{func.__name__}' için geçersiz renk efekti uygulaması: {backend}")
+        method = variants[backend]
+        method.variants = variants
+        return method
+    return decorator
+
+# Döndürülmüş (90°/270°) EXIF yönleri; bu resimlerde piksel genişliği ile yüksekliği yer değiştirir
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+def decode_size(width_param, height_param, exif_transpose=False):
+    """
+    Adımın yalnızca (width_param x height_param) boyutuna sığacak kadar piksele ihtiyaç duyduğunu bildirir.
+    Pipeline'ın ilk adımıysa JPEG girdi bu boyuta yetecek en küçük DCT ölçeğinde (1/2, 1/4, 1/8) çözülür.
+    :param width_param: Hedef genişliği taşıyan parametrenin adı.
+    :param height_param: Hedef yüksekliği taşıyan parametrenin adı.
+    :param exif_transpose: Adım resmi EXIF yönüne göre çeviriyorsa True; hedef boyut çevrilmiş resme göredir.
+    """
+    def decorator(func):
+        func.decode_size = (width_param, height_param, exif_transpose)
+        return func
+    return decorator
+
+def _is_wand(value):
+    # Wand hiç yüklenmediyse Wand resmi de olamaz; kontrol için ImageMagick yüklenmez
+    return wand_bridge.loaded and isinstance(value, wand_bridge.WandImage)
+
+def _json_params(params):
+    # JSON listeleri, konum/kayma gibi demet bekleyen parametrelere çevrilir
+    return {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in (params or {}).items()
+    }
+
+@procedural.cached
+def _dramatic_vignette(rows, cols):
+    # Satır ve sütun Gauss çekirdeklerinin dış çarpımı
+    kernel_x = cv2.getGaussianKernel(cols, cols/4)
+    kernel_y = cv2.getGaussianKernel(rows, rows/4)
+    kernel = kernel_y * kernel_x.T
+    return (255 * kernel / np.linalg.norm(kernel)).astype(np.float32)
+
+@procedural.cached
+def _profile_mask(width, height):
+    # Yumuşak kenarlı dairesel profil maskesi
+    mask = Image.new('L', (width, height), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, width, height), fill=255)
+    return np.asarray(mask.filter(ImageFilter.GaussianBlur(1)))
+
+@procedural.cached
+def _wand_vignette(width, height, pseudo, sigma, opacity):
+    # ImageMagick'te üretilip bulanıklaştırılan radyal geçiş; pikselleri saklanır, her istekte Wand resmine aktarılır
+    with wand_bridge.WandImage(width=width, height=height, pseudo=pseudo) as mask:
+        mask.gaussian_blur(sigma=sigma)
+        if opacity is not None:
+            mask.evaluate(operator='multiply', value=opacity)
+        return wand_bridge.to_array(mask)
 
 class ImageProcessService:
-    def __init__(self, shadow_offset=(15, 15), blur_radius=15, shadow_color=(0, 0, 0, 120)):
+    def __init__(self, shadow_offset=(15, 15), blur_radius=15, shadow_color=(0, 0, 0, 120), sessions=None):
         """
         Görüntü işleme servisi başlatılır.
         :param shadow_offset: Gölge kaydırma miktarı (x, y).
         :param blur_radius: Gölge için bulanıklık yarıçapı.
         :param shadow_color: Gölge rengi (RGBA).
+        :param sessions: Arka plan kaldırma oturum havuzu (SessionRegistry).
         """
         self.shadow_offset = shadow_offset
         self.blur_radius = blur_radius
         self.shadow_color = shadow_color
+        self.sessions = sessions or SessionRegistry(
+            config.MODEL_DIR,
+            config.REMBG_MODELS,
+            pool_size=config.REMBG_SESSION_POOL_SIZE,
+            acquire_timeout=config.REMBG_SESSION_TIMEOUT,
+            allow_download=config.REMBG_ALLOW_DOWNLOAD,
+            tiers={
+                tier.strip(): model.strip()
+                for tier, _, model in (item.partition("=") for item in config.REMBG_MODEL_TIERS)
+            },
+        )
+        self.batcher = SegmentationBatcher(
+            self.sessions,
+            max_batch_size=config.REMBG_BATCH_SIZE,
+            window_ms=config.REMBG_BATCH_WINDOW_MS,
+        )
+        # Aynı fotoğrafın gölge/çerçeve denemeleri segmentasyonu tekrarlamaz
+        self.masks = MaskCache(config.MASK_CACHE_MB * 1024 * 1024)
+        # Sınıflandırıcı servisle birlikte (her işçi süreçte bir kez) yüklenir
+        self.faces = faces.FaceDetector(
+            max_side=config.FACE_DETECT_MAX_SIDE,
+            cache_size=config.FACE_CACHE_SIZE,
+        )
 
-    def enhance_portrait(self, image_data):
+    def warm_up(self):
+        """
+        Tembel yüklenen motorları içe aktarır, modelleri yükler ve ilk çıkarımı yaparak servisi isteklere hazırlar.
+        :return: Tüm motorlar yüklendiyse True; hata veren motor backends.status() içinde görünür.
+        """
+        ok = backends.load_all()
+        self.sessions.load()
+        self.batcher.check_models()
+        return ok
+
+    def preload_backends(self):
+        """
+        İşçi süreçte görüntü motorlarını arka planda içe aktarır.
+        Segmentasyon ana süreçte çalıştığından işçiler rembg'yi yüklemez.
+        """
+        backends.preload(["wand"])
+
+    def validate_pipeline(self, steps):
+        """
+        Pipeline adımlarını resim işlenmeden önce doğrular.
+        :param steps: (işlem adı, parametre sözlüğü) çiftlerinden oluşan sıralı liste.
+        :return: Çalıştırılmaya hazır adım listesi.
+        :raises ValueError: Adım bilinmiyorsa veya parametreler geçersizse.
+        """
+        if not steps:
+            raise ValueError("Pipeline en az bir adım içermelidir")
+
+        resolved = []
+        for operation, params in steps:
+            method = getattr(type(self), operation, None)
+            step = getattr(method, "step", None)
+            if step is None:
+                raise ValueError(f"Bilinmeyen pipeline adımı: {operation}")
+
+            params = _json_params(params)
+            try:
+                inspect.signature(step).bind(self, None, **params)
+            except TypeError as exc:
+                raise ValueError(f"'{operation}' için geçersiz parametreler: {exc}")
+
+            resolved.append((step, method.backend, (), params))
+        return resolved
+
+    def validate_operation(self, operation, params=None):
+        """
+        Tek bir işlemin adını ve parametrelerini resim işlenmeden önce doğrular.
+        Pipeline adımlarının yanında byte verisi alan birleşik işlemler (ör. remove_background_and_add_shadow) de kabul edilir.
+        :param operation: Servis metodu adı.
+        :param params: Parametre sözlüğü.
+        :return: Metoda isimli argüman olarak verilecek parametreler.
+        :raises ValueError: İşlem bilinmiyorsa veya parametreler geçersizse.
+        """
+        method = getattr(type(self), operation, None)
+        if getattr(method, "step", None) is not None:
+            return self.validate_pipeline([(operation, params)])[0][3]
+
+        parameters = list(inspect.signature(method).parameters) if callable(method) else []
+        if operation.startswith("_") or operation == "run_pipeline" or parameters[1:2] != ["image_data"]:
+            raise ValueError(f"Bilinmeyen işlem: {operation}")
+
+        params = _json_params(params)
+        try:
+            if "output" in params:
+                raise TypeError("çıktı biçimi parametre olarak verilemez")
+            inspect.signature(method).bind(self, None, **params)
+        except TypeError as exc:
+            raise ValueError(f"'{operation}' için geçersiz parametreler: {exc}")
+        return params
+
+    def run_pipeline(self, image_data, steps, output=None):
+        """
+        Resmi bir kez çözüp sıralı işlemleri bellekteki resim üzerinde uygular, yalnızca sonucu kodlar.
+        :param image_data: Yüklenen resmin byte verisi.
+        :param steps: (işlem adı, parametre sözlüğü) çiftlerinden oluşan sıralı liste.
+        :param output: Çıktı biçimi (encoding.OutputFormat); None ise PNG.
+        :return: İşlenmiş resmin byte verisi.
+        """
+        return self._run_steps(image_data, self.validate_pipeline(steps), output)
+
+    def _run_steps(self, image_data, steps, output=None):
+        current = image_data
+        try:
+            for index, (step, backend, args, kwargs) in enumerate(steps):
+                # Ara sonuçlar yalnızca adımın beklediği türe dönüştürülür, kodlanmaz
+                with metrics.stage("decode"):
+                    converted = self._convert(current, backend)
+                    if index == 0:
+                        metrics.record_input_size(converted.size)
+                        if backend == PIL_BACKEND:
+                            self._draft(converted, step, args, kwargs)
+                            # PIL tembel çözer; çözme süresi işleme aşamasına karışmasın
+                            converted.load()
+                if converted is not current:
+                    self._release(current)
+                    current = converted
+
+                with metrics.stage("process"):
+                    result = step(self, current, *args, **kwargs)
+                if result is not current:
+                    self._release(current)
+                    current = result
+
+            with metrics.stage("encode"):
+                output_buffer = self._encode(current, output)
+            with output_buffer.getbuffer() as view:
+                metrics.record_output_bytes(view.nbytes)
+            return output_buffer
+        finally:
+            self._release(current)
+
+    def _decode(self, image_data):
+        # memoryview/mmap tamponları kopyalanmadan okunur
+        return Image.open(ingest.open_image_source(image_data))
+
+    def _draft(self, image, step, args, kwargs):
+        # Yalnızca henüz piksel verisi çözülmemiş resimlerde etkilidir; JPEG dışındaki biçimlerde işlem yapmaz
+        hint = getattr(step, "decode_size", None)
+        if hint is None or not getattr(image, "tile", None):
+            return
+
+        width_param, height_param, exif_transpose = hint
+        arguments = inspect.signature(step).bind(self, image, *args, **kwargs)
+        arguments.apply_defaults()
+        width, height = arguments.arguments[width_param], arguments.arguments[height_param]
+        if not width or not height:
+            return
+
+        # draft saklanan piksel düzeninde çalışır; adım resmi döndürecekse hedef boyut da döndürülür
+        if exif_transpose and image.getexif().get(ExifTags.Base.Orientation) in _TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+        image.draft(None, (width, height))
+
+    def _encode(self, image, output=None):
+        if _is_wand(image):
+            return encoding.encode_wand(image, output)
+        return encoding.encode_pil(image, output)
+
+    def _convert(self, value, backend):
+        if backend == WAND_BACKEND:
+            if _is_wand(value):
+                return value
+            if isinstance(value, Image.Image):
+                return self._to_wand(value)
+            return wand_bridge.WandImage(blob=value if isinstance(value, bytes) else bytes(value))
+
+        if isinstance(value, Image.Image):
+            return value
+        if _is_wand(value):
+            return self._from_wand(value)
+        return self._decode(value)
+
+    @staticmethod
+    def _to_array(image):
+        # Wand köprüsü ve warp motoru yalnızca L, RGB ve RGBA kiplerini taşır
+        if image.mode == "1":
+            image = image.convert("L")
+        elif image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        return np.asarray(image)
+
+    def _to_wand(self, image):
+        # Pikseller kodlayıcıya uğramadan aktarılır
+        return wand_bridge.from_array(self._to_array(image))
+
+    def _from_wand(self, img):
+        return Image.fromarray(wand_bridge.to_array(img))
+
+    @staticmethod
+    def _release(value):
+        if _is_wand(value):
+            value.close()
+
+    @image_operation
+    def enhance_portrait(self, image):
         """
         Portre fotoğrafını geliştirir (yüz tanıma olmadan).
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Geliştirilmiş resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Yumuşak cilt efekti
         blurred = cv2.GaussianBlur(image_np, (5, 5), 0)
@@ -43,21 +367,18 @@ class ImageProcessService:
         enhancer = ImageEnhance.Sharpness(enhanced)
         enhanced = enhancer.enhance(1.3)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def apply_hdr_effect(self, image_data):
+    @image_operation
+    def apply_hdr_effect(self, image):
         """
         Resme HDR benzeri efekt uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: HDR efekti uygulanmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Görüntüyü LAB renk uzayına dönüştür
         lab = cv2.cvtColor(image_np, cv2.COLOR_RGB2LAB)
@@ -78,22 +399,18 @@ class ImageProcessService:
         enhancer = ImageEnhance.Color(enhanced)
         enhanced = enhancer.enhance(1.3)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def center_crop(self, image_data, target_width=500, target_height=500):
+    @image_operation
+    def center_crop(self, image, target_width=500, target_height=500):
         """
         Resmi merkezi olarak kırpar.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :param target_width: Hedef genişlik
         :param target_height: Hedef yükseklik
         :return: Kırpılmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data))
         width, height = image.size
         
         # Merkezi kırpma koordinatlarını hesapla
@@ -105,20 +422,17 @@ class ImageProcessService:
         # Kırp
         cropped = image.crop((left, top, right, bottom))
         
-        output_buffer = BytesIO()
-        cropped.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return cropped
 
-    def auto_enhance(self, image_data):
+    @image_operation
+    def auto_enhance(self, image):
         """
         Otomatik renk ve kontrast iyileştirmesi yapar.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: İyileştirilmiş resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
+        image = image.convert('RGB')
         
         # Otomatik kontrast
         enhanced = ImageOps.autocontrast(image)
@@ -135,31 +449,25 @@ class ImageProcessService:
         enhancer = ImageEnhance.Sharpness(enhanced)
         enhanced = enhancer.enhance(1.3)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def apply_dramatic_effect(self, image_data):
+    @image_operation
+    def apply_dramatic_effect(self, image):
         """
         Dramatik fotoğraf efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Efekt uygulanmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Kontrast artırma
         contrast = cv2.convertScaleAbs(image_np, alpha=1.3, beta=0)
         
-        # Vignette efekti
+        # Vignette efekti (maske boyuta bağlıdır, önbellekten gelir)
         rows, cols = contrast.shape[:2]
-        kernel_x = cv2.getGaussianKernel(cols, cols/4)
-        kernel_y = cv2.getGaussianKernel(rows, rows/4)
-        kernel = kernel_y * kernel_x.T
-        mask = 255 * kernel / np.linalg.norm(kernel)
+        mask = _dramatic_vignette(rows, cols)
         
         for i in range(3):
             contrast[:,:,i] = contrast[:,:,i] * mask
@@ -169,45 +477,77 @@ class ImageProcessService:
         enhancer = ImageEnhance.Color(enhanced)
         enhanced = enhancer.enhance(1.5)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def remove_background(self, image_data, width=None, height=None):
+    @image_operation
+    @decode_size("width", "height", exif_transpose=True)
+    def remove_background(self, image, width=None, height=None, model=None):
         """
         Görüntünün arka planını kaldırır.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param width: Yeni genişlik.
         :param height: Yeni yükseklik.
+        :param model: Model adı veya kalite seviyesi (fast, balanced, best); varsayılan ilk yüklenen modeldir.
         :return: Arka planı kaldırılmış resmin byte verisi.
         """
-        # Yüklenen dosyayı oku
-        input_image = Image.open(BytesIO(image_data))
+        model_name = self.sessions.resolve(model)
+
+        # EXIF yönünü düzelt
+        input_image = ImageOps.exif_transpose(image)
 
         # Oranları koruyarak resmi yeniden boyutlandır
         if width and height:
             input_image.thumbnail((width, height))
 
-        # Arka planı kaldır
-        output_image = remove(input_image)
-
-        # Sonucu byte dizisine kaydet
-        output_buffer = BytesIO()
-        output_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
-
-    def add_shadow(self, image_data):
+        # Ön plan maskesi önbellekte yoksa diğer isteklerle toplu çıkarımda hesaplanır
+        mask = self._foreground_mask(input_image, model_name)
+
+        # Maskeyi saydamlık olarak uygula
+        output_image = Image.new("RGBA", input_image.size, 0)
+        output_image.paste(input_image, (0, 0), mask)
+
+        return output_image
+
+    def _foreground_mask(self, image, model_name):
+        key = None
+        if self.masks.enabled:
+            key = MaskCache.key_for(np.asarray(image), model_name)
+            cached = self.masks.get(key)
+            if cached is not None:
+                return Image.frombytes("L", image.size, cached)
+
+        started = time.perf_counter()
+        mask = self._predict_mask(image, model_name)
+        metrics.SEGMENTATION_LATENCY.observe(time.perf_counter() - started, model=model_name)
+
+        if key is not None:
+            self.masks.put(key, mask.convert("L").tobytes())
+        return mask
+
+    def _predict_mask(self, image, model_name):
+        size = matting.proxy_size(image.size, config.SEGMENTATION_PROXY_SIDE)
+        if size is None:
+            return self.batcher.predict(image, model_name)
+
+        # Büyük girdilerde model küçük kopyada çalışır; maliyet girdi boyutuyla büyümez
+        guide = image if image.mode == "RGB" else image.convert("RGB")
+        proxy = guide.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        mask = self.batcher.predict(proxy, model_name)
+        return Image.fromarray(matting.guided_upsample(
+            np.asarray(mask.convert("L")),
+            np.asarray(proxy.convert("L")),
+            np.asarray(guide.convert("L")),
+        ))
+
+    @image_operation
+    def add_shadow(self, image):
         """
         Resme uygun sanal bir gölge ekler.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Gölgelendirilmiş resmin byte verisi.
         """
         # Orijinal resmi aç
-        image = Image.open(BytesIO(image_data)).convert("RGBA")
+        image = image.convert("RGBA")
         width, height = image.size
 
         # Gölge için boş bir resim oluştur
@@ -227,86 +567,81 @@ class ImageProcessService:
         # Orijinal resmi gölgenin üstüne yerleştir
         shadow.paste(image, (abs(self.shadow_offset[0]), abs(self.shadow_offset[1])), image)
 
-        # Sonucu byte formatına çevir
-        output_buffer = BytesIO()
-        shadow.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        return shadow
 
-        return output_buffer
-
-    def apply_filter(self, image_data, filter_type="grayscale"):
+    @image_operation
+    def apply_filter(self, image, filter_type="grayscale"):
         """
         Resme çeşitli filtreler uygular.
-        :param image_data: Yüklenen resmin byte verisi.
-        :param filter_type: Uygulanacak filtre (grayscale, sepia, negative).
+        :param image: İşlenecek resim.
+        :param filter_type: Uygulanacak filtre (grayscale, negative veya COLOR_MATRICES içindeki bir matris filtresi, ör. sepia).
         :return: Filtrelenmiş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGB")
+        image = image.convert("RGB")
 
         if filter_type == "grayscale":
             image = ImageOps.grayscale(image)
-        elif filter_type == "sepia":
-            sepia_filter = Image.new("RGB", image.size)
-            pixels = image.load()
-            for i in range(image.width):
-                for j in range(image.height):
-                    r, g, b = pixels[i, j]
-                    tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                    tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                    tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                    pixels[i, j] = (min(tr, 255), min(tg, 255), min(tb, 255))
+        elif filter_type in color_matrix.COLOR_MATRICES:
+            # Matris filtreleri piksel döngüsü yerine tek geçişte, vektörel uygulanır
+            image = Image.fromarray(color_matrix.apply_color_matrix(np.asarray(image), color_matrix.COLOR_MATRICES[filter_type]))
         elif filter_type == "negative":
             image = ImageOps.invert(image)
 
-        output_buffer = BytesIO()
-        image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return image
 
-    def resize_image(self, image_data, width, height):
+    @image_operation
+    def apply_color_matrix(self, image, matrix):
+        """
+        Resme 3x4 (veya 3x3) renk matrisi uygular; dördüncü sütun 0-255 ölçeğinde sabit ektir.
+        :param image: İşlenecek resim.
+        :param matrix: Satır sıralı matris (iç içe liste ya da 9/12 elemanlı düz liste).
+        :return: Renk matrisi uygulanmış resmin byte verisi.
+        """
+        matrix = color_matrix.as_color_matrix(matrix)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        return Image.fromarray(color_matrix.apply_color_matrix(np.asarray(image), matrix), mode=image.mode)
+
+    @image_operation
+    @decode_size("width", "height")
+    def resize_image(self, image, width, height):
         """
         Resmi belirtilen genişlik ve yükseklik ile yeniden boyutlandırır.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param width: Yeni genişlik.
         :param height: Yeni yükseklik.
         :return: Boyutlandırılmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data))
         image = image.resize((width, height))
 
-        output_buffer = BytesIO()
-        image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return image
 
-    def rotate_image(self, image_data, angle):
+    @image_operation
+    def rotate_image(self, image, angle):
         """
         Resmi belirli bir derece döndürür.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param angle: Döndürme açısı (derece cinsinden).
         :return: Döndürülmüş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data))
-        rotated_image = image.rotate(angle, expand=True)
-
-        output_buffer = BytesIO()
-        rotated_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        # 90'ın katlarında PIL pikselleri yer değiştirerek döndürür; diğer açılar önbellekli haritayla tek remap'tir
+        if angle % 90 == 0 or image.mode not in warp.MODES:
+            return image.rotate(angle, expand=True)
 
-        return output_buffer
+        return Image.fromarray(warp.rotate(np.asarray(image), angle))
 
-    def add_text(self, image_data, text="Test", position=(10, 10), font_size=30):
+    @image_operation
+    def add_text(self, image, text="Test", position=(10, 10), font_size=30):
         """
         Resmin üzerine yazı ekler.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param text: Eklenecek metin.
         :param position: Metnin konumu (x, y).
         :param font_size: Font boyutu.
         :return: Üzerine metin eklenmiş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGBA")
+        image = image.convert("RGBA")
         draw = ImageDraw.Draw(image)
 
         # Font belirleme (Default font kullanılıyor, harici font ekleyebilirsin)
@@ -315,20 +650,19 @@ class ImageProcessService:
         # Yazıyı çizme
         draw.text(position, text, fill="white", font=font)
 
-        output_buffer = BytesIO()
-        image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        return image
 
-        return output_buffer
-
-    def sketch_effect(self, image_data):
+    @image_operation
+    # Gauss bulanıklığı (21x21)
+    @tiles.tiled(halo=10)
+    def sketch_effect(self, image):
         """
         Resmi çizim efektine çevirir.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Sketch efekti uygulanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGB")
-        image_cv = np.array(image)
+        image = image.convert("RGB")
+        image_cv = np.asarray(image)
 
         gray = cv2.cvtColor(image_cv, cv2.COLOR_RGB2GRAY)
         inverted = cv2.bitwise_not(gray)
@@ -336,89 +670,71 @@ class ImageProcessService:
         sketch = cv2.divide(gray, 255 - blurred, scale=256)
 
         sketch_image = Image.fromarray(sketch)
-        output_buffer = BytesIO()
-        sketch_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        return sketch_image
 
-        return output_buffer
-
-    def crop_image(self, image_data, left, top, right, bottom):
+    @image_operation
+    def crop_image(self, image, left, top, right, bottom):
         """
         Resmi belirli bir alan üzerinden kırpar.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param left: Sol koordinat.
         :param top: Üst koordinat.
         :param right: Sağ koordinat.
         :param bottom: Alt koordinat.
         :return: Kırpılmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data))
         cropped_image = image.crop((left, top, right, bottom))
 
-        output_buffer = BytesIO()
-        cropped_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        return cropped_image
 
-        return output_buffer
-
-    def sharpen_image(self, image_data):
+    @image_operation
+    def sharpen_image(self, image):
         """
         Resmi keskinleştirir.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Keskinleştirilmiş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data))
         sharpened_image = image.filter(ImageFilter.SHARPEN)
 
-        output_buffer = BytesIO()
-        sharpened_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return sharpened_image
 
-    def edge_detection(self, image_data):
+    @image_operation
+    def edge_detection(self, image):
         """
         Resimde kenar algılama işlemi yapar.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Kenar algılanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("L")  # Gri tonlamaya çevir
+        image = image.convert("L")  # Gri tonlamaya çevir
         edges = image.filter(ImageFilter.FIND_EDGES)
 
-        output_buffer = BytesIO()
-        edges.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return edges
 
-    def pixelate_image(self, image_data, pixel_size=10):
+    @image_operation
+    def pixelate_image(self, image, pixel_size=10):
         """
         Resme mozaik (pixelate) efekti uygular.
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param pixel_size: Mozaik boyutu (default: 10).
         :return: Mozaik efekti uygulanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data))
         image = image.resize((image.width // pixel_size, image.height // pixel_size), Image.NEAREST)
         pixelated_image = image.resize((image.width * pixel_size, image.height * pixel_size), Image.NEAREST)
 
-        output_buffer = BytesIO()
-        pixelated_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return pixelated_image
 
-    def apply_basic_shadow(self, image_data, shadow_opacity=120, blur_radius=10, offset=(20, 20)):
+    @image_operation
+    def apply_basic_shadow(self, image, shadow_opacity=120, blur_radius=10, offset=(20, 20)):
         """
         Resmin altına sabit bir gölge ekler.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param shadow_opacity: Gölge saydamlığı (0-255).
         :param blur_radius: Gölge yumuşatma miktarı.
         :param offset: Gölgenin kayma miktarı (x, y).
         :return: Gölge eklenmiş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGBA")
+        image = image.convert("RGBA")
         width, height = image.size
 
         # 🎭 Alfa kanalını alarak nesnenin dış hatlarını belirle
@@ -440,49 +756,34 @@ class ImageProcessService:
         combined.paste(shadow, (0, 0), shadow)
         combined.paste(image, (0, 0), image)
 
-        # 🔄 Sonucu byte formatına çevir
-        output_buffer = BytesIO()
-        combined.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return combined
 
-    def apply_realistic_shadow(self, image_data, light_angle=45, shadow_opacity=120, blur_radius=15, shadow_length=1.0):
+    @image_operation
+    def apply_realistic_shadow(self, image, light_angle=45, shadow_opacity=120, blur_radius=15, shadow_length=1.0):
         """
         Gerçekçi bir açıya göre gölge uygular ve gölge resim boyutlarını aşmaz.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param light_angle: Işık açısı (derece).
         :param shadow_opacity: Gölge opaklığı (0-255).
         :param blur_radius: Gölgenin yumuşatma miktarı.
         :param shadow_length: Gölgenin uzama oranı.
         :return: Gerçekçi gölge eklenmiş resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGBA")
+        image = image.convert("RGBA")
         width, height = image.size
 
         # 🎭 Alfa kanalını alarak nesnenin dış hatlarını belirle
         alpha = image.split()[3]
 
-        # 🖤 Siyah gölge katmanı oluştur
-        shadow_layer = Image.new("RGBA", (width, height), (0, 0, 0, shadow_opacity))
-        shadow_layer.putalpha(alpha)
-
         # 🎯 Gölgenin yönünü ve uzamasını belirle
         angle_radians = np.radians(light_angle)
         x_offset = int(np.cos(angle_radians) * shadow_length * width)  # X ekseninde gölge uzaması
         y_offset = int(np.sin(angle_radians) * shadow_length * height)  # Y ekseninde gölge uzaması
 
-        # 📐 Gölge matris dönüşümü uygula
-        shadow = shadow_layer.transform(
-            (width, height),  # Boyutlar orijinal resim boyutlarıyla sınırlandırılır
-            Image.AFFINE,
-            (
-                1, np.tan(angle_radians), 0,  # X: ölçek, kaydırma
-                0, 1, 0                       # Y: ölçek
-            ),
-            resample=Image.BICUBIC,
-        )
+        # 📐 Gölge matris dönüşümü uygula; siyah gölgede yalnızca alfa kanalı kaydırılır
+        shadow = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        shadow.putalpha(Image.fromarray(warp.shear(np.asarray(alpha), np.tan(angle_radians))))
 
         # 🌫 Gaussian Blur ile gölgeyi yumuşat
         shadow = shadow.filter(ImageFilter.GaussianBlur(blur_radius))
@@ -492,24 +793,21 @@ class ImageProcessService:
         combined.paste(shadow, (0, 0), shadow)
         combined.paste(image, (0, 0), image)
 
-        # 🔄 Sonucu byte formatına çevir
-        output_buffer = BytesIO()
-        combined.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return combined
 
-    def standardize_aspect_ratio(self, image_data, target_width=500, target_height=500, background_color=(255, 255, 255)):
+    @image_operation
+    @decode_size("target_width", "target_height")
+    def standardize_aspect_ratio(self, image, target_width=500, target_height=500, background_color=(255, 255, 255)):
         """
         Resmin oranını standartlaştırır ve hedef boyutlara göre beyaz arka plan ekler.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param target_width: Hedef genişlik.
         :param target_height: Hedef yükseklik.
         :param background_color: Arka plan rengi.
         :return: Standart oranlı resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert("RGBA")
+        image = image.convert("RGBA")
         original_width, original_height = image.size
 
         # Yeni boyutları hesapla
@@ -524,14 +822,9 @@ class ImageProcessService:
         paste_y = (target_height - new_height) // 2
         background.paste(resized_image, (paste_x, paste_y), resized_image)
 
-        # Sonucu döndür
-        output_buffer = BytesIO()
-        background.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-
-        return output_buffer
+        return background
 
-    def remove_background_and_add_shadow(self, image_data, shadow_opacity=120, blur_radius=15, shadow_offset=(15, 15)):
+    def remove_background_and_add_shadow(self, image_data, shadow_opacity=120, blur_radius=15, shadow_offset=(15, 15), model=None, output=None):
         """
         Arka planı kaldırır ve ürüne gölge ekler.
         
@@ -539,28 +832,40 @@ class ImageProcessService:
         :param shadow_opacity: Gölge saydamlığı.
         :param blur_radius: Gölge yumuşatma miktarı.
         :param shadow_offset: Gölgenin kayma miktarı.
+        :param model: Arka plan kaldırma modeli veya kalite seviyesi.
+        :param output: Çıktı biçimi (encoding.OutputFormat).
         :return: Arka planı kaldırılmış ve gölge eklenmiş resmin byte verisi.
         """
-        # 1️⃣ Arka planı kaldır
-        no_bg_image = self.remove_background(image_data)
+        return self.run_pipeline(image_data, [
+            ("remove_background", {"model": model}),  # 1️⃣ Arka planı kaldır
+            ("add_shadow", {}),         # 2️⃣ Gölge ekle
+        ], output)
 
-        # 2️⃣ Gölge ekle
-        shadow_image = self.add_shadow(no_bg_image.getvalue())
-
-        return shadow_image
-
-    def generate_social_media_profile(self, image_data):
+    def generate_social_media_profile(self, image_data, model=None, output=None):
         """
         Gelişmiş sosyal medya profil fotoğrafı hazırlar.
         Arka plan kaldırma, renk dengeleme ve keskinleştirme uygular.
         
         :param image_data: Yüklenen resmin byte verisi
+        :param model: Arka plan kaldırma modeli veya kalite seviyesi
+        :param output: Çıktı biçimi (encoding.OutputFormat)
         :return: İşlenmiş profil fotoğrafının byte verisi
         """
-        # 1. Arka planı kaldır
-        no_bg_buffer = self.remove_background_and_add_shadow(image_data)
+        return self.run_pipeline(image_data, [
+            ("remove_background", {"model": model}),      # 1. Arka planı kaldır
+            ("add_shadow", {}),
+            ("frame_social_profile", {}),   # 2-5. Renk, boyut ve dairesel kırpma
+        ], output)
 
-        image = Image.open(no_bg_buffer).convert("RGBA")
+    @image_operation
+    def frame_social_profile(self, image):
+        """
+        Arka planı kaldırılmış resmi renk dengeleyip 1024x1024 dairesel profil fotoğrafına yerleştirir.
+        
+        :param image: İşlenecek resim
+        :return: Profil fotoğrafının byte verisi
+        """
+        image = image.convert("RGBA")
 
         # 2. Renk geliştirmeleri
         # Kontrast artır
@@ -600,35 +905,26 @@ class ImageProcessService:
         new_image.paste(image, (paste_x, paste_y), image)
         image = new_image
         
-        # 4. Dairesel kırpma için maske oluştur
-        mask = Image.new('L', target_size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0) + target_size, fill=255)
-        
-        # Yumuşak kenarlar için mask'e blur uygula
-        mask = mask.filter(ImageFilter.GaussianBlur(1))
+        # 4. Dairesel kırpma için yumuşak kenarlı maske (önbellekten)
+        mask = Image.fromarray(_profile_mask(*target_size))
         
         # 5. Son görüntüyü oluştur
         output = Image.new('RGBA', target_size, (0, 0, 0, 0))
         output.paste(image, (0, 0), mask)
         
-        # Sonucu döndür
-        output_buffer = BytesIO()
-        output.save(output_buffer, format="PNG", quality=95)
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return output
 
-    def remove_text(self, image_data):
+    @image_operation
+    def remove_text(self, image):
         """
         OpenCV kullanarak metin alanlarını siler.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Metinleri silinmiş resmin byte verisi.
         """
         # 1️⃣ Resmi yükle ve NumPy dizisine dönüştür
-        image = Image.open(BytesIO(image_data)).convert("RGB")
-        image_np = np.array(image)
+        image = image.convert("RGB")
+        image_np = np.asarray(image)
 
         # 2️⃣ Gri tonlama ve kenar tespiti
         gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
@@ -649,23 +945,22 @@ class ImageProcessService:
 
         # 5️⃣ Sonucu byte formatına çevir
         output_image = Image.fromarray(inpainted)
-        output_buffer = BytesIO()
-        output_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
+        return output_image
 
-        return output_buffer
-
-    def apply_cartoon_effect(self, image_data):
+    @image_operation
+    # Medyan (5) ardından uyarlanır eşik (9); bilateral (d=9) bunun içinde kalır
+    @tiles.tiled(halo=6)
+    def apply_cartoon_effect(self, image):
         """
         Resmi çizgi film tarzına dönüştürür.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :return: Çizgi film efekti uygulanmış resmin byte verisi.
         """
-        image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+        image = np.asarray(image.convert('RGB'))
         
         # Gri tonlamaya çevir
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         
         # Kenarları yumuşat
         gray = cv2.medianBlur(gray, 5)
@@ -681,30 +976,29 @@ class ImageProcessService:
         cartoon = cv2.bitwise_and(color, color, mask=edges)
         
         # PIL formatına dönüştür
-        cartoon_image = Image.fromarray(cv2.cvtColor(cartoon, cv2.COLOR_BGR2RGB))
+        cartoon_image = Image.fromarray(cartoon)
         
-        output_buffer = BytesIO()
-        cartoon_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return cartoon_image
 
-    def apply_glitch_effect(self, image_data, intensity=0.1):
+    @image_operation
+    def apply_glitch_effect(self, image, intensity=0.1, seed=None):
         """
         Resme glitch (bozulma) efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param intensity: Efekt yoğunluğu (0-1 arası)
+        :param seed: Rastgele sayı üreteci tohumu (aynı tohum aynı sonucu verir)
         :return: Glitch efekti uygulanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
+        image = image.convert('RGB')
         image_array = np.array(image)
+        rng = np.random.default_rng(seed)
         
         # Rastgele kanal seçimi ve kaydırma
         channels = ['r', 'g', 'b']
         for _ in range(int(intensity * 10)):
-            channel = np.random.choice(channels)
-            shift = np.random.randint(-20, 20)
+            channel = rng.choice(channels)
+            shift = rng.integers(-20, 20)
             
             if channel == 'r':
                 image_array[:, :, 0] = np.roll(image_array[:, :, 0], shift, axis=1)
@@ -715,22 +1009,19 @@ class ImageProcessService:
         
         glitched_image = Image.fromarray(image_array)
         
-        output_buffer = BytesIO()
-        glitched_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return glitched_image
 
-    def apply_neon_effect(self, image_data, glow_amount=2.5):
+    @image_operation
+    def apply_neon_effect(self, image, glow_amount=2.5):
         """
         Resme neon efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
         :param glow_amount: Parlaklık miktarı
         :return: Neon efekti uygulanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_array = np.array(image)
+        image = image.convert('RGB')
+        image_array = np.asarray(image)
         
         # Kenarları belirginleştir
         edges = cv2.Canny(image_array, 100, 200)
@@ -745,20 +1036,18 @@ class ImageProcessService:
         
         neon_image = Image.fromarray(neon)
         
-        output_buffer = BytesIO()
-        neon_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return neon_image
 
-    def apply_vintage_effect(self, image_data):
+    @image_operation
+    def apply_vintage_effect(self, image, seed=None):
         """
         Resme vintage/eski fotoğraf efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi.
+        :param image: İşlenecek resim.
+        :param seed: Gren efekti için rastgele sayı üreteci tohumu
         :return: Vintage efekti uygulanmış resmin byte verisi.
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
+        image = image.convert('RGB')
         
         # Kontrast ve parlaklığı ayarla
         enhancer = ImageEnhance.Contrast(image)
@@ -766,53 +1055,38 @@ class ImageProcessService:
         enhancer = ImageEnhance.Brightness(image)
         image = enhancer.enhance(1.1)
         
-        # Hafif sepya tonu ekle
-        image_array = np.array(image)
-        sepia_matrix = np.array([
-            [0.393, 0.769, 0.189],
-            [0.349, 0.686, 0.168],
-            [0.272, 0.534, 0.131]
-        ])
-        
-        vintage = cv2.transform(image_array, sepia_matrix)
-        vintage = np.clip(vintage, 0, 255)
+        # Hafif sepya tonu ekle (uint8 girdi, doygunlukla kırpılmış uint8 çıktı)
+        vintage = color_matrix.apply_color_matrix(np.asarray(image), color_matrix.SEPIA)
         
-        # Gren efekti ekle
-        noise = np.random.normal(0, 5, vintage.shape)
-        vintage = np.clip(vintage + noise, 0, 255).astype(np.uint8)
+        # Gren efekti ekle; float64 yerine float32 üzerinde, yerinde
+        noise = np.random.default_rng(seed).standard_normal(vintage.shape, dtype=np.float32)
+        noise *= 5
+        noise += vintage
+        vintage = np.clip(noise, 0, 255, out=noise).astype(np.uint8)
         
         vintage_image = Image.fromarray(vintage)
         
-        output_buffer = BytesIO()
-        vintage_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return vintage_image
 
-    def smart_crop(self, image_data, target_width=500, target_height=500):
+    @image_operation
+    def smart_crop(self, image, target_width=500, target_height=500):
         """
         Akıllı kırpma uygular (OpenCV ile yüz tespiti kullanarak).
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :param target_width: Hedef genişlik
         :param target_height: Hedef yükseklik
         :return: Kırpılmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
-        # OpenCV'nin cascade sınıflandırıcısını yükle
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Yüz tespiti yap (küçültülmüş kopya üzerinde; aynı resim için önbellekten)
+        detected = self.faces.detect(image_np)
         
-        # Gri tonlamaya çevir
-        gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
-        
-        # Yüz tespiti yap
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-        
-        if len(faces) > 0:
+        if len(detected) > 0:
             # En büyük yüzü seç
-            x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+            x, y, w, h = (int(v) for v in max(detected, key=lambda f: f[2] * f[3]))
             center_x = x + w//2
             center_y = y + h//2
             
@@ -836,21 +1110,18 @@ class ImageProcessService:
         cropped = image.crop((left, top, right, bottom))
         cropped = cropped.resize((target_width, target_height))
         
-        output_buffer = BytesIO()
-        cropped.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return cropped
 
-    def beautify_face(self, image_data):
+    @image_operation
+    def beautify_face(self, image):
         """
         Basit yüz güzelleştirme efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Güzelleştirilmiş resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Yumuşak cilt efekti
         blurred = cv2.GaussianBlur(image_np, (5, 5), 0)
@@ -867,21 +1138,18 @@ class ImageProcessService:
         enhancer = ImageEnhance.Sharpness(enhanced)
         enhanced = enhancer.enhance(1.3)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def auto_color_correction(self, image_data):
+    @image_operation
+    def auto_color_correction(self, image):
         """
         Otomatik renk düzeltme uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Renk düzeltmesi yapılmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Renk kanallarını ayır
         r, g, b = cv2.split(image_np)
@@ -909,28 +1177,30 @@ class ImageProcessService:
         
         # Sonucu kaydet
         corrected_image = Image.fromarray(corrected)
-        output_buffer = BytesIO()
-        corrected_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return corrected_image
 
-    def apply_watercolor_effect(self, image_data):
+    # Bilateral (d=9) ve medyan (7) yarıçaplarının toplamı
+    @tiles.tiled(halo=7)
+    def _watercolor_smooth(self, image):
+        # Bilateral filtre uygula (kenarları koru, dokuları yumuşat)
+        bilateral = cv2.bilateralFilter(np.asarray(image), 9, 75, 75)
+        # Median blur uygula (suluboya dokusu için)
+        return Image.fromarray(cv2.medianBlur(bilateral, 7))
+
+    @image_operation
+    def apply_watercolor_effect(self, image):
         """
         Resme suluboya efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Suluboya efekti uygulanmış resmin byte verisi
         """
         # Resmi yükle
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
-        
-        # Bilateral filtre uygula (kenarları koru, dokuları yumuşat)
-        bilateral = cv2.bilateralFilter(image_np, 9, 75, 75)
-        
-        # Median blur uygula (suluboya dokusu için)
-        median = cv2.medianBlur(bilateral, 7)
+        image = image.convert('RGB')
+
+        # Pahalı yumuşatma döşemelere bölünebilir; Canny histerezisi kenar boyunca sınırsız uzayabildiğinden
+        # kenar çıkarma ve sonraki ucuz adımlar tüm resimde çalışır, sonuç döşemesiz çalışmayla aynıdır
+        median = np.asarray(self._watercolor_smooth(image))
         
         # Kenarları belirginleştir
         edges = cv2.Canny(median, 50, 150)
@@ -955,22 +1225,21 @@ class ImageProcessService:
         # PIL formatına dönüştür ve kaydet
         watercolor_image = Image.fromarray(result)
         
-        output_buffer = BytesIO()
-        watercolor_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return watercolor_image
 
-    def reduce_noise(self, image_data, strength=0.1):
+    @image_operation
+    # Bilateral (d=9) ve NLM (şablon 7, arama 21) yarıçaplarının toplamı
+    @tiles.tiled(halo=17)
+    def reduce_noise(self, image, strength=0.1):
         """
         Görüntüdeki gürültüyü azaltır.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :param strength: Gürültü azaltma şiddeti (0-1 arası)
         :return: Gürültüsü azaltılmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Bilateral filtre uygula
         denoised = cv2.bilateralFilter(image_np, 9, 75*strength, 75*strength)
@@ -979,54 +1248,55 @@ class ImageProcessService:
         denoised = cv2.fastNlMeansDenoisingColored(denoised, None, 10*strength, 10*strength, 7, 21)
         
         output_image = Image.fromarray(denoised)
-        output_buffer = BytesIO()
-        output_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return output_image
 
-    def apply_texture(self, image_data, texture_type="canvas"):
+    @wand_operation
+    def apply_texture(self, img, texture_type="canvas", seed=None):
         """
         Resme doku efekti ekler.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param texture_type: Doku tipi ("canvas", "paper", "concrete")
+        :param seed: Gürültü için ImageMagick rastgele sayı tohumu
         :return: Doku eklenmiş resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Temel görüntü işleme
-            img.modulate(brightness=100, saturation=100, hue=100)
-            
-            if texture_type == "canvas":
-                # Tuval dokusu
-                img.noise("gaussian", attenuate=0.5)
-                img.motion_blur(radius=2, sigma=1, angle=45)
-                img.sharpen(radius=2, sigma=1)
-            elif texture_type == "paper":
-                # Kağıt dokusu
-                img.noise("gaussian", attenuate=0.3)
-                img.blur(radius=0, sigma=0.5)
-                img.sharpen(radius=1, sigma=0.5)
-            elif texture_type == "concrete":
-                # Beton dokusu
-                img.noise("uniform", attenuate=0.2)
-                img.motion_blur(radius=1, sigma=0.5, angle=90)
-                img.sharpen(radius=1, sigma=1)
-            
-            # Kontrast ayarı
-            img.contrast_stretch(black_point=0.15, white_point=0.95)
-            
-            return BytesIO(img.make_blob('png'))
+        if seed is not None:
+            img.seed = seed
+        
+        # Temel görüntü işleme
+        img.modulate(brightness=100, saturation=100, hue=100)
+        
+        if texture_type == "canvas":
+            # Tuval dokusu
+            img.noise("gaussian", attenuate=0.5)
+            img.motion_blur(radius=2, sigma=1, angle=45)
+            img.sharpen(radius=2, sigma=1)
+        elif texture_type == "paper":
+            # Kağıt dokusu
+            img.noise("gaussian", attenuate=0.3)
+            img.blur(radius=0, sigma=0.5)
+            img.sharpen(radius=1, sigma=0.5)
+        elif texture_type == "concrete":
+            # Beton dokusu
+            img.noise("uniform", attenuate=0.2)
+            img.motion_blur(radius=1, sigma=0.5, angle=90)
+            img.sharpen(radius=1, sigma=1)
+        
+        # Kontrast ayarı
+        img.contrast_stretch(black_point=0.15, white_point=0.95)
+        
+        return img
 
-    def enhance_details(self, image_data):
+    @image_operation
+    def enhance_details(self, image):
         """
         Görüntüdeki detayları geliştirir.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :return: Detayları geliştirilmiş resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Lab renk uzayına dönüştür
         lab = cv2.cvtColor(image_np, cv2.COLOR_RGB2LAB)
@@ -1045,22 +1315,19 @@ class ImageProcessService:
         enhancer = ImageEnhance.Sharpness(enhanced)
         enhanced = enhancer.enhance(1.5)
         
-        output_buffer = BytesIO()
-        enhanced.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return enhanced
 
-    def apply_pencil_sketch(self, image_data, pencil_type="soft"):
+    @image_operation
+    def apply_pencil_sketch(self, image, pencil_type="soft"):
         """
         Resmi karakalem çizimine dönüştürür.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param image: İşlenecek resim
         :param pencil_type: Kalem tipi ("soft" veya "hard")
         :return: Karakalem efekti uygulanmış resmin byte verisi
         """
-        image = Image.open(BytesIO(image_data)).convert('RGB')
-        image_np = np.array(image)
+        image = image.convert('RGB')
+        image_np = np.asarray(image)
         
         # Gri tonlamaya çevir
         gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
@@ -1076,60 +1343,58 @@ class ImageProcessService:
         
         # Sonucu döndür
         sketch_image = Image.fromarray(sketch.astype(np.uint8))
-        output_buffer = BytesIO()
-        sketch_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return output_buffer
+        return sketch_image
 
-    def apply_oil_painting(self, image_data, brush_size=5):
+    @wand_operation
+    def apply_oil_painting(self, img, brush_size=5):
         """
         Resme yağlı boya efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param brush_size: Fırça boyutu
         :return: Yağlı boya efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Yağlı boya efekti
-            img.oil_paint(radius=brush_size, sigma=1.5)
-            
-            return BytesIO(img.make_blob('png'))
+        # Yağlı boya efekti
+        img.oil_paint(radius=brush_size, sigma=1.5)
+        
+        return img
 
-    def apply_polaroid_effect(self, image_data):
+    @wand_operation
+    def apply_polaroid_effect(self, img):
         """
         Polaroid fotoğraf efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :return: Polaroid efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Beyaz çerçeve ekle
-            img.border('white', 20, 20)
-            
-            # Alt kısmı daha geniş yap
-            img.border('white', 0, 60)
-            
-            # Hafif vintage efekti
-            img.modulate(brightness=105, saturation=85, hue=100)
-            
-            # Hafif bulanıklık
-            img.gaussian_blur(sigma=0.5)
-            
-            # Kontrast ayarla
-            img.contrast_stretch(black_point=0.15, white_point=0.95)
-            
-            return BytesIO(img.make_blob('png'))
+        # Beyaz çerçeve ekle
+        img.border('white', 20, 20)
+        
+        # Alt kısmı daha geniş yap
+        img.border('white', 0, 60)
+        
+        # Hafif vintage efekti
+        img.modulate(brightness=105, saturation=85, hue=100)
+        
+        # Hafif bulanıklık
+        img.gaussian_blur(sigma=0.5)
+        
+        # Kontrast ayarla
+        img.contrast_stretch(black_point=0.15, white_point=0.95)
+        
+        return img
 
-    def apply_double_exposure(self, image_data1, image_data2):
+    def apply_double_exposure(self, image_data1, image_data2, output=None):
         """
         İki resmi birleştirerek double exposure efekti uygular.
         
         :param image_data1: Birinci resmin byte verisi
         :param image_data2: İkinci resmin byte verisi
+        :param output: Çıktı biçimi (encoding.OutputFormat)
         :return: Double exposure efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data1) as img1, WandImage(blob=image_data2) as img2:
+        # Yüklemeler memoryview/mmap tamponu olarak gelebilir
+        with self._convert(image_data1, WAND_BACKEND) as img1, self._convert(image_data2, WAND_BACKEND) as img2:
             # İkinci resmi birinci resmin boyutuna getir
             img2.resize(img1.width, img1.height)
             
@@ -1142,388 +1407,345 @@ class ImageProcessService:
             # Kontrast ve parlaklık ayarla
             img1.modulate(brightness=110, saturation=120)
             
-            return BytesIO(img1.make_blob('png'))
+            return self._encode(img1, output)
 
-    def apply_duotone(self, image_data, color1='blue', color2='pink'):
+    @color_effect(color_effects.duotone)
+    def apply_duotone(self, img, color1='blue', color2='pink'):
         """
         Resme duotone efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param color1: Birinci renk
         :param color2: İkinci renk
         :return: Duotone efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Önce siyah-beyaz yap
-            img.modulate(saturation=0)
-            
-            # Renk gradyanı oluştur
-            with WandImage(width=img.width, height=img.height, pseudo=f'gradient:{color1}-{color2}') as gradient:
-                # Gradient ile orijinal resmi birleştir
-                img.composite(gradient, operator='overlay')
-            
-            # Kontrast ayarla
-            img.contrast_stretch(black_point=0.15, white_point=0.95)
-            
-            return BytesIO(img.make_blob('png'))
+        # Önce siyah-beyaz yap
+        img.modulate(saturation=0)
+        
+        # Renk gradyanı oluştur
+        with wand_bridge.WandImage(width=img.width, height=img.height, pseudo=f'gradient:{color1}-{color2}') as gradient:
+            # Gradient ile orijinal resmi birleştir
+            img.composite(gradient, operator='overlay')
+        
+        # Kontrast ayarla
+        img.contrast_stretch(black_point=0.15, white_point=0.95)
+        
+        return img
 
-    def apply_tilt_shift(self, image_data, blur_factor=5):
+    @wand_operation
+    def apply_tilt_shift(self, img, blur_factor=5):
         """
         Minyatür efekti (tilt-shift) uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param blur_factor: Bulanıklık faktörü
         :return: Tilt-shift efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Kopya oluştur ve bulanıklaştır
-            with img.clone() as blurred:
-                blurred.gaussian_blur(sigma=blur_factor)
-                
-                # Merkez bölge için maske oluştur
-                with WandImage(width=img.width, height=img.height, pseudo='gradient:white-black-white') as gradient:
-                    # Gradient'i maske olarak kullan
-                    img.composite_channel('all_channels', blurred, 'blend', 0, 0, arguments=str(gradient.signature))
-            
-            # Renk ve kontrast ayarla
-            img.modulate(brightness=105, saturation=120)
-            img.contrast_stretch(black_point=0.15, white_point=0.95)
+        # Kopya oluştur ve bulanıklaştır
+        with img.clone() as blurred:
+            blurred.gaussian_blur(sigma=blur_factor)
             
-            return BytesIO(img.make_blob('png'))
+            # Merkez bölge için maske oluştur
+            with wand_bridge.WandImage(width=img.width, height=img.height, pseudo='gradient:white-black-white') as gradient:
+                # Gradient'i maske olarak kullan
+                img.composite_channel('all_channels', blurred, 'blend', 0, 0, arguments=str(gradient.signature))
+        
+        # Renk ve kontrast ayarla
+        img.modulate(brightness=105, saturation=120)
+        img.contrast_stretch(black_point=0.15, white_point=0.95)
+        
+        return img
 
-    def apply_color_splash(self, image_data, color_to_keep='red'):
+    @color_effect(color_effects.color_splash)
+    def apply_color_splash(self, img, color_to_keep='red'):
         """
         Seçilen renk dışındaki tüm renkleri siyah-beyaz yapar.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param color_to_keep: Korunacak renk ('red', 'green', 'blue', 'yellow' vb.)
         :return: Color splash efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Orijinal resmin kopyasını al ve siyah-beyaz yap
-            with img.clone() as bw_img:
-                bw_img.modulate(saturation=0)
-                
-                # Renk maskeleme için yeni bir görüntü oluştur
-                with img.clone() as mask:
-                    # Seçilen rengi vurgula
-                    if color_to_keep == 'red':
-                        mask.level(0.4, 0.8, gamma=1.2, channel='red')
-                        mask.level(0.0, 0.5, gamma=0.8, channel='green')
-                        mask.level(0.0, 0.5, gamma=0.8, channel='blue')
-                    elif color_to_keep == 'blue':
-                        mask.level(0.0, 0.5, gamma=0.8, channel='red')
-                        mask.level(0.0, 0.5, gamma=0.8, channel='green')
-                        mask.level(0.4, 0.8, gamma=1.2, channel='blue')
-                    elif color_to_keep == 'green':
-                        mask.level(0.0, 0.5, gamma=0.8, channel='red')
-                        mask.level(0.4, 0.8, gamma=1.2, channel='green')
-                        mask.level(0.0, 0.5, gamma=0.8, channel='blue')
-                    elif color_to_keep == 'yellow':
-                        mask.level(0.4, 0.8, gamma=1.2, channel='red')
-                        mask.level(0.4, 0.8, gamma=1.2, channel='green')
-                        mask.level(0.0, 0.5, gamma=0.8, channel='blue')
-                    
-                    # Maskeyi gri tonlamaya çevir
-                    mask.transform_colorspace('gray')
-                    
-                    # Maskeyi keskinleştir
-                    mask.sharpen(radius=0, sigma=3.0)
-                    
-                    # Orijinal ve siyah-beyaz görüntüleri birleştir
-                    bw_img.composite(img, operator='copy_opacity')
-                    bw_img.composite(mask, operator='multiply')
-                
-                output_buffer = BytesIO()
-                bw_img.save(output_buffer, format='png')
-                output_buffer.seek(0)
-                
-                return output_buffer
-
-    def apply_mirror_effect(self, image_data, direction='horizontal'):
+        # Orijinal resmin kopyasını al ve siyah-beyaz yap
+        bw_img = img.clone()
+        bw_img.modulate(saturation=0)
+        
+        # Renk maskeleme için yeni bir görüntü oluştur
+        with img.clone() as mask:
+            # Seçilen rengi vurgula
+            if color_to_keep == 'red':
+                mask.level(0.4, 0.8, gamma=1.2, channel='red')
+                mask.level(0.0, 0.5, gamma=0.8, channel='green')
+                mask.level(0.0, 0.5, gamma=0.8, channel='blue')
+            elif color_to_keep == 'blue':
+                mask.level(0.0, 0.5, gamma=0.8, channel='red')
+                mask.level(0.0, 0.5, gamma=0.8, channel='green')
+                mask.level(0.4, 0.8, gamma=1.2, channel='blue')
+            elif color_to_keep == 'green':
+                mask.level(0.0, 0.5, gamma=0.8, channel='red')
+                mask.level(0.4, 0.8, gamma=1.2, channel='green')
+                mask.level(0.0, 0.5, gamma=0.8, channel='blue')
+            elif color_to_keep == 'yellow':
+                mask.level(0.4, 0.8, gamma=1.2, channel='red')
+                mask.level(0.4, 0.8, gamma=1.2, channel='green')
+                mask.level(0.0, 0.5, gamma=0.8, channel='blue')
+            
+            # Maskeyi gri tonlamaya çevir
+            mask.transform_colorspace('gray')
+            
+            # Maskeyi keskinleştir
+            mask.sharpen(radius=0, sigma=3.0)
+            
+            # Orijinal ve siyah-beyaz görüntüleri birleştir
+            bw_img.composite(img, operator='copy_opacity')
+            bw_img.composite(mask, operator='multiply')
+        
+        return bw_img
+
+    @image_operation
+    def apply_mirror_effect(self, img, direction='horizontal'):
         """
         Resme ayna efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param direction: Ayna yönü ('horizontal' veya 'vertical')
         :return: Ayna efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Resmi ikiye böl
-            if direction == 'horizontal':
-                width = img.width // 2
-                with img[0:width, 0:img.height] as half:
-                    # Sağ yarıyı sol yarının aynası yap
-                    half.flop()
-                    img.composite(half, left=width, top=0)
-            else:  # vertical
-                height = img.height // 2
-                with img[0:img.width, 0:height] as half:
-                    # Alt yarıyı üst yarının aynası yap
-                    half.flip()
-                    img.composite(half, left=0, top=height)
-            
-            return BytesIO(img.make_blob('png'))
+        # Sağ (yatay) veya alt (dikey) yarı, sol/üst yarının aynası olur
+        return Image.fromarray(warp.mirror(self._to_array(img), direction))
 
-    def apply_kaleidoscope(self, image_data, segments=8):
+    @image_operation
+    def apply_kaleidoscope(self, img, segments=8):
         """
         Resme kaleydoskop efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param segments: Bölüm sayısı
         :return: Kaleydoskop efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Resmi kare yap
-            size = min(img.width, img.height)
-            img.crop(width=size, height=size, gravity='center')
-            
-            # Merkeze göre döndür ve çoğalt
-            angle = 360 / segments
-            original = img.clone()
-            
-            for i in range(1, segments):
-                with original.clone() as segment:
-                    segment.rotate(angle * i)
-                    img.composite(segment, operator='over')
-            
-            # Efekti güçlendir
-            img.modulate(brightness=110, saturation=130)
-            
-            return BytesIO(img.make_blob('png'))
+        # Ortadaki kare ve döndürülmüş kopyaları bölüm sayısından bağımsız tek remap geçişinde birleşir
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        return Image.fromarray(warp.kaleidoscope(np.asarray(img), segments))
 
-    def apply_wave_distortion(self, image_data, amplitude=5, wavelength=10):
+    @image_operation
+    def apply_wave_distortion(self, img, amplitude=5, wavelength=10):
         """
         Resme dalga distorsiyonu efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param amplitude: Dalga yüksekliği
         :param wavelength: Dalga uzunluğu
         :return: Dalga efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Dalga efekti uygula (wave_length parametresi düzeltildi)
-            img.wave(amplitude=amplitude, wave_length=wavelength)
-            
-            # Kenarları düzelt
-            img.trim()
-            
-            return BytesIO(img.make_blob('png'))
+        # Dalga efekti uygulanır ve kenarlar düzeltilir
+        return Image.fromarray(warp.wave(self._to_array(img), amplitude, wavelength))
 
-    def apply_vignette(self, image_data, sigma=3.0, opacity=0.5):
+    @wand_operation
+    def apply_vignette(self, img, sigma=3.0, opacity=0.5):
         """
         Resme vignette (kenar kararma) efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param sigma: Kenar yumuşatma miktarı
         :param opacity: Kenar kararma opaklığı
         :return: Vignette efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Orijinal boyutları al
-            width = img.width
-            height = img.height
-            
-            # Oval maske oluştur
-            with WandImage(width=width, height=height, pseudo='radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,1)') as mask:
-                # Maskeyi yumuşat
-                mask.gaussian_blur(sigma=sigma)
-                
-                # Opaklığı ayarla
-                mask.evaluate(operator='multiply', value=opacity)
-                
-                # Maskeyi uygula
-                img.composite(mask, operator='multiply')
-            
-            return BytesIO(img.make_blob('png'))
+        # Yumuşatılmış ve opaklığı ayarlanmış oval maske (boyuta ve parametrelere göre önbellekten)
+        mask = _wand_vignette(img.width, img.height, 'radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,1)', sigma, opacity)
+        
+        # Maskeyi uygula
+        with wand_bridge.from_array(mask) as mask:
+            img.composite(mask, operator='multiply')
+        
+        return img
 
-    def apply_gradient_map(self, image_data, start_color='blue', end_color='red'):
+    @color_effect(color_effects.gradient_map)
+    def apply_gradient_map(self, img, start_color='blue', end_color='red'):
         """
         Resme gradient map efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param start_color: Başlangıç rengi
         :param end_color: Bitiş rengi
         :return: Gradient map efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Önce gri tonlamaya çevir
-            img.transform_colorspace('gray')
-            
-            # Gradient oluştur
-            with WandImage(width=img.width, height=img.height, pseudo=f'gradient:{start_color}-{end_color}') as gradient:
-                # Gri tonlamalı görüntüyü maske olarak kullan
-                gradient.composite(img, operator='atop')
-                
-                # Sonucu orijinal görüntüye uygula
-                img.composite(gradient, operator='replace')
+        # Önce gri tonlamaya çevir
+        img.transform_colorspace('gray')
+        
+        # Gradient oluştur
+        with wand_bridge.WandImage(width=img.width, height=img.height, pseudo=f'gradient:{start_color}-{end_color}') as gradient:
+            # Gri tonlamalı görüntüyü maske olarak kullan
+            gradient.composite(img, operator='atop')
             
-            return BytesIO(img.make_blob('png'))
+            # Sonucu orijinal görüntüye uygula
+            img.composite(gradient, operator='replace')
+        
+        return img
 
-    def apply_selective_color(self, image_data, target_color='red', adjustment=0.2):
+    @color_effect(color_effects.selective_color)
+    def apply_selective_color(self, img, target_color='red', adjustment=0.2):
         """
         Belirli bir renk kanalını seçici olarak ayarlar.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param target_color: Hedef renk ('red', 'green', 'blue', 'cyan', 'magenta', 'yellow')
         :param adjustment: Ayarlama miktarı (-1.0 ile 1.0 arası)
         :return: Renk ayarı yapılmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Renk kanalını seç ve ayarla
-            if target_color in ['red', 'green', 'blue']:
-                img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel=target_color)
-            elif target_color == 'cyan':
-                img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='red')
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='green')
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='blue')
-            elif target_color == 'magenta':
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='red')
-                img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='green')
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='blue')
-            elif target_color == 'yellow':
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='red')
-                img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='green')
-                img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='blue')
-            
-            return BytesIO(img.make_blob('png'))
-
-    def apply_cross_process(self, image_data, intensity=0.3):
+        # Renk kanalını seç ve ayarla
+        if target_color in ['red', 'green', 'blue']:
+            img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel=target_color)
+        elif target_color == 'cyan':
+            img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='red')
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='green')
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='blue')
+        elif target_color == 'magenta':
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='red')
+            img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='green')
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='blue')
+        elif target_color == 'yellow':
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='red')
+            img.level(black=0.0, white=1.0, gamma=1.0 - adjustment, channel='green')
+            img.level(black=0.0, white=1.0, gamma=1.0 + adjustment, channel='blue')
+        
+        return img
+
+    @color_effect(color_effects.cross_process)
+    def apply_cross_process(self, img, intensity=0.3):
         """
         Cross processing efekti uygular (analog fotoğrafçılıktan esinlenilmiş).
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param intensity: Efekt yoğunluğu (0.0 ile 1.0 arası)
         :return: Cross process efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Renk kanallarını ayarla
-            img.level(black=0.0, white=1.0, gamma=1.2, channel='red')
-            img.level(black=0.0, white=1.0, gamma=0.8, channel='blue')
-            
-            # Kontrast artır
-            img.contrast_stretch(black_point=0.1 * intensity)
-            
-            # Doygunluğu artır
-            img.modulate(saturation=100 + (50 * intensity))
-            
-            # Hafif renk kayması
-            img.evaluate(operator='add', value=intensity * 10, channel='green')
-            
-            return BytesIO(img.make_blob('png'))
+        # Renk kanallarını ayarla
+        img.level(black=0.0, white=1.0, gamma=1.2, channel='red')
+        img.level(black=0.0, white=1.0, gamma=0.8, channel='blue')
+        
+        # Kontrast artır
+        img.contrast_stretch(black_point=0.1 * intensity)
+        
+        # Doygunluğu artır
+        img.modulate(saturation=100 + (50 * intensity))
+        
+        # Hafif renk kayması
+        img.evaluate(operator='add', value=intensity * 10, channel='green')
+        
+        return img
 
-    def apply_lomo(self, image_data):
+    @wand_operation
+    def apply_lomo(self, img):
         """
         Lomo fotoğraf efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :return: Lomo efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Renk doygunluğunu artır
-            img.modulate(saturation=150)
-            
-            # Kontrast artır
-            img.contrast_stretch(black_point=0.15, white_point=0.95)
-            
-            # Vignette efekti ekle
-            with WandImage(width=img.width, height=img.height, pseudo='radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,0.5)') as vignette:
-                vignette.gaussian_blur(sigma=10)
-                img.composite(vignette, operator='multiply')
-            
-            # Renk sıcaklığını artır
-            img.modulate(brightness=110, saturation=150, hue=95)
-            
-            return BytesIO(img.make_blob('png'))
+        # Renk doygunluğunu artır
+        img.modulate(saturation=150)
+        
+        # Kontrast artır
+        img.contrast_stretch(black_point=0.15, white_point=0.95)
+        
+        # Vignette efekti ekle
+        vignette = _wand_vignette(img.width, img.height, 'radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,0.5)', 10, None)
+        with wand_bridge.from_array(vignette) as vignette:
+            img.composite(vignette, operator='multiply')
+        
+        # Renk sıcaklığını artır
+        img.modulate(brightness=110, saturation=150, hue=95)
+        
+        return img
 
-    def apply_bleach_bypass(self, image_data, intensity=0.5):
+    @color_effect(color_effects.bleach_bypass)
+    def apply_bleach_bypass(self, img, intensity=0.5):
         """
         Bleach bypass efekti uygular (film işlemeden esinlenilmiş).
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param intensity: Efekt yoğunluğu (0.0 ile 1.0 arası)
         :return: Bleach bypass efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Orijinal görüntüyü kopyala
-            with img.clone() as overlay:
-                # Gri tonlamaya çevir
-                overlay.transform_colorspace('gray')
-                
-                # Kontrastı artır
-                overlay.contrast_stretch(black_point=0.1, white_point=0.9)
-                
-                # Opaklığı ayarla
-                overlay.evaluate(operator='multiply', value=intensity)
-                
-                # Orijinal görüntü ile karıştır
-                img.composite(overlay, operator='overlay')
-            
-            # Doygunluğu azalt
-            img.modulate(saturation=100 - (30 * intensity))
+        # Orijinal görüntüyü kopyala
+        with img.clone() as overlay:
+            # Gri tonlamaya çevir
+            overlay.transform_colorspace('gray')
             
             # Kontrastı artır
-            img.contrast_stretch(black_point=0.1 * intensity)
+            overlay.contrast_stretch(black_point=0.1, white_point=0.9)
+            
+            # Opaklığı ayarla
+            overlay.evaluate(operator='multiply', value=intensity)
             
-            return BytesIO(img.make_blob('png'))
+            # Orijinal görüntü ile karıştır
+            img.composite(overlay, operator='overlay')
+        
+        # Doygunluğu azalt
+        img.modulate(saturation=100 - (30 * intensity))
+        
+        # Kontrastı artır
+        img.contrast_stretch(black_point=0.1 * intensity)
+        
+        return img
 
-    def apply_infrared(self, image_data):
+    @color_effect(color_effects.infrared)
+    def apply_infrared(self, img):
         """
         Kızılötesi fotoğraf efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :return: Kızılötesi efekti uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            # Renk kanallarını ayarla
-            img.level(black=0.0, white=0.8, gamma=1.2, channel='red')
-            img.level(black=0.2, white=1.0, gamma=0.8, channel='blue')
-            
-            # Yeşil kanalı güçlendir
-            img.level(black=0.0, white=1.0, gamma=0.5, channel='green')
-            
-            # Kontrastı artır
-            img.contrast_stretch(black_point=0.1, white_point=0.9)
-            
-            # Glow efekti ekle
-            with img.clone() as glow:
-                glow.gaussian_blur(sigma=3)
-                # Glow efektinin yoğunluğunu ayarla
-                glow.evaluate(operator='multiply', value=0.3)  # %30 opaklık
-                img.composite(glow, operator='screen')
-            
-            # Son rötuşlar
-            img.modulate(brightness=120, saturation=50)
-            
-            return BytesIO(img.make_blob('png'))
+        # Renk kanallarını ayarla
+        img.level(black=0.0, white=0.8, gamma=1.2, channel='red')
+        img.level(black=0.2, white=1.0, gamma=0.8, channel='blue')
+        
+        # Yeşil kanalı güçlendir
+        img.level(black=0.0, white=1.0, gamma=0.5, channel='green')
+        
+        # Kontrastı artır
+        img.contrast_stretch(black_point=0.1, white_point=0.9)
+        
+        # Glow efekti ekle
+        with img.clone() as glow:
+            glow.gaussian_blur(sigma=3)
+            # Glow efektinin yoğunluğunu ayarla
+            glow.evaluate(operator='multiply', value=0.3)  # %30 opaklık
+            img.composite(glow, operator='screen')
+        
+        # Son rötuşlar
+        img.modulate(brightness=120, saturation=50)
+        
+        return img
 
-    def apply_cinematic(self, image_data, tone='cool'):
+    @color_effect(color_effects.cinematic)
+    def apply_cinematic(self, img, tone='cool'):
         """
         Sinematik renk tonu efekti uygular.
         
-        :param image_data: Yüklenen resmin byte verisi
+        :param img: İşlenecek resim
         :param tone: Renk tonu ('cool' veya 'warm')
         :return: Sinematik efekt uygulanmış resmin byte verisi
         """
-        with WandImage(blob=image_data) as img:
-            if tone == 'cool':
-                # Soğuk tonlar için
-                img.level(black=0.1, white=0.9, gamma=1.1, channel='blue')
-                img.level(black=0.1, white=0.9, gamma=0.95, channel='red')
-            else:
-                # Sıcak tonlar için
-                img.level(black=0.1, white=0.9, gamma=0.95, channel='blue')
-                img.level(black=0.1, white=0.9, gamma=1.1, channel='red')
-            
-            # Kontrast ayarla
-            img.contrast_stretch(black_point=0.1, white_point=0.9)
-            
-            # Vignette efekti ekle
-            with WandImage(width=img.width, height=img.height, pseudo='radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,0.3)') as vignette:
-                vignette.gaussian_blur(sigma=15)
-                img.composite(vignette, operator='multiply')
-            
-            # Renk doygunluğunu ayarla
-            img.modulate(saturation=85)
-            
-            return BytesIO(img.make_blob('png'))
\ No newline at end of file
+        if tone == 'cool':
+            # Soğuk tonlar için
+            img.level(black=0.1, white=0.9, gamma=1.1, channel='blue')
+            img.level(black=0.1, white=0.9, gamma=0.95, channel='red')
+        else:
+            # Sıcak tonlar için
+            img.level(black=0.1, white=0.9, gamma=0.95, channel='blue')
+            img.level(black=0.1, white=0.9, gamma=1.1, channel='red')
+        
+        # Kontrast ayarla
+        img.contrast_stretch(black_point=0.1, white_point=0.9)
+        
+        # Vignette efekti ekle
+        vignette = _wand_vignette(img.width, img.height, 'radial-gradient:rgba(255,255,255,1)-rgba(0,0,0,0.3)', 15, None)
+        with wand_bridge.from_array(vignette) as vignette:
+            img.composite(vignette, operator='multiply')
+        
+        # Renk doygunluğunu ayarla
+        img.modulate(saturation=85)
+        
+        return img
\ No newline at end of file
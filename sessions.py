@@ -0,0 +1,139 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from PIL import Image
+
+import backends
+import metrics
+
+# rembg (onnxruntime, pymatting, numba) yalnızca ilk oturum açılırken içe aktarılır;
+# segmentasyon yapmayan işçi süreçler bu maliyeti hiç ödemez
+rembg = backends.lazy("rembg", "rembg")
+
+# pymatting numba'yı içe aktarılırken başlatır; TBB katmanı ana iş parçacığı dışında başlatılırsa
+# süreç çıkışta kilitlenir. Arka plan ısıtması için yerleşik workqueue katmanı kullanılır.
+os.environ.setdefault("NUMBA_THREADING_LAYER", "workqueue")
+
+
+class SessionRegistry:
+    def __init__(self, model_dir, model_names=("u2net",), pool_size=1, acquire_timeout=30.0, allow_download=False,
+                 tiers=None):
+        """
+        rembg/ONNX oturumlarını yerel model dizininden yükleyip havuzda tutar.
+        :param model_dir: .onnx model dosyalarının bulunduğu dizin.
+        :param model_names: Başlangıçta yüklenecek model adları (ilki varsayılan modeldir).
+        :param pool_size: Her model için açılacak oturum sayısı.
+        :param acquire_timeout: Boş oturum için beklenecek en uzun süre (saniye).
+        :param allow_download: Model dosyası yoksa indirmeye izin verilip verilmeyeceği.
+        :param tiers: Kalite seviyesi -> model adı eşlemesi (ör. {"fast": "u2netp"}).
+        """
+        self.model_dir = model_dir
+        self.model_names = tuple(model_names)
+        self.pool_size = max(1, pool_size)
+        self.acquire_timeout = acquire_timeout
+        self.allow_download = allow_download
+        self.tiers = dict(tiers or {})
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.load_seconds = {}
+
+    @property
+    def default_model(self):
+        return self.model_names[0]
+
+    def resolve(self, model=None):
+        """
+        İstekte verilen model adını veya kalite seviyesini yüklü modellerden birine çevirir.
+        :param model: Model adı, seviye adı (ör. "fast") veya None (varsayılan model).
+        :return: Model adı.
+        :raises ValueError: Model tanımlı değilse veya seviyenin modeli yüklenmiyorsa.
+        """
+        if not model:
+            return self.default_model
+        model_name = self.tiers.get(model, model)
+        if model_name in self.model_names:
+            return model_name
+        if model in self.tiers:
+            raise ValueError(f"'{model}' seviyesinin modeli ({model_name}) yüklü değil; REMBG_MODELS listesine eklenmelidir")
+        raise ValueError(
+            f"Bilinmeyen model: '{model}'. Modeller: {', '.join(self.model_names)}; "
+            f"seviyeler: {', '.join(self.tiers)}"
+        )
+
+    def model_path(self, model_name):
+        """
+        Modelin yerel dosya yolunu döndürür.
+        """
+        return os.path.join(self.model_dir, f"{model_name}.onnx")
+
+    def load(self):
+        """
+        Tanımlı tüm modelleri yükler ve ısıtır. Uygulama başlangıcında çağrılır.
+        """
+        for model_name in self.model_names:
+            self._get_pool(model_name)
+
+    def _get_pool(self, model_name):
+        pool = self._pools.get(model_name)
+        if pool is not None:
+            return pool
+
+        with self._lock:
+            pool = self._pools.get(model_name)
+            if pool is None:
+                pool = self._create_pool(model_name)
+                self._pools[model_name] = pool
+        return pool
+
+    def _create_pool(self, model_name):
+        # rembg modelleri U2NET_HOME dizininde arar; üretimde dışarıya erişim yok
+        os.environ["U2NET_HOME"] = self.model_dir
+        if not self.allow_download and not os.path.isfile(self.model_path(model_name)):
+            raise FileNotFoundError(
+                f"'{model_name}' modeli bulunamadı: {self.model_path(model_name)}"
+            )
+
+        started = time.perf_counter()
+        pool = queue.Queue(maxsize=self.pool_size)
+        for _ in range(self.pool_size):
+            session = rembg.new_session(model_name)
+            self._warm_up(session)
+            pool.put(session)
+        self.load_seconds[model_name] = time.perf_counter() - started
+        metrics.MODEL_LOAD_SECONDS.set(self.load_seconds[model_name], model=model_name)
+        return pool
+
+    def status(self):
+        """
+        Tanımlı modellerin durumu: {model: {"loaded", "load_seconds"}}
+        """
+        return {
+            model_name: {"loaded": model_name in self._pools, "load_seconds": self.load_seconds.get(model_name)}
+            for model_name in self.model_names
+        }
+
+    @staticmethod
+    def _warm_up(session):
+        # İlk çıkarım ONNX Runtime'ın bellek ayırma ve graf optimizasyonunu tetikler
+        session.predict(Image.new("RGB", (64, 64)))
+
+    @contextmanager
+    def acquire(self, model_name=None):
+        """
+        Havuzdan bir oturum alır, iş bitince geri bırakır.
+        :param model_name: Kullanılacak model (varsayılan: ilk model).
+        """
+        model_name = model_name or self.default_model
+        pool = self._get_pool(model_name)
+        try:
+            session = pool.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"'{model_name}' için boşta oturum bulunamadı")
+
+        try:
+            yield session
+        finally:
+            pool.put(session)
@@ -0,0 +1,47 @@
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Modüller depo kökünde düz duruyor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_image(width=96, height=64, mode="RGB", seed=0):
+    """
+    Gradyan, keskin kenarlar ve gürültü içeren küçük deneme resmi.
+    """
+    rng = np.random.default_rng(seed)
+    xs = np.linspace(0, 255, width)[None, :]
+    ys = np.linspace(0, 255, height)[:, None]
+    red = np.broadcast_to(xs, (height, width))
+    green = np.broadcast_to(ys, (height, width))
+    blue = np.where((np.arange(width)[None, :] // 12 + np.arange(height)[:, None] // 12) % 2, 220.0, 30.0)
+    pixels = np.dstack([red, green, blue]) + rng.normal(0, 12, (height, width, 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+    if mode == "RGBA":
+        alpha = np.full((height, width), 255, np.uint8)
+        alpha[: height // 4] = 0
+        alpha[:, : width // 5] = 128
+        image.putalpha(Image.fromarray(alpha, "L"))
+    return image.convert(mode) if mode not in ("RGB", "RGBA") else image
+
+
+def png_bytes(image):
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")
+def service():
+    from service import ImageProcessService
+    return ImageProcessService()
+
+
+@pytest.fixture
+def image_data():
+    return png_bytes(make_image())
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+import admission
+
+
+def test_divide_limits_splits_instance_limits_between_workers():
+    limits = admission.default_limits(6, 8)
+    assert admission.divide_limits(limits, 3) == {
+        admission.SEGMENTATION: (2, 5),
+        admission.HEAVY: (1, 3),
+        admission.LIGHT: (4, 16),
+    }
+
+
+def test_divide_limits_keeps_one_slot_per_class():
+    assert admission.divide_limits({"heavy": (2, 1)}, 4) == {"heavy": (1, 0)}
+    assert admission.divide_limits({"heavy": (3, 6)}, 1) == {"heavy": (3, 6)}
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _settle():
+    # Bekleyen görevlerin sıradaki adımlarını çalıştırması için
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_rejects_when_capacity_and_queue_are_full():
+    async def run():
+        operation_class = admission.OperationClass("heavy", 1, 1)
+        await operation_class.acquire(retry_after=3)
+        waiter = asyncio.create_task(operation_class.acquire(retry_after=3))
+        await _settle()
+        with pytest.raises(admission.Overloaded) as exc_info:
+            await operation_class.acquire(retry_after=3)
+        operation_class.release()
+        await waiter
+        return operation_class, exc_info.value
+
+    operation_class, error = _run(run())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "3"
+    assert operation_class.rejected == 1
+    assert (operation_class.active, operation_class.queued) == (1, 0)
+
+
+def test_release_hands_slot_to_waiters_in_order():
+    async def run():
+        operation_class = admission.OperationClass("heavy", 1, 3)
+        order = []
+
+        async def worker(name):
+            await operation_class.acquire(retry_after=1)
+            order.append(name)
+
+        await operation_class.acquire(retry_after=1)
+        tasks = []
+        for name in "abc":
+            tasks.append(asyncio.create_task(worker(name)))
+            await _settle()
+        assert operation_class.queued == 3
+        for _ in range(3):
+            # Yer bekleyene doğrudan devredilir; active sayısı değişmez
+            operation_class.release()
+            assert operation_class.active == 1
+            await _settle()
+        await asyncio.gather(*tasks)
+        operation_class.release()
+        return operation_class, order
+
+    operation_class, order = _run(run())
+    assert order == ["a", "b", "c"]
+    assert (operation_class.active, operation_class.queued) == (0, 0)
+
+
+def test_cancel_after_handoff_passes_slot_on():
+    async def run():
+        operation_class = admission.OperationClass("heavy", 1, 2)
+        await operation_class.acquire(retry_after=1)
+        first = asyncio.create_task(operation_class.acquire(retry_after=1))
+        second = asyncio.create_task(operation_class.acquire(retry_after=1))
+        await _settle()
+        # Yer ilk bekleyene devredilir, o uyanmadan iptal edilir; yer ikinciye geçer
+        operation_class.release()
+        first.cancel()
+        await _settle()
+        assert first.cancelled()
+        await second
+        assert (operation_class.active, operation_class.queued) == (1, 0)
+        operation_class.release()
+        return operation_class
+
+    operation_class = _run(run())
+    assert (operation_class.active, operation_class.queued) == (0, 0)
+
+
+def test_cancel_while_queued_leaves_queue():
+    async def run():
+        operation_class = admission.OperationClass("heavy", 1, 1)
+        await operation_class.acquire(retry_after=1)
+        waiter = asyncio.create_task(operation_class.acquire(retry_after=1))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        assert operation_class.queued == 0
+        operation_class.release()
+        return operation_class
+
+    operation_class = _run(run())
+    assert (operation_class.active, operation_class.queued) == (0, 0)
+
+
+def test_wait_bypasses_queue_limit():
+    async def run():
+        operation_class = admission.OperationClass("heavy", 1, 0)
+        await operation_class.acquire(retry_after=1)
+        with pytest.raises(admission.Overloaded):
+            await operation_class.acquire(retry_after=1)
+        # Arka plan işi kuyruk sınırına takılmadan sırada bekler
+        waiter = asyncio.create_task(operation_class.acquire(retry_after=1, wait=True))
+        await _settle()
+        assert operation_class.queued == 1 and not waiter.done()
+        operation_class.release()
+        await waiter
+        operation_class.release()
+        return operation_class
+
+    operation_class = _run(run())
+    assert operation_class.rejected == 1
+    assert (operation_class.active, operation_class.queued) == (0, 0)
+
+
+def test_slot_uses_heaviest_pipeline_class():
+    controller = admission.AdmissionController(admission.default_limits(2, 2))
+
+    async def run():
+        async with controller.slot("run_pipeline", ["resize_image", "remove_background"]) as name:
+            assert controller.snapshot()[name]["active"] == 1
+            return name
+
+    assert _run(run()) == admission.SEGMENTATION
+    assert controller.snapshot()[admission.SEGMENTATION]["active"] == 0
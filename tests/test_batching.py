@@ -0,0 +1,60 @@
+import logging
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from batching import SegmentationBatcher
+
+
+class _Inner:
+    def __init__(self, batch_dim):
+        self.batch_dim = batch_dim
+        self.calls = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=[self.batch_dim, 3, 320, 320])]
+
+    def run(self, outputs, feeds):
+        tensors = feeds["input"]
+        self.calls.append(len(tensors))
+        return [np.ones((len(tensors), 1, 320, 320), np.float32)]
+
+
+class _Sessions:
+    default_model = "u2netp"
+    model_names = ("u2netp",)
+    pool_size = 1
+
+    def __init__(self, batch_dim):
+        self.inner = _Inner(batch_dim)
+
+    @contextmanager
+    def acquire(self, model_name=None):
+        yield SimpleNamespace(inner_session=self.inner)
+
+
+def test_fixed_batch_model_warns_at_warm_up(caplog):
+    batcher = SegmentationBatcher(_Sessions(1), max_batch_size=4)
+    with caplog.at_level(logging.WARNING, logger="batching"):
+        assert batcher.check_models() == {"u2netp": False}
+    assert "u2netp" in caplog.text and "REMBG_BATCH_SIZE=4" in caplog.text
+    assert batcher.snapshot()["batchable"] == {"u2netp": False}
+
+
+def test_fixed_batch_model_runs_sequentially():
+    sessions = _Sessions(1)
+    batcher = SegmentationBatcher(sessions, max_batch_size=4)
+    tensors = [np.zeros((3, 320, 320), np.float32)] * 3
+    assert len(batcher._run("u2netp", tensors)) == 3
+    assert sessions.inner.calls == [1, 1, 1]
+
+
+def test_dynamic_batch_model_runs_batched(caplog):
+    sessions = _Sessions("batch_size")
+    batcher = SegmentationBatcher(sessions, max_batch_size=4)
+    with caplog.at_level(logging.WARNING, logger="batching"):
+        assert batcher.check_models() == {"u2netp": True}
+    assert not caplog.records
+    assert len(batcher._run("u2netp", [np.zeros((3, 320, 320), np.float32)] * 3)) == 3
+    assert sessions.inner.calls == [3]
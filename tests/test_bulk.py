@@ -0,0 +1,135 @@
+import asyncio
+import json
+import zipfile
+from io import BytesIO
+
+import pytest
+
+import bulk
+from conftest import make_image, png_bytes
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("photos/cat.jpg", "photos/cat.jpg"),
+    ("../../etc/cron.d/job.jpg", "etc/cron.d/job.jpg"),
+    ("/abs/path/x.png", "abs/path/x.png"),
+    ("C:\\Users\\me\\..\\x.jpg", "Users/me/x.jpg"),
+    ("a/./b/../c.jpg", "a/b/c.jpg"),
+    ("..", "fallback"),
+    ("", "fallback"),
+])
+def test_safe_name(name, expected):
+    assert bulk.safe_name(name, "fallback") == expected
+
+
+def test_output_name_never_leaves_the_archive_root():
+    assert bulk.output_name("../../x.jpg", "image/png") == "x.png"
+    assert bulk.output_name("/tmp/y.png", "image/jpeg") == "tmp/y.jpg"
+
+
+def _zip(names):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, name.encode())
+    buffer.seek(0)
+    return buffer
+
+
+def test_archive_items_sanitise_entry_names():
+    items = bulk.archive_items(_zip(["../evil.jpg", "/abs.jpg", "ok/a.jpg"]), max_items=10, max_item_bytes=1024)
+    assert [item.name for item in items] == ["evil.jpg", "abs.jpg", "ok/a.jpg"]
+    assert items[0].load() == b"../evil.jpg"
+
+
+class _Upload:
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.file = BytesIO(data)
+
+
+def test_spool_files_sanitise_upload_filenames():
+    items, spool = bulk.spool_files([_Upload("../../a.jpg", b"a"), _Upload(None, b"b")], 10, 1024)
+    try:
+        assert [item.name for item in items] == ["a.jpg", "image-1"]
+        assert [item.load() for item in items] == [b"a", b"b"]
+    finally:
+        spool.close()
+
+
+def test_streamed_archive_has_only_relative_entries():
+    items = bulk.archive_items(_zip(["../../x.jpg", "/y.jpg"]), max_items=10, max_item_bytes=1024)
+
+    async def run(image_data):
+        return BytesIO(b"\x89PNG" + image_data)
+
+    async def collect():
+        return b"".join([chunk async for chunk in bulk.stream_results(items, run, concurrency=2)])
+
+    with zipfile.ZipFile(BytesIO(asyncio.run(collect()))) as archive:
+        names = archive.namelist()
+    assert sorted(names) == ["manifest.json", "x.png", "y.png"]
+
+
+def _collect(items, run, concurrency=2):
+    async def collect():
+        return b"".join([chunk async for chunk in bulk.stream_results(items, run, concurrency=concurrency)])
+    return zipfile.ZipFile(BytesIO(asyncio.run(collect())))
+
+
+def test_streamed_entries_match_single_requests(service):
+    images = [png_bytes(make_image(seed=seed)) for seed in range(3)]
+    items = [bulk.BulkItem("a.png", lambda: images[0]), bulk.BulkItem("b/c.jpg", lambda: images[1]),
+             bulk.BulkItem("a.png", lambda: images[2]), bulk.BulkItem("broken.png", lambda: b"not an image")]
+
+    async def run(image_data):
+        return await asyncio.to_thread(service.sketch_effect, image_data)
+
+    with _collect(items, run) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["total"] == 4 and manifest["succeeded"] == 3 and manifest["failed"] == 1
+        entries = manifest["items"]
+        # Aynı adlı kaynaklar ayrı girdilere yazılır; hatalı resim diğerlerini durdurmaz
+        assert sorted(entry.get("output") for entry in entries[:3]) == ["a-1.png", "a.png", "b/c.png"]
+        assert entries[3]["status"] == "error" and entries[3]["source"] == "broken.png"
+        for entry, image_data in zip(entries, images):
+            assert archive.read(entry["output"]) == service.sketch_effect(image_data).getvalue()
+
+
+def test_results_stream_before_the_batch_finishes():
+    release = asyncio.Event()
+    running = []
+    peak = []
+
+    async def run(image_data):
+        running.append(image_data)
+        peak.append(len(running))
+        if image_data == b"slow":
+            await release.wait()
+        running.remove(image_data)
+        return BytesIO(b"\x89PNG" + image_data)
+
+    items = [bulk.BulkItem(f"{index}.png", lambda data=data: data) for index, data in enumerate([b"slow", b"1", b"2"])]
+
+    async def consume():
+        chunks = bulk.stream_results(items, run, concurrency=2)
+        # Yavaş resim bitmeden hızlı resimlerin girdileri akar
+        first = await chunks.__anext__()
+        assert b"1.png" in first
+        release.set()
+        return first + b"".join([chunk async for chunk in chunks])
+
+    with zipfile.ZipFile(BytesIO(asyncio.run(consume()))) as archive:
+        assert archive.read("0.png") == b"\x89PNGslow"
+    assert max(peak) == 2
+
+
+def test_archive_limits_and_hidden_entries():
+    items = bulk.archive_items(_zip(["__MACOSX/._a.jpg", "dir/.DS_Store", "a.jpg"]), max_items=1, max_item_bytes=1024)
+    assert [item.name for item in items] == ["a.jpg"]
+    with pytest.raises(ValueError, match="en fazla 1"):
+        bulk.archive_items(_zip(["a.jpg", "b.jpg"]), max_items=1, max_item_bytes=1024)
+    with pytest.raises(ValueError, match="boyut sınırını"):
+        bulk.archive_items(_zip(["long-name.jpg"]), max_items=1, max_item_bytes=4)
+    with pytest.raises(ValueError, match="Geçersiz zip"):
+        bulk.archive_items(BytesIO(b"not a zip"), max_items=1, max_item_bytes=4)
@@ -0,0 +1,90 @@
+import asyncio
+
+from PIL import Image
+
+from cache import ResultCache
+from conftest import make_image, png_bytes
+from executor import OperationExecutor, THREAD
+from service import ImageProcessService
+
+
+def _key(cache, service, steps):
+    return cache.key_for(service.run_pipeline, "run_pipeline", (b"image", steps), {})
+
+
+def test_unseeded_operation_is_not_cached(service):
+    cache = ResultCache(memory_bytes=1024 * 1024)
+    assert cache.key_for(service.apply_glitch_effect, "apply_glitch_effect", (b"image",), {}) is None
+    assert cache.key_for(service.apply_glitch_effect, "apply_glitch_effect", (b"image",), {"seed": 1}) is not None
+    assert cache.bypasses == 1
+
+
+def test_pipeline_with_unseeded_step_is_not_cached(service):
+    cache = ResultCache(memory_bytes=1024 * 1024)
+    assert _key(cache, service, [("resize_image", {"width": 10}), ("apply_glitch_effect", {})]) is None
+    assert _key(cache, service, [("apply_texture", {"texture_type": "canvas"})]) is None
+    assert cache.bypasses == 2
+
+
+def test_pipeline_with_seeded_steps_is_cached(service):
+    cache = ResultCache(memory_bytes=1024 * 1024)
+    steps = [("apply_glitch_effect", {"seed": 7}), ("apply_vintage_effect", {"seed": 7})]
+    assert _key(cache, service, steps) == _key(cache, service, list(steps))
+    assert _key(cache, service, steps) != _key(cache, service, [("apply_glitch_effect", {"seed": 8})])
+    assert _key(cache, service, [("resize_image", {"width": 10})]) is not None
+    assert cache.bypasses == 0
+
+
+def test_key_ignores_parameter_order(service):
+    cache = ResultCache(memory_bytes=1024 * 1024)
+    steps = [("resize_image", {"width": 10, "height": 20}), ("apply_texture", {"seed": 3, "texture_type": "canvas"})]
+    reordered = [("resize_image", {"height": 20, "width": 10}), ("apply_texture", {"texture_type": "canvas", "seed": 3})]
+    assert _key(cache, service, steps) == _key(cache, service, reordered)
+    assert _key(cache, service, steps) != _key(cache, service, [("resize_image", {"width": 20, "height": 10})] + steps[1:])
+    assert cache.key_for(service.resize_image, "resize_image", (b"image",), {"width": 10, "height": 20}) == \
+        cache.key_for(service.resize_image, "resize_image", (b"image", 10), {"height": 20})
+
+
+def test_unseeded_pipeline_results_differ(service, image_data):
+    # /pipeline/, /jobs/ ve /bulk/ run_pipeline üzerinden önbelleğe gider
+    executor = OperationExecutor(service, None, default_route=THREAD, cache=ResultCache(memory_bytes=1024 * 1024))
+
+    async def run():
+        steps = [("apply_glitch_effect", {"intensity": 0.5})]
+        return [(await executor.run("run_pipeline", image_data, steps)).getvalue() for _ in range(2)]
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert first != second
+    assert executor.cache.bypasses == 2
+
+
+def test_mask_is_reused_across_background_removal_endpoints(monkeypatch):
+    service = ImageProcessService()
+    monkeypatch.setattr(service.sessions, "model_names", ("u2net", "u2netp"))
+    predicted = []
+
+    def predict(image, model_name=None):
+        predicted.append((image.size, model_name))
+        return image.convert("L")
+
+    monkeypatch.setattr(service.batcher, "predict", predict)
+    image_data = png_bytes(make_image())
+
+    first = service.remove_background(image_data).getvalue()
+    # Aynı fotoğrafın gölge ve profil denemeleri maskeyi yeniden hesaplamaz
+    service.remove_background_and_add_shadow(image_data)
+    service.generate_social_media_profile(image_data)
+    assert service.remove_background(image_data).getvalue() == first
+    assert predicted == [((96, 64), "u2net")]
+    assert service.masks.snapshot()["hits"] == 3
+
+    # Başka model veya başka pikseller önbellekte bulunmaz
+    service.remove_background(image_data, model="u2netp")
+    service.remove_background(png_bytes(make_image(seed=1)))
+    with Image.open(service.remove_background(image_data, width=48, height=48)) as thumbnail:
+        assert thumbnail.size == (48, 32)
+    assert predicted[1:] == [((96, 64), "u2netp"), ((96, 64), "u2net"), ((48, 32), "u2net")]
+    assert service.masks.snapshot()["misses"] == 4
@@ -0,0 +1,109 @@
+import colorsys
+
+import cv2
+import numpy as np
+import pytest
+
+import color_effects
+from conftest import make_image
+from service import NATIVE_BACKEND, PIL_BACKEND, WAND_BACKEND, ImageProcessService
+
+NATIVE_EFFECTS = {
+    "selective_color": {"target_color": "cyan", "adjustment": 0.3},
+    "cross_process": {"intensity": 0.5},
+    "infrared": {},
+    "cinematic": {"tone": "warm"},
+    "bleach_bypass": {"intensity": 0.7},
+    "duotone": {"color1": "navy", "color2": "#ffcc00"},
+    "gradient_map": {"start_color": "blue", "end_color": "red"},
+    "color_splash": {"color_to_keep": "green"},
+}
+
+
+@pytest.fixture(scope="module")
+def rgb():
+    return np.ascontiguousarray(np.asarray(make_image(80, 60, seed=5)))
+
+
+def _quantum(rgb):
+    return rgb.astype(np.float64) * 257
+
+
+@pytest.mark.parametrize("target", ["red", "green", "blue", "cyan", "magenta", "yellow", "white"])
+def test_selective_color_lut_matches_per_pixel_levels(rgb, target):
+    # LUT'suz yol: level her pikselin ImageMagick ölçeğindeki değerine ayrı ayrı uygulanır
+    values = _quantum(rgb)
+    signs = {color_effects._CHANNELS[target]: 1} if target in color_effects._CHANNELS else \
+        dict(enumerate(color_effects._SELECTIVE_GAMMAS.get(target, ())))
+    for channel, sign in signs.items():
+        values[:, :, channel] = color_effects.level(values[:, :, channel], 0.0, 1.0, 1.0 + sign * 0.25)
+    expected = np.rint(values / 257).astype(np.uint8)
+    assert np.array_equal(color_effects.selective_color(rgb, target, 0.25), expected)
+
+
+def test_stretched_curves_match_stretching_pixels(rgb):
+    curves = color_effects.identity_curves()
+    curves[0] = color_effects.level(curves[0], 0.0, 0.8, 1.2)
+    curves[2] = color_effects.level(curves[2], 0.2, 1.0, 0.8)
+    leveled = color_effects.apply_curves(rgb, curves)
+
+    black, white = color_effects._stretch_bounds(color_effects.pixel_intensity(leveled), 0.1, 0.9)
+    expected = color_effects._stretch(leveled.astype(np.float64), black, white)
+    actual = color_effects.apply_curves(rgb, color_effects.contrast_stretch_curves(rgb, curves, 0.1, 0.9))
+    assert np.array_equal(actual, expected.astype(np.float32))
+
+
+def test_gradient_map_lut_matches_per_pixel_ramp(rgb):
+    start, end = np.array([0, 0, 255]) * 257.0, np.array([255, 0, 0]) * 257.0
+    gray = cv2.transform(rgb, color_effects._LUMA).astype(np.float64)
+    expected = np.rint((start + (end - start) * (gray / 255)[:, :, None]) / 257).astype(np.uint8)
+    assert np.array_equal(color_effects.gradient_map(rgb, "blue", "red"), expected)
+
+
+@pytest.mark.parametrize("brightness, saturation", [(100, 100), (100, 0), (100, 150), (120, 50), (80, 85)])
+def test_modulate_matches_hsl_reference(rgb, brightness, saturation):
+    values = color_effects.apply_curves(rgb, color_effects.identity_curves())
+    actual = color_effects.modulate(values, brightness, saturation)
+
+    expected = np.empty_like(actual, dtype=np.float64)
+    q = color_effects.QUANTUM_RANGE
+    for index, pixel in enumerate(values.reshape(-1, 3)):
+        hue, light, sat = colorsys.rgb_to_hls(*(pixel / q))
+        # ImageMagick ModulateHSL gibi: ölçeklenen açıklık ve doygunluk kırpılmaz, yalnızca sonuç kırpılır
+        light, sat = light * brightness / 100, sat * saturation / 100
+        expected.reshape(-1, 3)[index] = np.array(colorsys.hls_to_rgb(hue, light, sat)) * q
+    # float32 aritmetiği; 8 bit çıktıda bir birimden (257) çok daha küçük
+    assert np.abs(actual - np.clip(expected, 0, q)).max() < 1.0
+
+
+@pytest.mark.parametrize("effect", sorted(NATIVE_EFFECTS))
+def test_rgba_keeps_alpha(effect):
+    rgba = np.asarray(make_image(mode="RGBA"))
+    result = getattr(color_effects, effect)(rgba, **NATIVE_EFFECTS[effect])
+    assert result.shape == rgba.shape and result.dtype == np.uint8
+    assert np.array_equal(result[:, :, 3], rgba[:, :, 3])
+
+
+def _wand_available():
+    try:
+        import wand.image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Wand zinciri gri resmi opak geçişin üzerine "atop" ile bindirip düz gri döndürüyordu;
+# native uygulama gerçek eşlemeyi yapar, bu yüzden karşılaştırılmaz
+@pytest.mark.skipif(not _wand_available(), reason="ImageMagick yüklenemedi")
+@pytest.mark.parametrize("effect", sorted(set(NATIVE_EFFECTS) - {"gradient_map"}))
+def test_native_matches_wand(effect, image_data):
+    service = ImageProcessService()
+    outputs = {}
+    for backend, method in getattr(ImageProcessService, f"apply_{effect}").variants.items():
+        image = service._convert(image_data, method.backend)
+        result = method.step(service, image, **NATIVE_EFFECTS[effect])
+        outputs[backend] = np.asarray(service._convert(result, PIL_BACKEND).convert("RGB"), dtype=np.int16)
+        service._release(result)
+    diff = np.abs(outputs[NATIVE_BACKEND] - outputs[WAND_BACKEND])
+    assert diff.mean() < 1.0
+    assert (diff.max(axis=2) > 2).mean() < 0.01
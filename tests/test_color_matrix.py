@@ -0,0 +1,74 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import color_matrix
+from conftest import make_image, png_bytes
+
+
+def _sepia_loop(image):
+    # Eski yol: her piksel Python döngüsünde dönüştürülür, 255'te kırpılır
+    result = Image.new("RGB", image.size)
+    source, pixels = image.load(), result.load()
+    for i in range(image.width):
+        for j in range(image.height):
+            r, g, b = source[i, j][:3]
+            tr = int(0.393 * r + 0.769 * g + 0.189 * b)
+            tg = int(0.349 * r + 0.686 * g + 0.168 * b)
+            tb = int(0.272 * r + 0.534 * g + 0.131 * b)
+            pixels[i, j] = (min(tr, 255), min(tg, 255), min(tb, 255))
+    return np.asarray(result, dtype=np.int16)
+
+
+@pytest.fixture(scope="module")
+def bright():
+    # Açık bölgelerde sepya toplamı 255'i aşar ve kırpılır
+    array = np.asarray(make_image(80, 60, seed=3)).copy()
+    array[:10, :10] = 255
+    array[-10:, -10:] = (200, 180, 160)
+    return array
+
+
+def test_sepia_matches_per_pixel_loop(bright):
+    expected = _sepia_loop(Image.fromarray(bright))
+    actual = color_matrix.apply_color_matrix(bright, color_matrix.SEPIA)
+    assert actual.dtype == np.uint8 and actual.shape == bright.shape
+    # Döngü aşağı yuvarlıyordu, vektörel yol en yakına yuvarlar
+    assert np.abs(actual - expected).max() <= 1
+    clipped = expected == 255
+    assert clipped.any()
+    assert (actual[clipped] == 255).all()
+
+
+def test_rgba_keeps_alpha():
+    rgba = np.asarray(make_image(mode="RGBA"))
+    actual = color_matrix.apply_color_matrix(rgba, color_matrix.SEPIA)
+    assert actual.shape == rgba.shape
+    assert np.array_equal(actual[:, :, 3], rgba[:, :, 3])
+    assert np.abs(actual[:, :, :3] - _sepia_loop(Image.fromarray(rgba))).max() <= 1
+
+
+def test_offset_column_and_float_input_are_clipped():
+    array = np.asarray(make_image(40, 30, seed=1))
+    matrix = [[1, 0, 0, -300], [0, 1, 0, 300], [0, 0, 1, 0]]
+    actual = color_matrix.apply_color_matrix(array, matrix)
+    assert (actual[:, :, 0] == 0).all() and (actual[:, :, 1] == 255).all()
+    assert np.array_equal(actual[:, :, 2], array[:, :, 2])
+
+    floats = color_matrix.apply_color_matrix(array.astype(np.float32), np.eye(3) * 2)
+    assert floats.dtype == np.float32
+    assert np.array_equal(floats, np.minimum(array.astype(np.float32) * 2, 255))
+
+
+@pytest.mark.parametrize("matrix", [[1, 0, 0, 1], np.eye(4), [[1, 0, 0], [0, 1, 0], [0, 0, float("nan")]]])
+def test_rejects_invalid_matrix(matrix):
+    with pytest.raises(ValueError):
+        color_matrix.as_color_matrix(matrix)
+
+
+def test_apply_filter_sepia_matches_per_pixel_loop(service):
+    image = make_image(seed=4)
+    with Image.open(BytesIO(service.apply_filter(png_bytes(image), "sepia").getvalue())) as result:
+        assert np.abs(np.asarray(result, dtype=np.int16) - _sepia_loop(image)).max() <= 1
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import ExifTags, Image, JpegImagePlugin
+
+from conftest import make_image
+from service import ImageProcessService
+
+SIZE = (1600, 1200)
+
+
+def _jpeg(orientation=None):
+    image = make_image(*SIZE)
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[ExifTags.Base.Orientation] = orientation
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def drafts(monkeypatch):
+    # Her draft çağrısında istenen boyut ve çözülecek boyut kaydedilir
+    calls = []
+    draft = JpegImagePlugin.JpegImageFile.draft
+
+    def recording_draft(self, mode, size):
+        result = draft(self, mode, size)
+        calls.append((size, self.size))
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", recording_draft)
+    return calls
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ImageProcessService()
+    # Segmentasyon modeli olmadan: resmin kırmızı kanalından maske
+    monkeypatch.setattr(service.batcher, "predict", lambda image, model_name=None: image.convert("RGB").getchannel("R"))
+    return service
+
+
+def _decode(result):
+    with Image.open(result) as image:
+        return np.asarray(image.convert("RGBA"), dtype=np.int16)
+
+
+def _without_draft(service, monkeypatch, operation, image_data, **params):
+    with monkeypatch.context() as patch:
+        patch.setattr(service, "_draft", lambda image, step, args, kwargs: None)
+        return _decode(getattr(service, operation)(image_data, **params))
+
+
+@pytest.mark.parametrize("operation, params", [
+    ("resize_image", {"width": 300, "height": 200}),
+    ("standardize_aspect_ratio", {"target_width": 250, "target_height": 250}),
+    ("remove_background", {"width": 180, "height": 180}),
+])
+@pytest.mark.parametrize("orientation", [None, 6])
+def test_draft_keeps_output_size(service, monkeypatch, drafts, operation, params, orientation):
+    image_data = _jpeg(orientation)
+    expected = _without_draft(service, monkeypatch, operation, image_data, **params)
+    drafts.clear()
+    actual = _decode(getattr(service, operation)(image_data, **params))
+
+    # Hedefi karşılayan en küçük DCT ölçeğinde çözülür
+    (requested, decoded), = drafts
+    assert decoded == (400, 300)
+    assert decoded[0] >= requested[0] and decoded[1] >= requested[1]
+    assert actual.shape == expected.shape
+    # Küçültülmüş DCT çözümü tam çözümden biraz farklıdır
+    assert np.abs(actual - expected).mean() < 3
+
+
+def test_exif_rotated_background_removal_size(service, drafts):
+    # Saklanan 1600x1200 resim EXIF 6 ile 1200x1600 gösterilir
+    result = _decode(service.remove_background(_jpeg(6), width=150, height=400))
+    assert drafts == [((400, 150), (400, 300))]
+    assert result.shape[:2] == (200, 150)
+
+
+def test_no_draft_without_target_size(service, drafts):
+    image_data = _jpeg()
+    assert _decode(service.remove_background(image_data)).shape[:2] == SIZE[::-1]
+    assert drafts == []
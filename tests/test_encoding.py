@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import encoding
+from conftest import make_image, png_bytes
+from encoding import AUTO, JPEG, PNG, WEBP
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, AUTO),
+    ("*/*", AUTO),
+    ("image/webp", WEBP),
+    ("image/webp;q=0.5, image/jpeg;q=0.9", JPEG),
+    ("image/png, image/*;q=0.1", PNG),
+    ("text/html, image/avif, image/webp, */*;q=0.8", WEBP),
+    # Daha özel image/* tanımı */* değerini ezer; açıkça adı geçen biçimler ikisini de ezer
+    ("image/*;q=0.2, */*, image/jpeg;q=0.5", JPEG),
+    ("image/jpeg;q=0.1, image/*;q=0.9, */*", AUTO),
+])
+def test_accept_quality_values(accept, expected):
+    assert encoding.negotiate(accept).format == expected
+
+
+def test_image_wildcard_overrides_any():
+    qualities, explicit = encoding.parse_accept("*/*, image/*;q=0.3")
+    assert qualities == {PNG: 0.3, JPEG: 0.3, WEBP: 0.3}
+    assert explicit == set()
+    qualities, _ = encoding.parse_accept("image/*;q=0.3, */*;q=1")
+    assert qualities == {PNG: 0.3, JPEG: 0.3, WEBP: 0.3}
+
+
+@pytest.mark.parametrize("accept", [
+    "image/png;q=0, image/jpeg;q=0, image/webp;q=0",
+    "image/*;q=0, */*",
+    "text/html",
+    "image/avif",
+    "image/png;q=bozuk",
+])
+def test_nothing_acceptable(accept):
+    with pytest.raises(ValueError, match="kabul ettiği"):
+        encoding.negotiate(accept)
+
+
+def test_equally_preferred_formats_follow_transparency():
+    # PNG de kabul ediliyorsa biçim sonucun saydamlığına bırakılır; istemci WebP istediyse kayıplı biçim WebP olur
+    assert encoding.negotiate("image/png, image/webp")[:2] == (AUTO, WEBP)
+    assert encoding.negotiate("image/png, image/jpeg")[:2] == (AUTO, JPEG)
+    # PNG kabul edilmiyorsa saydam sonuçlar da WebP ile kodlanır
+    assert encoding.negotiate("image/jpeg, image/webp")[:2] == (WEBP, WEBP)
+
+
+@pytest.mark.parametrize("requested, expected", [("png", PNG), ("jpg", JPEG), ("JPEG", JPEG), ("auto", AUTO)])
+def test_format_parameter_wins_over_accept(requested, expected):
+    assert encoding.negotiate("image/webp, image/png;q=0", requested).format == expected
+
+
+def test_rejects_unknown_settings():
+    with pytest.raises(ValueError, match="Desteklenmeyen"):
+        encoding.negotiate(None, "gif")
+    with pytest.raises(ValueError, match="profil"):
+        encoding.negotiate(None, profile="tiny")
+
+
+@pytest.mark.parametrize("lossy", [JPEG, WEBP])
+def test_auto_picks_png_only_for_transparent_results(lossy):
+    output = encoding.OutputFormat(AUTO, lossy, "balanced", None, None)
+    transparent = make_image(mode="RGBA")
+    opaque = make_image(mode="RGBA")
+    opaque.putalpha(255)
+    media_types = [encoding.media_type_for(encoding.encode_pil(image, output))
+                   for image in (transparent, opaque, make_image(), make_image(mode="L"))]
+    # Tamamen opak alfa kanalı opak sayılır
+    assert media_types == ["image/png"] + [encoding.MEDIA_TYPES[lossy]] * 3
+
+
+@pytest.mark.parametrize("fmt", encoding.FORMATS)
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+def test_media_type_matches_encoded_format(fmt, mode):
+    output = encoding.OutputFormat(fmt, JPEG, "fast", None, None)
+    encoded = encoding.encode_pil(make_image(mode=mode), output)
+    assert encoding.media_type_for(encoded) == encoding.MEDIA_TYPES[fmt]
+    # İmza okunurken tamponun konumu değişmez
+    assert encoded.tell() == 0
+    with Image.open(encoded) as image:
+        assert image.format.lower() == fmt
+
+
+def test_endpoint_negotiation(image_data):
+    import main
+
+    client = TestClient(main.app)
+
+    def post(headers=None, params=None):
+        return client.post("/apply-filter/", files={"file": ("image.png", image_data)}, headers=headers, params=params)
+
+    assert post({"Accept": "image/webp"}).headers["content-type"] == "image/webp"
+    assert post({"Accept": "image/webp"}, {"format": "png"}).headers["content-type"] == "image/png"
+    assert post({"Accept": "image/png;q=0, image/jpeg"}).headers["content-type"] == "image/jpeg"
+    response = post({"Accept": "image/*;q=0"})
+    assert response.status_code == 406
+
+
+def test_transparent_upload_stays_png_with_auto(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main.config, "OUTPUT_FORMAT", AUTO)
+    client = TestClient(main.app)
+    response = client.post("/add-shadow/", files={"file": ("image.png", png_bytes(make_image(mode="RGBA")))})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
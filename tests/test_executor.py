@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+from io import BytesIO
+
+import pytest
+
+from executor import PROCESS, THREAD, OperationExecutor, parse_routes
+from service import ImageProcessService
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_routes():
+    executor = OperationExecutor(None, None, routes=parse_routes(["reduce_noise = thread"]))
+    assert executor.route_for("reduce_noise") == THREAD
+    assert executor.route_for("sketch_effect") == PROCESS
+    assert executor.route_for("remove_background") == THREAD
+    # Arka plan kaldırma içeren pipeline ana süreçteki oturum havuzuna gider
+    assert executor._route("run_pipeline", (b"", [("resize_image", {}), ("remove_background", {})]), {}) == THREAD
+    assert executor._route("run_pipeline", (b"", [("resize_image", {})]), {}) == PROCESS
+    with pytest.raises(ValueError):
+        OperationExecutor(None, None, routes={"reduce_noise": "gpu"})
+
+
+@pytest.mark.parametrize("route", [THREAD, PROCESS])
+def test_pooled_result_matches_direct_call(service, image_data, route):
+    executor = OperationExecutor(service, ImageProcessService, process_workers=1, default_route=route)
+    try:
+        # Yükleme tamponu (memoryview) süreç havuzuna bytes olarak taşınır
+        result = _run(executor.run("reduce_noise", memoryview(image_data), strength=0.3))
+        pipeline = _run(executor.run("run_pipeline", image_data, [("resize_image", {"width": 40, "height": 30})]))
+    finally:
+        executor.shutdown()
+    assert result.getvalue() == service.reduce_noise(image_data, strength=0.3).getvalue()
+    assert pipeline.getvalue() == service.resize_image(image_data, 40, 30).getvalue()
+
+
+def test_thread_route_keeps_event_loop_free():
+    release = threading.Event()
+
+    class Service:
+        def slow(self):
+            release.wait(5)
+            return BytesIO(b"done")
+
+    executor = OperationExecutor(Service(), None, default_route=THREAD)
+
+    async def run():
+        operation = asyncio.create_task(executor.run("slow"))
+        # İşlem sürerken olay döngüsü diğer işleri çalıştırmaya devam eder
+        started = time.perf_counter()
+        await asyncio.sleep(0.05)
+        assert time.perf_counter() - started < 1
+        assert not operation.done()
+        release.set()
+        return await operation
+
+    try:
+        assert _run(run()).getvalue() == b"done"
+    finally:
+        executor.shutdown()
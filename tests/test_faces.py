@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import faces
+from conftest import make_image
+
+
+class FakeClassifier:
+    def __init__(self, found):
+        self.found = found
+        self.calls = []
+
+    def detectMultiScale(self, gray, scale_factor, min_neighbors):
+        self.calls.append((gray.shape, gray.dtype, scale_factor, min_neighbors))
+        return self.found
+
+
+def _detector(found, **kwargs):
+    detector = faces.FaceDetector(**kwargs)
+    detector._classifier = FakeClassifier(found)
+    return detector
+
+
+def test_boxes_are_scaled_to_full_resolution():
+    # Uzun kenarı 640 olan kopyada bulunan kutular 1280x960 resme iki kat büyütülür
+    detector = _detector(np.array([[10, 20, 30, 40], [101, 3, 25, 25]]), max_side=640)
+    found = detector.detect(np.asarray(make_image(1280, 960)))
+    assert np.array_equal(found, [[20, 40, 60, 80], [202, 6, 50, 50]])
+    assert found.dtype == np.int32
+    assert detector._classifier.calls == [((480, 640), np.uint8, 1.3, 5)]
+
+
+def test_uneven_scale_rounds_boxes():
+    detector = _detector(np.array([[100, 50, 33, 33]]), max_side=300)
+    found = detector.detect(np.asarray(make_image(1000, 500, mode="L")))
+    assert detector._classifier.calls[0][0] == (150, 300)
+    assert np.array_equal(found, [[333, 167, 110, 110]])
+
+
+def test_small_image_is_not_resized():
+    detector = _detector(np.array([[1, 2, 3, 4]]), max_side=640)
+    assert np.array_equal(detector.detect(np.asarray(make_image())), [[1, 2, 3, 4]])
+    assert detector._classifier.calls[0][0] == (64, 96)
+
+
+def test_no_faces():
+    detector = _detector(())
+    found = detector.detect(np.asarray(make_image()))
+    assert found.shape == (0, 4)
+
+
+def test_cached_result_is_reused():
+    detector = _detector(np.array([[10, 20, 30, 40]]), max_side=320)
+    image_np = np.asarray(make_image(640, 480))
+    first = detector.detect(image_np)
+    second = detector.detect(image_np.copy())
+    assert second is first
+    assert not first.flags.writeable
+    assert len(detector._classifier.calls) == 1
+
+    # Farklı parametreler veya pikseller önbellekte bulunmaz
+    detector.detect(image_np, scale_factor=1.1)
+    detector.detect(np.asarray(make_image(640, 480, seed=1)))
+    assert len(detector._classifier.calls) == 3
+
+
+@pytest.mark.parametrize("cache_size, calls", [(0, 3), (1, 3), (2, 2)])
+def test_cache_size(cache_size, calls):
+    detector = _detector(np.array([[1, 1, 2, 2]]), cache_size=cache_size)
+    first, second = np.asarray(make_image()), np.asarray(make_image(seed=1))
+    for image_np in (first, second, first):
+        detector.detect(image_np)
+    assert len(detector._classifier.calls) == calls
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backends
+import jobs
+import main
+
+
+@pytest.fixture
+def warm_up(monkeypatch, tmp_path):
+    # Modeller yüklenmeden: motor yüklemesi olay tetiklenene kadar sürer
+    release = threading.Event()
+    result = {"ok": True}
+
+    def load_all(engines=None):
+        release.wait(5)
+        if isinstance(result["ok"], Exception):
+            raise result["ok"]
+        return result["ok"]
+
+    monkeypatch.setattr(backends, "load_all", load_all)
+    monkeypatch.setattr(main.service.sessions, "load", lambda: None)
+    monkeypatch.setattr(main.service.batcher, "check_models", lambda: {})
+    monkeypatch.setattr(main, "startup", {"started": time.monotonic(), "ready": False, "seconds": None, "error": None})
+    monkeypatch.setattr(main.job_manager, "store", jobs.JobStore(str(tmp_path)))
+    return release, result
+
+
+def _wait_for_warm_up(client):
+    deadline = time.monotonic() + 5
+    while main.startup["ready"] is False and main.startup["error"] is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return client.get("/readyz")
+
+
+def test_ready_after_warm_up(warm_up):
+    release, _ = warm_up
+    with TestClient(main.app) as client:
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        # Isıtma sürerken de süreç canlıdır
+        assert client.get("/livez").status_code == 200
+
+        release.set()
+        response = _wait_for_warm_up(client)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["ready"] is True and body["error"] is None
+        assert body["warm_up_seconds"] >= 0
+        assert set(body["models"]) == set(main.service.sessions.model_names)
+        assert client.get("/livez").status_code == 200
+
+
+@pytest.mark.parametrize("ok, error", [(False, "Bazı motorlar yüklenemedi"), (ImportError("wand yok"), "ImportError: wand yok")])
+def test_not_ready_when_warm_up_fails(warm_up, ok, error):
+    release, result = warm_up
+    result["ok"] = ok
+    release.set()
+    with TestClient(main.app) as client:
+        response = _wait_for_warm_up(client)
+        assert response.status_code == 503
+        assert response.json()["error"] == error
+        assert client.get("/livez").json() == {"status": "ok"}
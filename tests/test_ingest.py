@@ -0,0 +1,39 @@
+import tempfile
+
+import pytest
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+import ingest
+from conftest import make_image, png_bytes
+
+
+def _upload(data, max_size=ingest.SPOOL_MAX_BYTES):
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spooled.write(data)
+    return UploadFile(spooled, filename="a.png")
+
+
+@pytest.mark.parametrize("size", [0, 10, ingest.SPOOL_MAX_BYTES, ingest.SPOOL_MAX_BYTES + 1])
+def test_upload_buffer_matches_upload(size):
+    data = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    buffer = ingest.UploadBuffer(_upload(data))
+    with buffer as view:
+        assert len(buffer) == size
+        assert view.tobytes() == data
+        assert (buffer._mmap is not None) == (size > ingest.SPOOL_MAX_BYTES)
+
+
+def test_upload_buffer_maps_rolled_small_file():
+    # Diske taşmış küçük dosyalar da okunur
+    upload = _upload(b"abc", max_size=1)
+    with ingest.UploadBuffer(upload) as view:
+        assert view.tobytes() == b"abc"
+
+
+def test_upload_buffer_decodes_image():
+    image = make_image(64, 48)
+    upload = _upload(png_bytes(image), max_size=16)
+    with ingest.UploadBuffer(upload) as view:
+        with Image.open(ingest.open_image_source(view)) as decoded:
+            assert decoded.tobytes() == image.tobytes()
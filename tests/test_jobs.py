@@ -0,0 +1,302 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+import pytest
+
+import admission
+import encoding
+import jobs
+from conftest import make_image
+
+
+def _jpeg_bytes():
+    buffer = BytesIO()
+    make_image().save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class FakeExecutor:
+    def __init__(self, result=b"", error=None):
+        self.result = result
+        self.error = error
+        # Ayarlanırsa işler bu olay tetiklenene kadar çalışır durumda kalır
+        self.gate = None
+        self.calls = []
+
+    async def run(self, operation, image_data, steps, output=None, background=False):
+        self.calls.append((operation, bytes(image_data), steps, output, background))
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return BytesIO(self.result)
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _wait_for(manager, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        assert time.monotonic() < deadline, job
+        await asyncio.sleep(0.01)
+
+
+def _stored_job(store, status, worker=0, pid=None, updated_at=None):
+    now = time.time()
+    job = {
+        "id": os.urandom(16).hex(),
+        "status": status,
+        "steps": [["resize_image", {"width": 10}]],
+        "output": None,
+        "created_at": now,
+        "updated_at": updated_at or now,
+        "error": None,
+        "media_type": None,
+        "worker": worker,
+        "pid": pid,
+    }
+    store.create(job, b"input")
+    return job
+
+
+def _manager(tmp_path, executor, **kwargs):
+    return jobs.JobManager(jobs.JobStore(str(tmp_path)), executor, **kwargs)
+
+
+def test_submit_runs_to_done(tmp_path):
+    result = _jpeg_bytes()
+    executor = FakeExecutor(result)
+    manager = _manager(tmp_path, executor)
+    output = encoding.OutputFormat(encoding.JPEG, encoding.JPEG, "balanced", 80, None)
+
+    async def run():
+        await manager.start()
+        try:
+            job = await manager.submit([("resize_image", {"width": 10})], b"input", output)
+            assert job["status"] == jobs.QUEUED and job["expires_at"] is None
+            return await _wait_for(manager, job["id"], jobs.FINISHED)
+        finally:
+            await manager.stop()
+
+    job = _run(run())
+    assert job["status"] == jobs.DONE and job["error"] is None
+    assert job["media_type"] == "image/jpeg"
+    assert job["operations"] == ["resize_image"]
+    assert job["expires_at"] == job["updated_at"] + manager.ttl
+    with open(manager.store.result_path(job["id"]), "rb") as f:
+        assert f.read() == result
+    # Sonuç yazıldıktan sonra girdi silinir
+    assert not os.path.exists(os.path.join(str(tmp_path), job["id"], "input"))
+    # Arka plan işi kapasite dolu olduğunda reddedilmeden bekler
+    assert executor.calls == [("run_pipeline", b"input", [("resize_image", {"width": 10})], output, True)]
+
+
+@pytest.mark.parametrize("error, message", [(ValueError("Geçersiz resim"), "Geçersiz resim"), (MemoryError(), "MemoryError")])
+def test_failed_job_keeps_error(tmp_path, error, message):
+    manager = _manager(tmp_path, FakeExecutor(error=error))
+
+    async def run():
+        await manager.start()
+        try:
+            job = await manager.submit([("resize_image", {})], b"input")
+            return await _wait_for(manager, job["id"], jobs.FINISHED)
+        finally:
+            await manager.stop()
+
+    job = _run(run())
+    assert job["status"] == jobs.FAILED
+    assert job["error"] == message
+    assert job["media_type"] is None
+    assert not os.path.exists(manager.store.result_path(job["id"]))
+
+
+def test_delete_while_running(tmp_path):
+    executor = FakeExecutor(_jpeg_bytes())
+    manager = _manager(tmp_path, executor, workers=1)
+
+    async def run():
+        executor.gate = asyncio.Event()
+        await manager.start()
+        try:
+            job = await manager.submit([("resize_image", {})], b"input")
+            await _wait_for(manager, job["id"], [jobs.RUNNING])
+            await manager.delete(job["id"])
+            executor.gate.set()
+            # Silinen işin sonucu kaydedilmez; işçi sonraki işleri çalıştırmaya devam eder
+            following = await manager.submit([("resize_image", {})], b"input")
+            await _wait_for(manager, following["id"], jobs.FINISHED)
+            with pytest.raises(jobs.JobNotFound):
+                await manager.get(job["id"])
+            return job
+        finally:
+            await manager.stop()
+
+    job = _run(run())
+    assert not os.path.exists(os.path.join(str(tmp_path), job["id"]))
+
+
+def test_start_recovers_unfinished_jobs(tmp_path):
+    executor = FakeExecutor(_jpeg_bytes())
+    manager = _manager(tmp_path, executor)
+    queued = _stored_job(manager.store, jobs.QUEUED, worker=2)
+    running = _stored_job(manager.store, jobs.RUNNING, worker=1)
+    done = _stored_job(manager.store, jobs.DONE)
+
+    async def run():
+        await manager.start(recover=jobs.RECOVER_ALL, worker=3)
+        try:
+            return [await _wait_for(manager, job["id"], jobs.FINISHED) for job in (queued, running)]
+        finally:
+            await manager.stop()
+
+    assert [job["status"] for job in _run(run())] == [jobs.DONE, jobs.DONE]
+    assert len(executor.calls) == 2
+    # Devralınan işler bu işçiye ve sürece kaydedilir
+    for job in (queued, running):
+        stored = manager.store.load(job["id"])
+        assert stored["worker"] == 3 and stored["pid"] == os.getpid()
+    assert manager.store.load(done["id"])["status"] == jobs.DONE
+
+
+@pytest.mark.parametrize("recover, recovered", [(jobs.RECOVER_OWN, [1]), (None, [])])
+def test_respawned_worker_recovers_own_jobs(tmp_path, recover, recovered):
+    executor = FakeExecutor(_jpeg_bytes())
+    manager = _manager(tmp_path, executor)
+    stored = [_stored_job(manager.store, jobs.RUNNING, worker=index) for index in range(3)]
+
+    async def run():
+        await manager.start(recover=recover, worker=1)
+        try:
+            for index in recovered:
+                await _wait_for(manager, stored[index]["id"], jobs.FINISHED)
+            await asyncio.sleep(0.05)
+        finally:
+            await manager.stop()
+
+    _run(run())
+    statuses = [manager.store.load(job["id"])["status"] for job in stored]
+    assert statuses == [jobs.DONE if index in recovered else jobs.RUNNING for index in range(3)]
+
+
+def test_orphaned_jobs_fail(tmp_path):
+    # Sonlanmış bir sürecin kimliği
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    manager = _manager(tmp_path, FakeExecutor(), poll_interval=0.01, orphan_after=60)
+    old = time.time() - 120
+    orphan = _stored_job(manager.store, jobs.RUNNING, pid=process.pid, updated_at=old)
+    recent = _stored_job(manager.store, jobs.RUNNING, pid=process.pid)
+    alive = _stored_job(manager.store, jobs.QUEUED, pid=os.getpid(), updated_at=old)
+
+    async def run():
+        await manager.start(recover=None)
+        try:
+            return await _wait_for(manager, orphan["id"], jobs.FINISHED)
+        finally:
+            await manager.stop()
+
+    job = _run(run())
+    assert job["status"] == jobs.FAILED and job["error"]
+    assert manager.store.load(recent["id"])["status"] == jobs.RUNNING
+    assert manager.store.load(alive["id"])["status"] == jobs.QUEUED
+
+
+def test_finished_jobs_expire(tmp_path):
+    manager = _manager(tmp_path, FakeExecutor(_jpeg_bytes()), ttl=0.05, poll_interval=0.01)
+
+    async def run():
+        await manager.start()
+        try:
+            job = await manager.submit([("resize_image", {})], b"input")
+            await _wait_for(manager, job["id"], jobs.FINISHED)
+            deadline = time.monotonic() + 5
+            while os.path.exists(os.path.join(str(tmp_path), job["id"])):
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.01)
+            with pytest.raises(jobs.JobNotFound):
+                await manager.get(job["id"])
+        finally:
+            await manager.stop()
+
+    _run(run())
+
+
+def test_events_end_when_job_finishes(tmp_path):
+    executor = FakeExecutor(_jpeg_bytes())
+    manager = _manager(tmp_path, executor)
+
+    async def run():
+        executor.gate = asyncio.Event()
+        await manager.start()
+        try:
+            job = await manager.submit([("resize_image", {})], b"input")
+            await _wait_for(manager, job["id"], [jobs.RUNNING])
+            updates = []
+
+            async def collect():
+                async for update in manager.events(job["id"], heartbeat=5):
+                    updates.append(update)
+
+            collecting = asyncio.create_task(collect())
+            await asyncio.sleep(0.05)
+            executor.gate.set()
+            await asyncio.wait_for(collecting, 5)
+            return updates
+        finally:
+            await manager.stop()
+
+    updates = _run(run())
+    assert [update["status"] for update in updates] == [jobs.RUNNING, jobs.DONE]
+    assert not manager._subscribers
+
+
+def test_submit_rejects_when_queue_is_full(tmp_path):
+    executor = FakeExecutor(_jpeg_bytes())
+    manager = _manager(tmp_path, executor, workers=1, max_queued=1, retry_after=7)
+
+    async def run():
+        executor.gate = asyncio.Event()
+        await manager.start()
+        try:
+            running = await manager.submit([("resize_image", {})], b"input")
+            await _wait_for(manager, running["id"], [jobs.RUNNING])
+            await manager.submit([("resize_image", {})], b"input")
+            with pytest.raises(admission.Overloaded) as exc_info:
+                await manager.submit([("resize_image", {})], b"input")
+            executor.gate.set()
+            return exc_info.value
+        finally:
+            await manager.stop()
+
+    error = _run(run())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "7"
+    # Reddedilen iş diske yazılmaz
+    assert len(manager.store.all()) == 2
+
+
+def test_scan_during_create_keeps_job(tmp_path, monkeypatch):
+    store = jobs.JobStore(str(tmp_path))
+    rename = os.rename
+    seen = []
+
+    def scan_then_rename(source, destination):
+        # İş yerine taşınmadan hemen önce başka bir süreç dizini tarar
+        seen.append(store.all())
+        rename(source, destination)
+
+    monkeypatch.setattr(jobs.os, "rename", scan_then_rename)
+    job = _stored_job(store, jobs.QUEUED)
+    assert seen == [[]]
+    assert store.load(job["id"]) == job
+    assert store.read_input(job["id"]) == b"input"
+    assert os.listdir(str(tmp_path)) == [job["id"]]
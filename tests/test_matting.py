@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import config
+import matting
+from conftest import make_image, png_bytes
+from service import ImageProcessService
+
+
+@pytest.mark.parametrize("size, max_side, expected", [
+    ((4000, 3000), 1024, (1024, 768)),
+    ((3000, 4000), 1024, (768, 1024)),
+    ((5000, 3), 1000, (1000, 1)),
+    ((1024, 512), 1024, None),
+    ((4000, 3000), 0, None),
+])
+def test_proxy_size(size, max_side, expected):
+    assert matting.proxy_size(size, max_side) == expected
+
+
+def _disc(width, height, radius):
+    ys, xs = np.mgrid[:height, :width]
+    return np.hypot(xs - width / 2, ys - height / 2) < radius
+
+
+def test_guided_upsample_full_size_and_range():
+    # Parlak disk ön plan; küçük kopyadaki maske tam çözünürlüğe kenara oturarak büyütülür
+    height, width = 480, 640
+    inside = _disc(width, height, 150)
+    rng = np.random.default_rng(0)
+    full_guide = np.clip(np.where(inside, 230, 20) + rng.normal(0, 8, inside.shape), 0, 255).astype(np.uint8)
+    guide = np.asarray(Image.fromarray(full_guide).resize((160, 120), Image.Resampling.BILINEAR))
+    mask = np.where(guide > 128, 255, 0).astype(np.uint8)
+
+    result = matting.guided_upsample(mask, guide, full_guide)
+    assert result.shape == (height, width) and result.dtype == np.uint8
+    assert np.array_equal(result > 128, inside)
+    # Aşırı değerler doğrusal modelde 0-255 dışına taşar; sonuç kırpılır
+    assert result.min() == 0 and result.max() == 255
+
+
+def test_guided_upsample_matches_float_reference():
+    full_guide = np.asarray(make_image(200, 150).convert("L"))
+    guide = np.asarray(Image.fromarray(full_guide).resize((100, 75), Image.Resampling.BILINEAR))
+    mask = np.asarray(make_image(100, 75, seed=2).convert("L"))
+    result = matting.guided_upsample(mask, guide, full_guide, radius=3)
+
+    # Aynı formül float64 ile ve kırpmadan önce
+    def box(values):
+        return matting._box(values, 3)
+
+    g, m = guide / 255.0, mask / 255.0
+    a = (box(g * m) - box(g) * box(m)) / (box(g * g) - box(g) ** 2 + 1e-3)
+    b = box(m) - a * box(g)
+    a = Image.fromarray(box(a).astype(np.float32)).resize((200, 150), Image.Resampling.BILINEAR)
+    b = Image.fromarray(box(b).astype(np.float32)).resize((200, 150), Image.Resampling.BILINEAR)
+    expected = np.clip(np.rint((np.asarray(a) * full_guide + np.asarray(b) * 255)), 0, 255)
+    assert np.abs(result.astype(int) - expected).max() <= 2
+
+
+def test_large_input_is_segmented_at_proxy_size(monkeypatch):
+    monkeypatch.setattr(config, "SEGMENTATION_PROXY_SIDE", 256)
+    service = ImageProcessService()
+    sizes = []
+
+    def predict(image, model_name=None):
+        sizes.append(image.size)
+        return image.convert("L").point(lambda value: 255 if value > 128 else 0)
+
+    monkeypatch.setattr(service.batcher, "predict", predict)
+    with Image.open(service.remove_background(png_bytes(make_image(1024, 640)))) as result:
+        assert result.size == (1024, 640)
+        assert result.mode == "RGBA"
+    # Model yalnızca uzun kenarı SEGMENTATION_PROXY_SIDE olan kopyayı görür
+    assert sizes == [(256, 160)]
+
+    # Sınırın altındaki resimler doğrudan segmentlenir
+    service.remove_background(png_bytes(make_image(200, 120)))
+    assert sizes[1:] == [(200, 120)]
@@ -0,0 +1,34 @@
+import metrics
+
+
+def _registry():
+    registry = metrics.Registry()
+    requests = registry.counter("requests_total", "İstekler.", ("route",))
+    latency = registry.histogram("latency_seconds", "Süre.", ("route",), buckets=(0.1, 1.0))
+    registry.register_collector(lambda: [metrics.Sample("cache_bytes", "gauge", "Bayt.", [({"tier": "memory"}, 3)])])
+    requests.inc(route="/a")
+    latency.observe(0.5, route="/a")
+    return registry
+
+
+def test_worker_snapshots_are_merged_under_one_family(tmp_path):
+    first, second = _registry(), _registry()
+    metrics.write_snapshot(str(tmp_path / "worker-1.json"), second.collect([("worker", "1")]))
+
+    text = first.render([("worker", "0")], metrics.read_snapshots(str(tmp_path)))
+    lines = text.splitlines()
+
+    # Her aile bir kez tanımlanır, örnekleri iki işçiden gelir
+    assert lines.count("# TYPE requests_total counter") == 1
+    assert 'requests_total{route="/a",worker="0"} 1' in lines
+    assert 'requests_total{route="/a",worker="1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",worker="1",le="1"} 1' in lines
+    assert 'cache_bytes{tier="memory",worker="0"} 3' in lines
+    family_lines = [line for line in lines if line.startswith(("# TYPE", "requests_total"))]
+    assert family_lines.index("# TYPE requests_total counter") < family_lines.index('requests_total{route="/a",worker="1"} 1')
+
+
+def test_single_process_render_has_no_worker_label():
+    text = _registry().render()
+    assert 'requests_total{route="/a"} 1' in text.splitlines()
+    assert "worker=" not in text
@@ -0,0 +1,57 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import make_image, png_bytes
+from service import ImageProcessService
+
+
+def _pixels(result):
+    with Image.open(BytesIO(result) if isinstance(result, bytes) else result) as image:
+        return image.mode, np.asarray(image)
+
+
+def _chain(service, image_data, steps):
+    # Eski yol: her adım ayrı uç nokta gibi PNG kodlayıp bir sonrakine çözülmüş veri verir
+    for operation, params in steps:
+        image_data = getattr(service, operation)(image_data, **params).getvalue()
+    return image_data
+
+
+@pytest.mark.parametrize("steps", [
+    [("resize_image", {"width": 80, "height": 60}), ("sketch_effect", {})],
+    [("rotate_image", {"angle": 30}), ("apply_cartoon_effect", {}), ("sharpen_image", {})],
+    [("crop_image", {"left": 5, "top": 5, "right": 70, "bottom": 50}), ("reduce_noise", {"strength": 0.4}),
+     ("apply_filter", {"filter_type": "sepia"})],
+])
+def test_pipeline_matches_chained_calls(service, image_data, steps):
+    expected_mode, expected = _pixels(_chain(service, image_data, steps))
+    mode, actual = _pixels(service.run_pipeline(image_data, steps))
+    assert mode == expected_mode
+    assert np.array_equal(actual, expected)
+
+
+def test_composite_matches_chained_calls(monkeypatch):
+    # Segmentasyon modeli olmadan sabit bir maskeyle
+    service = ImageProcessService()
+    mask = Image.fromarray((np.arange(96 * 64).reshape(64, 96) % 256).astype(np.uint8), "L")
+    monkeypatch.setattr(service.batcher, "predict", lambda image, model_name=None: mask.resize(image.size))
+    image_data = png_bytes(make_image())
+
+    expected = _pixels(_chain(service, image_data, [("remove_background", {}), ("add_shadow", {})]))
+    actual = _pixels(service.remove_background_and_add_shadow(image_data))
+    assert actual[0] == expected[0]
+    assert np.array_equal(actual[1], expected[1])
+
+
+@pytest.mark.parametrize("steps, message", [
+    ([], "en az bir adım"),
+    ([("no_such_step", {})], "Bilinmeyen pipeline adımı"),
+    ([("resize_image", {"width": 10, "depth": 3})], "geçersiz parametreler"),
+    ([("remove_background_and_add_shadow", {})], "Bilinmeyen pipeline adımı"),
+])
+def test_invalid_pipeline_is_rejected(service, steps, message):
+    with pytest.raises(ValueError, match=message):
+        service.validate_pipeline(steps)
@@ -0,0 +1,106 @@
+import io
+import os
+import signal
+import time
+
+import pytest
+
+import jobs
+import prefork
+
+SMAPS_ROLLUP = """\
+00400000-7ffd1e5f2000 ---p 00000000 00:00 0                              [rollup]
+Rss:              204800 kB
+Pss:              102400 kB
+Pss_Anon:          51200 kB
+Shared_Clean:     131072 kB
+Shared_Dirty:       8192 kB
+Private_Clean:     16384 kB
+Private_Dirty:     49152 kB
+Referenced:       200000 kB
+Anonymous:         57344 kB
+Swap:               1024 kB
+SwapPss:             512 kB
+"""
+
+
+def test_memory_usage_parses_smaps_rollup(monkeypatch):
+    paths = []
+
+    def fake_open(path):
+        paths.append(path)
+        return io.StringIO(SMAPS_ROLLUP)
+
+    monkeypatch.setattr(prefork, "open", fake_open, raising=False)
+    assert prefork.memory_usage(1234) == {
+        "rss": 204800 * 1024,
+        "pss": 102400 * 1024,
+        "shared": (131072 + 8192) * 1024,
+        "private": (16384 + 49152) * 1024,
+        "swap": 1024 * 1024,
+    }
+    assert paths == ["/proc/1234/smaps_rollup"]
+
+
+def test_memory_usage_of_missing_process(monkeypatch):
+    def fake_open(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(prefork, "open", fake_open, raising=False)
+    assert prefork.memory_usage(1234) is None
+
+
+requires_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="os.fork yok")
+
+
+@requires_fork
+def test_supervisor_respawns_dead_worker(tmp_path, monkeypatch):
+    log = tmp_path / "spawned"
+
+    def fake_serve(app, sock, index, recover):
+        with open(log, "a") as f:
+            f.write(f"{index} {recover}\n")
+        if recover == jobs.RECOVER_OWN:
+            # Yeniden başlatılan işçi kapatılana kadar çalışır
+            time.sleep(30)
+        return 3
+
+    monkeypatch.setattr(prefork, "_serve", fake_serve)
+    supervisor = prefork.Supervisor(None, None, workers=1, graceful_timeout=5, memory_log_interval=0)
+    first = supervisor.spawn(0, recover=jobs.RECOVER_ALL)
+    try:
+        # İlk işçi hemen çıkar; denetçi onu aynı sırayla yeniden başlatır
+        deadline = time.monotonic() + 10
+        while first in supervisor.children or not supervisor.children:
+            assert time.monotonic() < deadline
+            supervisor._reap()
+            time.sleep(0.05)
+        assert list(supervisor.children.values()) == [0]
+        while len(log.read_text().splitlines()) < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert log.read_text().splitlines() == ["0 all", "0 own"]
+    finally:
+        supervisor._stopping = True
+        supervisor._shutdown()
+    assert not supervisor.children
+
+
+@requires_fork
+def test_shutdown_kills_workers_after_timeout(monkeypatch):
+    def fake_serve(app, sock, index, recover):
+        # SIGTERM'i yok sayan işçi
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        time.sleep(30)
+        return 0
+
+    monkeypatch.setattr(prefork, "_serve", fake_serve)
+    supervisor = prefork.Supervisor(None, None, workers=2, graceful_timeout=0.5, memory_log_interval=0)
+    for index in range(2):
+        supervisor.spawn(index)
+    time.sleep(0.2)
+    supervisor._stopping = True
+    started = time.monotonic()
+    supervisor._shutdown()
+    assert not supervisor.children
+    assert time.monotonic() - started < 5
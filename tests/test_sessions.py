@@ -0,0 +1,34 @@
+import os
+import re
+
+import pytest
+
+import config
+from sessions import SessionRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _baked_models():
+    # Dockerfile modelleri "new_session(m) for m in ('u2net', 'u2netp')" ile imaja gömer
+    with open(os.path.join(ROOT, "Dockerfile")) as dockerfile:
+        match = re.search(r"new_session\(m\) for m in \(([^)]*)\)", dockerfile.read())
+    return tuple(re.findall(r"'([^']+)'", match.group(1)))
+
+
+def _tiers(items):
+    return {tier.strip(): model.strip() for tier, _, model in (item.partition("=") for item in items)}
+
+
+def test_default_tiers_resolve_on_stock_image():
+    registry = SessionRegistry("/nonexistent", _baked_models(), tiers=_tiers(config.REMBG_MODEL_TIERS))
+    for tier, model_name in registry.tiers.items():
+        assert registry.resolve(tier) == model_name
+
+
+def test_tier_without_loaded_model_is_rejected():
+    registry = SessionRegistry("/nonexistent", ("u2net",), tiers={"best": "isnet-general-use"})
+    with pytest.raises(ValueError, match="REMBG_MODELS"):
+        registry.resolve("best")
+    with pytest.raises(ValueError, match="Bilinmeyen model"):
+        registry.resolve("nope")
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import config
+import tiles
+from conftest import make_image
+
+
+def test_tile_boxes_cover_image():
+    boxes = tiles.tile_boxes(100, 70, 32, 5)
+    covered = np.zeros((70, 100), int)
+    for (left, top, right, bottom), padded in boxes:
+        covered[top:bottom, left:right] += 1
+        assert padded[0] == max(left - 5, 0) and padded[3] == min(bottom + 5, 70)
+    assert (covered == 1).all()
+
+
+@pytest.mark.parametrize("operation, kwargs", [
+    ("reduce_noise", {"strength": 0.5}),
+    ("apply_cartoon_effect", {}),
+    ("sketch_effect", {}),
+    ("apply_watercolor_effect", {}),
+])
+def test_tiled_output_matches_untiled(service, monkeypatch, operation, kwargs):
+    step = getattr(service, operation).step
+    image = make_image(150, 110, seed=3)
+
+    monkeypatch.setattr(config, "TILE_MIN_MEGAPIXELS", 0)
+    expected = np.asarray(step(service, image, **kwargs))
+
+    # Döşemeler dikişlerin resmin ortasına denk geleceği kadar küçük tutulur
+    monkeypatch.setattr(config, "TILE_MIN_MEGAPIXELS", 1e-6)
+    monkeypatch.setattr(config, "TILE_SIZE", 40)
+    actual = np.asarray(step(service, image, **kwargs))
+
+    assert actual.shape == expected.shape
+    assert np.array_equal(actual, expected)
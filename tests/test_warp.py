@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+import color_effects
+import warp
+from conftest import make_image, png_bytes
+
+SIZES = [(96, 64), (37, 51), (131, 200)]
+
+
+def _image(size, mode):
+    image = make_image(*size, mode="RGBA" if mode == "LA" else mode)
+    return image.convert(mode) if mode == "LA" else image
+
+
+@pytest.mark.parametrize("mode", warp.MODES)
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("angle", [1, 17.5, 30, -45, 89.9, 135, 200, 359])
+def test_rotate_matches_pil(mode, size, angle):
+    image = _image(size, mode)
+    assert np.array_equal(warp.rotate(np.asarray(image), angle), np.asarray(image.rotate(angle, expand=True)))
+
+
+@pytest.mark.parametrize("angle", [30, 90, -135])
+def test_rotate_image_matches_pil(service, angle):
+    image = make_image(mode="RGBA")
+    with Image.open(service.rotate_image(png_bytes(image), angle)) as rotated:
+        assert np.array_equal(np.asarray(rotated), np.asarray(image.rotate(angle, expand=True)))
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("direction", ["horizontal", "vertical"])
+def test_mirror_matches_half_copy(size, direction):
+    # Eski Wand yolu: sol/üst yarı kırpılıp aynalanır ve yarının hemen yanına bindirilir
+    array = np.asarray(_image(size, "RGBA"))
+    expected = array.copy()
+    if direction == "horizontal":
+        half = array.shape[1] // 2
+        expected[:, half:2 * half] = array[:, :half][:, ::-1]
+    else:
+        half = array.shape[0] // 2
+        expected[half:2 * half] = array[:half][::-1]
+    assert np.array_equal(warp.mirror(array, direction), expected)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("segments, turns", [(1, 0), (2, 2), (4, 1)])
+def test_kaleidoscope_right_angle_copies(size, segments, turns):
+    # Dik açılı kopyalar kareyi tamamen kaplar; sonuç son kopyanın (saat yönünde döndürülmüş) kendisidir
+    array = np.asarray(_image(size, "RGB"))
+    side = min(size)
+    left, top = size[0] // 2 - side // 2, size[1] // 2 - side // 2
+    square = np.ascontiguousarray(np.rot90(array[top:top + side, left:left + side], turns))
+    values = color_effects.apply_curves(square, color_effects.identity_curves())
+    expected = color_effects.to_char(color_effects.modulate(values, brightness=110, saturation=130))
+    assert np.array_equal(warp.kaleidoscope(array, segments), expected)
+
+
+@pytest.mark.parametrize("amplitude, wavelength", [(5, 10), (-3, 7.5), (8, 40)])
+def test_wave_matches_column_shift(amplitude, wavelength):
+    array = np.asarray(make_image(60, 40))
+    height, width = array.shape[:2]
+    # Her sütun sinüs kadar aşağı kayar; resim dışı beyazdır
+    canvas = np.full((int(height + 2 * abs(amplitude)), width, 3), 255.0)
+    padded = np.concatenate([np.full((1, width, 3), 255.0), array, np.full((1, width, 3), 255.0)])
+    for x in range(width):
+        shift = abs(amplitude) + amplitude * np.sin(2 * np.pi * x / wavelength)
+        source = np.arange(canvas.shape[0]) - shift + 1
+        for channel in range(3):
+            canvas[:, x, channel] = np.interp(source, np.arange(height + 2), padded[:, x, channel])
+    expected = np.rint(canvas)
+    # remap alt piksel konumunu 1/32 adımla örnekler
+    waved = warp.remap(array, warp.wave_maps(width, height, amplitude, wavelength), cv2.INTER_LINEAR, border_value=255)
+    assert np.abs(waved.astype(int) - expected).max() <= 4
+    assert np.abs(waved.astype(int) - expected).mean() < 0.25
+    assert np.array_equal(warp.wave(array, amplitude, wavelength), warp.trim(waved))
+
+
+def test_trim_removes_corner_coloured_edges():
+    array = np.full((20, 30, 3), 255, np.uint8)
+    array[4:15, 6:25] = 10
+    assert warp.trim(array).shape == (11, 19, 3)
+    assert warp.trim(np.full((5, 5, 3), 7, np.uint8)).shape == (5, 5, 3)
+
+
+@pytest.mark.parametrize("shear", [0.3, -0.4, 1.7])
+def test_shear_matches_pil_affine(shear):
+    plane = np.asarray(make_image(mode="RGBA").getchannel("A"))
+    expected = Image.fromarray(plane).transform(
+        plane.shape[::-1], Image.Transform.AFFINE, (1, shear, 0, 0, 1, 0), Image.Resampling.BICUBIC)
+    actual = warp.shear(plane, shear)
+    # Kapsanan alan PIL ile aynıdır; içeride yalnızca bikübik çekirdekler (OpenCV a=-0.75, PIL a=-0.5) ayrışır
+    assert np.array_equal(actual == 0, np.asarray(expected) == 0)
+    assert np.abs(actual.astype(int) - np.asarray(expected)).max() <= 5
+
+
+def test_maps_are_cached():
+    assert warp.rotation_maps(64, 48, 30) is warp.rotation_maps(64, 48, 30)
+    assert warp.kaleidoscope_maps(64, 48, 12) is warp.kaleidoscope_maps(64, 48, 12)
+
+
+def test_realistic_shadow_matches_pil_transform(service):
+    image = make_image(mode="RGBA")
+    # Eski yol: siyah gölge katmanı PIL AFFINE (bikübik) ile kaydırılır
+    layer = Image.new("RGBA", image.size, (0, 0, 0, 120))
+    layer.putalpha(image.getchannel("A"))
+    shadow = layer.transform(image.size, Image.Transform.AFFINE, (1, np.tan(np.radians(45)), 0, 0, 1, 0),
+                             resample=Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(15))
+    expected = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    expected.paste(shadow, (0, 0), shadow)
+    expected.paste(image, (0, 0), image)
+
+    with Image.open(service.apply_realistic_shadow(png_bytes(image))) as result:
+        assert np.abs(np.asarray(result, dtype=int) - np.asarray(expected)).max() <= 2
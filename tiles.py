@@ -0,0 +1,116 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
+
+from PIL import Image
+
+import config
+
+# Her süreçte bir kez oluşturulan döşeme havuzu; OpenCV ve PIL filtreleri GIL'i bırakır
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_size():
+    return config.TILE_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_pool_size(), thread_name_prefix="image-tile")
+        return _pool
+
+
+def tile_boxes(width, height, tile_size, halo):
+    """
+    Resmi örtüşen döşemelere böler.
+    :param width: Resim genişliği.
+    :param height: Resim yüksekliği.
+    :param tile_size: Döşemenin çekirdek (yazılan) bölgesinin kenar uzunluğu.
+    :param halo: Çekirdeğin her yanına eklenen, filtrenin komşuluk yarıçapı kadar kenar payı.
+    :return: (çekirdek kutusu, paylı kutu) çiftleri; kutular (left, top, right, bottom) biçimindedir.
+    """
+    boxes = []
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            core = (left, top, min(left + tile_size, width), min(top + tile_size, height))
+            # Resim kenarında pay eklenmez; filtre orada da tüm resimdeki kenar işlemini görür
+            padded = (
+                max(core[0] - halo, 0),
+                max(core[1] - halo, 0),
+                min(core[2] + halo, width),
+                min(core[3] + halo, height),
+            )
+            boxes.append((core, padded))
+    return boxes
+
+
+def process_tiled(image, func, halo, tile_size=None, workers=None):
+    """
+    PIL resmini döşemelere bölüp func'ı döşemelere paralel uygular ve sonuçları birleştirir.
+    Her döşemenin yalnızca çekirdek bölgesi kullanıldığından komşuluğu halo'yu aşmayan filtrelerde dikiş oluşmaz.
+    :param image: PIL resmi.
+    :param func: PIL resmi alıp aynı boyutta PIL resmi döndüren çağrılabilir.
+    :param halo: Filtrenin piksel cinsinden komşuluk yarıçapı.
+    :param tile_size: Döşeme çekirdeğinin kenar uzunluğu (varsayılan: config.TILE_SIZE).
+    :param workers: Aynı anda işlenen en fazla döşeme (varsayılan: döşeme havuzu boyutu).
+    :return: Birleştirilmiş PIL resmi.
+    """
+    pool = _get_pool()
+    tile_size = tile_size or config.TILE_SIZE
+    # Belleği sınırlamak için havuzdaki iş parçacığı sayısı kadar döşeme aynı anda bellekte tutulur
+    workers = workers or _pool_size()
+    boxes = tile_boxes(image.width, image.height, tile_size, halo)
+    result = None
+    pending = {}
+
+    def paste(future):
+        nonlocal result
+        core, padded = pending.pop(future)
+        tile = future.result()
+        if tile.size != (padded[2] - padded[0], padded[3] - padded[1]):
+            raise ValueError("Döşeme filtresi resim boyutunu değiştirmemelidir")
+        if result is None:
+            result = Image.new(tile.mode, image.size)
+        offset = (core[0] - padded[0], core[1] - padded[1])
+        result.paste(tile.crop((offset[0], offset[1], offset[0] + core[2] - core[0], offset[1] + core[3] - core[1])),
+                     core[:2])
+
+    try:
+        for core, padded in boxes:
+            if len(pending) >= workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    paste(future)
+            pending[pool.submit(func, image.crop(padded))] = (core, padded)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                paste(future)
+    finally:
+        for future in pending:
+            future.cancel()
+    return result
+
+
+def tiled(halo):
+    """
+    Komşuluk filtresi adımını büyük resimlerde döşemelere bölünerek paralel çalışacak hale getirir.
+    Adım resmin yalnızca halo yarıçapındaki komşuluğuna bakmalı ve aynı boyutta resim döndürmelidir.
+    config.TILE_MIN_MEGAPIXELS altındaki resimler bölünmeden işlenir.
+    :param halo: Adımın piksel cinsinden komşuluk yarıçapı (zincirlenmiş filtrelerde yarıçapların toplamı).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, image, *args, **kwargs):
+            min_pixels = config.TILE_MIN_MEGAPIXELS * 1e6
+            if not config.TILE_MIN_MEGAPIXELS or image.width * image.height < min_pixels:
+                return func(self, image, *args, **kwargs)
+            return process_tiled(image, lambda tile: func(self, tile, *args, **kwargs), halo)
+
+        wrapper.halo = halo
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+import ctypes
+
+import numpy as np
+from wand.api import library
+from wand.image import Image as WandImage, STORAGE_TYPES
+
+_CHAR_STORAGE = STORAGE_TYPES.index("char")
+
+# NumPy kanal sayısı -> ImageMagick piksel düzeni ("I": gri ton yoğunluğu)
+_CHANNEL_MAPS = {1: "I", 3: "RGB", 4: "RGBA"}
+
+
+def to_array(img):
+    """
+    Wand resminin piksellerini kodlayıcıya uğramadan NumPy dizisine aktarır.
+    :param img: Wand resmi.
+    :return: (yükseklik, genişlik, 3|4) boyutunda uint8 dizi; alfa kanalı varsa RGBA, yoksa RGB.
+    """
+    width, height = img.size
+    channel_map = "RGBA" if img.alpha_channel else "RGB"
+    array = np.empty((height, width, len(channel_map)), dtype=np.uint8)
+    # Pikseller doğrudan dizinin belleğine yazılır; ara tampon veya liste oluşmaz
+    ok = library.MagickExportImagePixels(
+        img.wand, 0, 0, width, height, channel_map.encode(), _CHAR_STORAGE,
+        array.ctypes.data_as(ctypes.c_void_p),
+    )
+    if not ok:
+        img.raise_exception()
+    return array
+
+
+def from_array(array):
+    """
+    NumPy dizisinden kodlayıcıya uğramadan Wand resmi oluşturur.
+    :param array: (yükseklik, genişlik) gri ton veya (yükseklik, genişlik, 3|4) RGB(A) uint8 dizi.
+    :return: Wand resmi; çağıran kapatmalıdır.
+    """
+    if array.dtype != np.uint8:
+        raise ValueError(f"Wand köprüsü yalnızca uint8 dizileri kabul eder: {array.dtype}")
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    channel_map = _CHANNEL_MAPS.get(channels)
+    if channel_map is None:
+        raise ValueError(f"Desteklenmeyen kanal sayısı: {channels}")
+    # from_array bitişik dizilerde belleği işaretçiyle okur, diğerlerinde bayt kopyası alır
+    return WandImage.from_array(np.ascontiguousarray(array), channel_map=channel_map, storage="char")
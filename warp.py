@@ -0,0 +1,227 @@
+import math
+
+import cv2
+import numpy as np
+
+import color_effects
+import procedural
+
+# Warp motorunun taşıdığı PIL kipleri; diğerleri çağıran tarafından bunlardan birine çevrilir
+MODES = ("L", "LA", "RGB", "RGBA")
+
+# Sabit noktalı (CV_16SC2) haritalar koordinatları int16 olarak tutar; daha uzak koordinatlarda float haritalar kalır
+_FIXED_POINT_LIMIT = 32000
+
+
+def _grid(width, height):
+    # Çıktı piksellerinin koordinatları; tam ızgara yerine yayınlanabilir satır ve sütun vektörleri
+    xs = np.arange(width, dtype=np.float64)[None, :]
+    ys = np.arange(height, dtype=np.float64)[:, None]
+    return xs, ys
+
+
+def _compile(map_x, map_y, nearest=False):
+    """
+    Çıktı pikseli başına kaynak koordinatlarını cv2.remap'in sabit noktalı biçimine çevirir.
+    Sabit noktalı haritalar float haritalardan küçüktür ve remap'i hızlandırır.
+    :param map_x: (H, W) kaynak x koordinatları; piksel merkezleri tam sayılardadır.
+    :param map_y: (H, W) kaynak y koordinatları.
+    :param nearest: Harita en yakın komşu örneklemesiyle kullanılacaksa True.
+    :return: (map1, map2) demeti; en yakın komşu haritasında yalnızca map1 bulunur.
+    """
+    map_x = np.ascontiguousarray(np.broadcast_to(map_x, np.broadcast_shapes(map_x.shape, map_y.shape)), np.float32)
+    map_y = np.ascontiguousarray(np.broadcast_to(map_y, map_x.shape), np.float32)
+    if max(np.abs(map_x).max(), np.abs(map_y).max()) > _FIXED_POINT_LIMIT:
+        return map_x, map_y
+
+    map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2, nninterpolation=nearest)
+    return (map1,) if nearest else (map1, map2)
+
+
+def remap(image_np, maps, interpolation, border_mode=cv2.BORDER_CONSTANT, border_value=0):
+    """
+    Derlenmiş haritayı tek bir cv2.remap geçişiyle uygular; çıktının boyutu haritanın boyutudur.
+    :param image_np: (H, W) veya (H, W, 2|3|4) uint8 dizi.
+    :param maps: Harita üreticilerinin döndürdüğü demet.
+    :param interpolation: cv2.INTER_NEAREST, cv2.INTER_LINEAR veya cv2.INTER_CUBIC.
+    :param border_value: Resim dışına düşen piksellerin kanal değeri (BORDER_CONSTANT ile).
+    :return: Yeni uint8 dizi.
+    """
+    map2 = maps[1] if len(maps) > 1 else None
+    return cv2.remap(image_np, maps[0], map2, interpolation,
+                     borderMode=border_mode, borderValue=(border_value,) * 4)
+
+
+def _fix(value):
+    # 16.16 sabit noktalı sayı
+    return math.floor(value * 65536.0 + 0.5)
+
+
+@procedural.cached
+def rotation_maps(width, height, angle):
+    """
+    PIL `rotate(angle, expand=True)` ile aynı döndürme: saat yönünün tersine, tuval resmi içerecek kadar büyür.
+    Kaynak pikseller PIL'in en yakın komşu afin dönüşümündeki 16.16 sabit noktalı aritmetikle seçilir; sonuç aynıdır.
+    """
+    radians = -math.radians(angle)
+    a, b = round(math.cos(radians), 15), round(math.sin(radians), 15)
+    d, e = -b, a
+    center_x, center_y = width / 2.0, height / 2.0
+    c = center_x - a * center_x - b * center_y
+    f = center_y - d * center_x - e * center_y
+
+    corners = [(a * x + b * y + c, d * x + e * y + f) for x, y in ((0, 0), (width, 0), (width, height), (0, height))]
+    new_width = math.ceil(max(x for x, _ in corners)) - math.floor(min(x for x, _ in corners))
+    new_height = math.ceil(max(y for _, y in corners)) - math.floor(min(y for _, y in corners))
+    shift_x, shift_y = -(new_width - width) / 2.0, -(new_height - height) / 2.0
+    c, f = a * shift_x + b * shift_y + c, d * shift_x + e * shift_y + f
+
+    # PIL (Geometry.c affine_fixed) katsayıları 1/65536'ya yuvarlar, piksel merkezinden (0.5, 0.5) başlayıp
+    # tam sayı adımlarla ilerler ve tabana yuvarlar; float haritalar eşik değerlerinde farklı piksel seçerdi
+    a0, a1, a3, a4 = _fix(a), _fix(b), _fix(d), _fix(e)
+    a2, a5 = _fix(a * 0.5 + b * 0.5 + c), _fix(d * 0.5 + e * 0.5 + f)
+    xs = np.arange(new_width, dtype=np.int64)[None, :]
+    ys = np.arange(new_height, dtype=np.int64)[:, None]
+    map_x = (a2 + ys * a1 + xs * a0) >> 16
+    map_y = (a5 + ys * a4 + xs * a3) >> 16
+    return _compile(map_x.astype(np.float64), map_y.astype(np.float64), nearest=True)
+
+
+@procedural.cached
+def mirror_maps(width, height, direction):
+    """
+    Sol (yatay) veya üst (dikey) yarının aynasını diğer yarıya kopyalayan harita; tek sayılı boyutta son satır/sütun korunur.
+    """
+    xs, ys = _grid(width, height)
+    if direction == 'horizontal':
+        half = width // 2
+        xs = np.where((xs >= half) & (xs < 2 * half), 2 * half - 1 - xs, xs)
+    else:
+        half = height // 2
+        ys = np.where((ys >= half) & (ys < 2 * half), 2 * half - 1 - ys, ys)
+    return _compile(xs, ys, nearest=True)
+
+
+@procedural.cached
+def kaleidoscope_maps(width, height, segments):
+    """
+    Ortadaki kareyi ve onun 360/segments derecelik döndürülmüş kopyalarını tek haritada birleştirir.
+    ImageMagick uygulamasındaki gibi her kopya saat yönünde döndürülür, sınırlayıcı kutusuna kırpılır ve
+    sol üst köşeye hizalanarak üst üste bindirilir; her çıktı pikseli onu kaplayan son kopyadan örneklenir.
+    """
+    size = min(width, height)
+    left, top = width // 2 - size // 2, height // 2 - size // 2
+    xs, ys = _grid(size, size)
+    map_x = np.broadcast_to(xs, (size, size)).copy()
+    map_y = np.broadcast_to(ys, (size, size)).copy()
+
+    step = 360 / segments
+    for i in range(1, segments):
+        radians = math.radians(step * i)
+        cos, sin = math.cos(radians), math.sin(radians)
+        # Döndürülmüş kopyanın tuvali; kopyanın merkezi tuvalin merkezindedir
+        extent = math.floor(size * (abs(cos) + abs(sin)) + 0.5)
+        dx, dy = xs + 0.5 - extent / 2.0, ys + 0.5 - extent / 2.0
+        source_x = cos * dx + sin * dy + size / 2.0 - 0.5
+        source_y = -sin * dx + cos * dy + size / 2.0 - 0.5
+        inside = (source_x >= -0.5) & (source_x <= size - 0.5) & (source_y >= -0.5) & (source_y <= size - 0.5)
+        map_x[inside] = source_x[inside]
+        map_y[inside] = source_y[inside]
+
+    return _compile(map_x + left, map_y + top)
+
+
+@procedural.cached
+def wave_maps(width, height, amplitude, wavelength):
+    """
+    ImageMagick `wave`: her sütun sinüs dalgasıyla dikey kaydırılır; tuval 2 * |amplitude| kadar uzar.
+    """
+    xs, ys = _grid(width, int(height + 2.0 * abs(amplitude)))
+    sine = abs(amplitude) + amplitude * np.sin(2.0 * math.pi * xs / wavelength)
+    return _compile(xs, ys - sine)
+
+
+@procedural.cached
+def shear_maps(width, height, shear):
+    """
+    Yatay kaydırma: çıktının (x, y) pikseli kaynağın (x + shear * y) konumundan örneklenir (PIL AFFINE ile aynı).
+    :return: (map1, map2, kapsama) demeti; kapsama, kaynağı resmin içine düşen pikselleri gösteren uint8 maskedir.
+    """
+    xs, ys = _grid(width, height)
+    # PIL kaynak koordinatı [0, genişlik) dışındaki pikselleri boş bırakır; içeride komşuları kenara kırpar
+    source_x = (xs + 0.5) + shear * (ys + 0.5)
+    coverage = np.ascontiguousarray((source_x >= 0) & (source_x < width), np.uint8)
+    return _compile(source_x - 0.5, np.broadcast_to(ys, source_x.shape)) + (coverage,)
+
+
+def rotate(image_np, angle):
+    height, width = image_np.shape[:2]
+    return remap(image_np, rotation_maps(width, height, angle), cv2.INTER_NEAREST)
+
+
+def mirror(image_np, direction='horizontal'):
+    height, width = image_np.shape[:2]
+    return remap(image_np, mirror_maps(width, height, direction), cv2.INTER_NEAREST)
+
+
+def kaleidoscope(image_np, segments=8):
+    """
+    apply_kaleidoscope: döndürülmüş kopyalar tek remap geçişinde birleştirilir, ardından modulate(110, 130).
+    :param image_np: (H, W, 3|4) uint8 dizi; RGBA girdide alfa kanalı da aynı haritayla taşınır.
+    """
+    height, width = image_np.shape[:2]
+    result = remap(image_np, kaleidoscope_maps(width, height, segments), cv2.INTER_LINEAR,
+                   border_mode=cv2.BORDER_REPLICATE)
+    values = color_effects.apply_curves(result[:, :, :3], color_effects.identity_curves())
+    rgb = color_effects.to_char(color_effects.modulate(values, brightness=110, saturation=130))
+    if result.shape[2] == 4:
+        return np.dstack([rgb, result[:, :, 3]])
+    return rgb
+
+
+def _first_different(lines, corner):
+    # Kenardan içeri doğru, köşe renginden farklı piksel içeren ilk satırın/sütunun sırası
+    for index, line in enumerate(lines):
+        if (line != corner).any():
+            return index
+    return None
+
+
+def trim(image_np):
+    """
+    ImageMagick `trim` (fuzz 0): kenarlardaki köşe rengindeki satır ve sütunları kırpar.
+    Sol ve üst sınır sol üst, sağ sınır sağ üst, alt sınır sol alt köşenin rengine göre bulunur.
+    Kenarlardan içeri doğru taranır; kırpılan şerit dar olduğundan resmin tamamı karşılaştırılmaz.
+    """
+    height, width = image_np.shape[:2]
+    columns = image_np.swapaxes(0, 1)
+    left = _first_different(columns, image_np[0, 0])
+    if left is None:
+        # Tek renkli resim kırpılmaz
+        return image_np
+    top = _first_different(image_np, image_np[0, 0])
+    right = _first_different(columns[::-1], image_np[0, -1])
+    bottom = _first_different(image_np[::-1], image_np[-1, 0])
+    if right is None or bottom is None or width - right <= left or height - bottom <= top:
+        return image_np
+    return image_np[top:height - bottom, left:width - right]
+
+
+def wave(image_np, amplitude=5, wavelength=10):
+    """
+    apply_wave_distortion: dalga tek remap geçişinde uygulanır, taşan alan beyazla doldurulur ve kenarlar kırpılır.
+    """
+    height, width = image_np.shape[:2]
+    waved = remap(image_np, wave_maps(width, height, amplitude, wavelength), cv2.INTER_LINEAR, border_value=255)
+    return trim(waved)
+
+
+def shear(plane, factor):
+    """
+    Tek kanallı düzlemi yatay kaydırır (bikübik); resim dışına düşen pikseller 0 olur.
+    Kenarlar PIL'deki gibidir; iç pikseller yalnızca bikübik çekirdek farkı kadar (birkaç birim) ayrışır.
+    """
+    height, width = plane.shape[:2]
+    *maps, coverage = shear_maps(width, height, factor)
+    sheared = remap(plane, maps, cv2.INTER_CUBIC, border_mode=cv2.BORDER_REPLICATE)
+    return cv2.multiply(sheared, coverage)